@@ -0,0 +1,24 @@
+"""Configurações por perfil, escolhido pela variável de ambiente DJANGO_ENV.
+
+- dev (padrão): DEBUG ligado, e-mails no console;
+- test (padrão de `manage.py test`): o dev mais o shard de teste, em memória;
+- prod: ver prod.py (template loaders em cache, conexões persistentes, cache
+  configurado, arquivos estáticos com manifest, gzip e logging enxuto).
+
+base.py tem o que é comum aos dois. `manage.py perf_check` aponta o que falta
+para o perfil de produção.
+"""
+import os
+
+from django.core.exceptions import ImproperlyConfigured
+
+DJANGO_ENV = os.environ.get('DJANGO_ENV', 'dev')
+
+if DJANGO_ENV == 'prod':
+    from .prod import *  # noqa: F401,F403
+elif DJANGO_ENV == 'dev':
+    from .dev import *  # noqa: F401,F403
+elif DJANGO_ENV == 'test':
+    from .test import *  # noqa: F401,F403
+else:
+    raise ImproperlyConfigured(f"DJANGO_ENV deve ser 'dev', 'test' ou 'prod', não {DJANGO_ENV!r}.")
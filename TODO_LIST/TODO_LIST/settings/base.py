@@ -0,0 +1,177 @@
+"""
+Django settings for TODO_LIST project: what is common to every profile.
+
+Generated by 'django-admin startproject' using Django 5.2.4. The profiles
+(dev.py, prod.py) import everything from here; see settings/__init__.py.
+
+For more information on this file, see
+https://docs.djangoproject.com/en/5.2/topics/settings/
+
+For the full list of settings and their values, see
+https://docs.djangoproject.com/en/5.2/ref/settings/
+"""
+
+from pathlib import Path
+
+# Build paths inside the project like this: BASE_DIR / 'subdir'.
+BASE_DIR = Path(__file__).resolve().parent.parent.parent
+
+# SECRET_KEY, DEBUG e ALLOWED_HOSTS ficam em dev.py / prod.py.
+
+
+# Application definition
+
+INSTALLED_APPS = [
+    'django.contrib.admin',
+    'django.contrib.auth',
+    'django.contrib.contenttypes',
+    'django.contrib.sessions',
+    'django.contrib.messages',
+    'django.contrib.staticfiles',
+    'django_countries',
+    'core',
+    'users',
+    'projects',
+    'tasks',
+    'jobs',
+    'notifications',
+]
+
+MIDDLEWARE = [
+    'django.middleware.security.SecurityMiddleware',
+    'django.contrib.sessions.middleware.SessionMiddleware',
+    'django.middleware.common.CommonMiddleware',
+    'django.middleware.csrf.CsrfViewMiddleware',
+    'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'django.contrib.messages.middleware.MessageMiddleware',
+    'core.ratelimit.RateLimitMiddleware',
+    'projects.shards.ShardMiddleware',
+    'tasks.activity.ActivityBufferMiddleware',
+    'django.middleware.clickjacking.XFrameOptionsMiddleware',
+]
+
+ROOT_URLCONF = 'TODO_LIST.urls'
+
+TEMPLATES = [
+    {
+        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        'DIRS': [BASE_DIR / 'templates'],
+        'APP_DIRS': True,
+        'OPTIONS': {
+            'context_processors': [
+                'django.template.context_processors.request',
+                'django.contrib.auth.context_processors.auth',
+                'django.contrib.messages.context_processors.messages',
+                'notifications.context_processors.unread_notifications',
+            ],
+        },
+    },
+]
+
+WSGI_APPLICATION = 'TODO_LIST.wsgi.application'
+
+
+# Database
+# https://docs.djangoproject.com/en/5.2/ref/settings/#databases
+
+DATABASES = {
+    'default': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': BASE_DIR / 'db.sqlite3',
+    }
+}
+
+# Particionamento de projetos (core/sharding.py). Com um shard só, tudo fica no 'default'.
+# Para espalhar os projetos, declare os bancos extras e liste-os aqui, por exemplo:
+#   DATABASES['shard_1'] = {
+#       'ENGINE': 'django.db.backends.sqlite3',
+#       'NAME': BASE_DIR / 'shard_1.sqlite3',
+#       # as FKs para users_user apontam para outro banco
+#       'OPTIONS': {'init_command': 'PRAGMA foreign_keys = OFF'},
+#   }
+#   PROJECT_SHARDS = ['default', 'shard_1']
+# e rode `migrate --database=shard_1` e `project_shards sync`.
+PROJECT_SHARDS = ['default']
+SHARDED_APPS = ['projects', 'tasks']
+UNSHARDED_MODELS = ['projects.projectshard']  # o diretório fica só no 'default'
+DATABASE_ROUTERS = ['core.sharding.ShardRouter']
+
+
+# Password validation
+# https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
+
+AUTH_PASSWORD_VALIDATORS = [
+    {'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',},
+    {'NAME': 'django.contrib.auth.password_validation.MinimumLengthValidator', 'OPTIONS': {'min_length': 8},},
+    {'NAME': 'django.contrib.auth.password_validation.CommonPasswordValidator',},
+    {'NAME': 'django.contrib.auth.password_validation.NumericPasswordValidator',},
+]
+
+
+AUTH_USER_MODEL = 'users.User'  
+
+# Internationalization
+# https://docs.djangoproject.com/en/5.2/topics/i18n/
+
+LANGUAGE_CODE = 'pt-br'
+
+TIME_ZONE = 'America/Sao_Paulo'
+
+USE_I18N = True
+
+USE_TZ = True
+
+
+# Static files (CSS, JavaScript, Images)
+# https://docs.djangoproject.com/en/5.2/howto/static-files/
+
+STATIC_URL = 'static/'
+
+# Default primary key field type
+# https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
+
+DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
+
+LOGIN_URL = '/users/login/'
+
+LOGIN_REDIRECT_URL = '/users/profile/'
+
+LOGOUT_REDIRECT_URL = '/users/login/'
+
+# Fila de jobs em segundo plano (python manage.py run_workers)
+JOBS_WORKERS = 2
+JOBS_WORKER_MODE = 'thread'
+JOBS_RETRY_BASE_DELAY = 30      # segundos; dobra a cada nova tentativa
+JOBS_RETRY_MAX_DELAY = 3600
+JOBS_STALE_AFTER = 600          # jobs 'running' sem atualização há mais que isso voltam para a fila
+
+# E-mails (em desenvolvimento os resumos de prazo saem no console, ver dev.py)
+DEFAULT_FROM_EMAIL = 'DevTasker <no-reply@devtasker.local>'
+
+# Tarefas com end_date até hoje + N dias entram no resumo de "prazo próximo"
+TASK_DUE_SOON_DAYS = 2
+
+# manage.py archive_tasks: tarefas finalizadas com prazo encerrado há mais de N dias vão para o arquivo
+TASK_ARCHIVE_AFTER_DAYS = 90
+
+# Tarefas recorrentes (tasks/recurrence.py): ocorrências até hoje + N dias viram tarefas de verdade
+TASK_RECURRENCE_HORIZON_DAYS = 14
+
+# Exclusões de projeto/usuário com mais tarefas que isso vão para a fila de jobs
+FAST_DELETE_BACKGROUND_THRESHOLD = 5000
+
+# Cópias de projeto (projects/cloning.py) com mais tarefas que isso vão para a fila de jobs
+PROJECT_CLONE_BACKGROUND_THRESHOLD = 5000
+
+# Contador de notificações não lidas no cache; depois disso é recontado no banco
+NOTIFICATIONS_UNREAD_TTL = 3600
+
+# Limite de requisições (core/ratelimit.py): (fichas por segundo, tamanho do balde)
+# por usuário autenticado e por IP, separado entre leituras (GET/HEAD/OPTIONS) e escritas
+RATE_LIMIT_ENABLED = True
+RATE_LIMITS = {
+    'user': {'read': (20, 100), 'write': (5, 30)},
+    'ip': {'read': (50, 300), 'write': (10, 60)},
+}
+RATE_LIMIT_IP_META = 'REMOTE_ADDR'  # atrás de um proxy, por exemplo 'HTTP_X_REAL_IP'
+RATE_LIMIT_EXEMPT_PATHS = ['/static/']
@@ -0,0 +1,13 @@
+"""Perfil de desenvolvimento (DJANGO_ENV=dev, o padrão)."""
+from .base import *  # noqa: F401,F403
+
+# SECURITY WARNING: keep the secret key used in production secret!
+SECRET_KEY = 'django-insecure-e8udzc=_4k(4ym3n-l#99ugoq_%mb46^6)18(51+=$$%d_5p%t'
+
+# SECURITY WARNING: don't run with debug turned on in production!
+DEBUG = True
+
+ALLOWED_HOSTS = ['10.0.0.25', 'localhost']
+
+# os resumos de prazo saem no console
+EMAIL_BACKEND = 'django.core.mail.backends.console.EmailBackend'
@@ -0,0 +1,100 @@
+"""Perfil de produção (DJANGO_ENV=prod).
+
+Valores sensíveis e dependentes do servidor vêm de variáveis de ambiente:
+DJANGO_SECRET_KEY (obrigatória), DJANGO_ALLOWED_HOSTS (separados por
+vírgula), DJANGO_REDIS_URL, DJANGO_STATIC_ROOT e DJANGO_LOG_LEVEL.
+"""
+import copy
+import os
+
+from django.core.exceptions import ImproperlyConfigured
+
+from .base import *  # noqa: F401,F403
+from .base import BASE_DIR, DATABASES, MIDDLEWARE, TEMPLATES
+
+try:
+    SECRET_KEY = os.environ['DJANGO_SECRET_KEY']
+except KeyError:
+    raise ImproperlyConfigured('Defina DJANGO_SECRET_KEY para o perfil de produção.')
+
+# com DEBUG ligado toda consulta SQL fica guardada em connection.queries
+DEBUG = False
+
+ALLOWED_HOSTS = [host.strip() for host in os.environ.get('DJANGO_ALLOWED_HOSTS', '').split(',') if host.strip()]
+
+# Templates compilados uma vez por processo (sem APP_DIRS, que é incompatível com 'loaders')
+TEMPLATES = [{
+    **TEMPLATES[0],
+    'APP_DIRS': False,
+    'OPTIONS': {
+        **TEMPLATES[0]['OPTIONS'],
+        'loaders': [
+            ('django.template.loaders.cached.Loader', [
+                'django.template.loaders.filesystem.Loader',
+                'django.template.loaders.app_directories.Loader',
+            ]),
+        ],
+    },
+}]
+
+# Conexões reaproveitadas entre requisições (checadas antes do uso) e SQLite em WAL,
+# que deixa as leituras rodarem durante uma escrita
+DATABASES = copy.deepcopy(DATABASES)
+for database in DATABASES.values():
+    database['CONN_MAX_AGE'] = 600
+    database['CONN_HEALTH_CHECKS'] = True
+    if database['ENGINE'] == 'django.db.backends.sqlite3':
+        options = database.setdefault('OPTIONS', {})
+        init_command = options.get('init_command', '')
+        options['init_command'] = ';'.join(filter(None, [
+            init_command, 'PRAGMA journal_mode=WAL', 'PRAGMA synchronous=NORMAL',
+        ]))
+        options.setdefault('transaction_mode', 'IMMEDIATE')
+
+# Cache compartilhado entre os processos: os contadores de notificações usam incr/decr,
+# e a lista de países (users/countries.py) é montada uma vez por idioma
+if os.environ.get('DJANGO_REDIS_URL'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.environ['DJANGO_REDIS_URL'],
+            'TIMEOUT': 3600,
+        },
+    }
+else:
+    # sem Redis, um cache por processo (perf_check avisa)
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'OPTIONS': {'MAX_ENTRIES': 10_000},
+        },
+    }
+
+SESSION_ENGINE = 'django.contrib.sessions.backends.cached_db'
+
+# Arquivos estáticos com hash no nome (cache longo no navegador); rode collectstatic no deploy
+STATIC_ROOT = os.environ.get('DJANGO_STATIC_ROOT', BASE_DIR / 'staticfiles')
+STORAGES = {
+    'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+    'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.ManifestStaticFilesStorage'},
+}
+
+# Respostas comprimidas; o GZipMiddleware precisa vir antes de quem altera o corpo
+MIDDLEWARE = ['django.middleware.gzip.GZipMiddleware', *MIDDLEWARE]
+
+# Logging só de WARNING para cima (INFO com DJANGO_LOG_LEVEL): mensagens de DEBUG
+# são descartadas pelo nível do logger, antes de qualquer formatação
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'formatters': {
+        'plain': {'format': '{asctime} {levelname} {name}: {message}', 'style': '{'},
+    },
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler', 'formatter': 'plain'},
+    },
+    'root': {'handlers': ['console'], 'level': os.environ.get('DJANGO_LOG_LEVEL', 'WARNING')},
+    'loggers': {
+        'django.db.backends': {'level': 'WARNING', 'handlers': [], 'propagate': True},
+    },
+}
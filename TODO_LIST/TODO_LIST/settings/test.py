@@ -0,0 +1,15 @@
+"""Perfil dos testes (DJANGO_ENV=test; `manage.py test` o escolhe sozinho)."""
+from .dev import *  # noqa: F401,F403
+from .dev import DATABASES
+
+# segundo shard usado só pelos testes de particionamento (fica fora de PROJECT_SHARDS;
+# os testes o ligam com override_settings). Em memória: nenhum arquivo é criado.
+DATABASES = {
+    **DATABASES,
+    'shard_test': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': ':memory:',
+        # as FKs para users_user apontam para outro banco
+        'OPTIONS': {'init_command': 'PRAGMA foreign_keys = OFF'},
+    },
+}
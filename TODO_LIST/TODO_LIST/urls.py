@@ -24,6 +24,8 @@ urlpatterns = [
     path('users/',include('users.urls')),
     path('projects/',include('projects.urls')),
     path('tasks/',include('tasks.urls')),
+    path('jobs/',include('jobs.urls')),
+    path('notifications/',include('notifications.urls')),
     path('users/login/', auth_views.LoginView.as_view(template_name='registration/login.html'), name='login'),
     path('users/logout/', auth_views.LogoutView.as_view(next_page='/users/login/'), name='logout'),
 ]
@@ -0,0 +1,86 @@
+"""Verificações de desempenho das configurações (tag 'performance').
+
+Rodam com `manage.py perf_check` e com `manage.py check --deploy`; o perfil
+de produção (TODO_LIST/settings/prod.py) não deve gerar nenhum aviso.
+"""
+import logging
+
+from django.conf import settings
+from django.core.checks import Warning, register
+from django.db import connections
+
+PERFORMANCE = 'performance'
+
+
+@register(PERFORMANCE, deploy=True)
+def check_settings(app_configs=None, **kwargs):
+    from django.template import engines
+    from django.template.loaders.cached import Loader as CachedLoader
+
+    warnings = []
+    if settings.DEBUG:
+        warnings.append(Warning(
+            'DEBUG está ligado: toda consulta SQL fica guardada em connection.queries.',
+            hint='Use DJANGO_ENV=prod.', id='core.W001',
+        ))
+    for engine in engines.all():
+        loaders = getattr(getattr(engine, 'engine', None), 'template_loaders', None)
+        if loaders is not None and not any(isinstance(loader, CachedLoader) for loader in loaders):
+            warnings.append(Warning(
+                f'Os templates de {engine.name!r} são lidos e compilados a cada renderização.',
+                hint="Envolva os loaders em 'django.template.loaders.cached.Loader'.", id='core.W002',
+            ))
+    for alias, database in settings.DATABASES.items():
+        if not database.get('CONN_MAX_AGE'):
+            warnings.append(Warning(
+                f'O banco {alias!r} abre uma conexão nova a cada requisição.',
+                hint='Defina CONN_MAX_AGE (e CONN_HEALTH_CHECKS).', id='core.W003',
+            ))
+    backend = settings.CACHES.get('default', {}).get('BACKEND', '')
+    if backend.endswith(('locmem.LocMemCache', 'dummy.DummyCache')):
+        warnings.append(Warning(
+            'O cache padrão não é compartilhado entre os processos (contadores de notificação e '
+            'listas em cache ficam um por processo).',
+            hint='Defina DJANGO_REDIS_URL ou outro backend compartilhado.', id='core.W004',
+        ))
+    staticfiles = settings.STORAGES.get('staticfiles', {}).get('BACKEND', '')
+    if not staticfiles.endswith('ManifestStaticFilesStorage'):
+        warnings.append(Warning(
+            'Os arquivos estáticos não têm hash no nome e não podem ter cache longo no navegador.',
+            hint='Use ManifestStaticFilesStorage e rode collectstatic.', id='core.W005',
+        ))
+    if 'django.middleware.gzip.GZipMiddleware' not in settings.MIDDLEWARE:
+        warnings.append(Warning(
+            'As respostas não são comprimidas.',
+            hint="Adicione 'django.middleware.gzip.GZipMiddleware' no início do MIDDLEWARE.", id='core.W006',
+        ))
+    if logging.getLogger('django.db.backends').isEnabledFor(logging.DEBUG):
+        warnings.append(Warning(
+            'O logger django.db.backends aceita DEBUG: cada consulta SQL vira uma mensagem de log.',
+            hint="Suba o nível dele (ou do root) para 'WARNING' em LOGGING.", id='core.W007',
+        ))
+    if settings.SESSION_ENGINE == 'django.contrib.sessions.backends.db':
+        warnings.append(Warning(
+            'A sessão é lida do banco em toda requisição autenticada.',
+            hint="Use 'django.contrib.sessions.backends.cached_db'.", id='core.W008',
+        ))
+    return warnings
+
+
+@register(PERFORMANCE, deploy=True)
+def check_sqlite_journal(app_configs=None, databases=None, **kwargs):
+    """Consulta cada banco SQLite; só roda quando a verificação recebe `databases`."""
+    warnings = []
+    for alias in databases or ():
+        connection = connections[alias]
+        if connection.vendor != 'sqlite':
+            continue
+        with connection.cursor() as cursor:
+            cursor.execute('PRAGMA journal_mode')
+            mode = cursor.fetchone()[0]
+        if mode.lower() != 'wal':
+            warnings.append(Warning(
+                f'O banco {alias!r} usa journal_mode={mode}: as leituras esperam as escritas.',
+                hint="Inclua 'PRAGMA journal_mode=WAL' no init_command do banco.", id='core.W009',
+            ))
+    return warnings
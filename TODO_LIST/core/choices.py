@@ -8,12 +8,19 @@ class TaskStatus(models.TextChoices):
     CANCELED = 'canceled', 'Cancelado'
 
 
+# status em que a tarefa ainda está em aberto (nem concluída nem cancelada)
+OPEN_TASK_STATUSES = [status for status in TaskStatus if status not in (TaskStatus.COMPLETED, TaskStatus.CANCELED)]
+
+
 class TaskPriority(models.TextChoices   ):
     LOW = 'LOW', 'Baixo'
     MEDIUM = 'MEDIUM', 'Medio'
     HIGH = 'HIGH', 'Alto'
 
 
+# ordem de exibição da caixa de entrada: as mais urgentes primeiro
+TASK_PRIORITY_ORDER = {TaskPriority.HIGH: 0, TaskPriority.MEDIUM: 1, TaskPriority.LOW: 2}
+
 
 class ProjectStatus(models.TextChoices):
     IN_PROGRESS = 'in_progress', 'Em andamento'
@@ -21,3 +28,35 @@ class ProjectStatus(models.TextChoices):
     CANCELED = 'canceled', 'Cancelado'  
     PENDENT = 'pendent', 'Pendente'
 
+
+
+class TaskEvent(models.IntegerChoices):
+    CREATED = 1, 'Criada'
+    UPDATED = 2, 'Editada'
+    STATUS_CHANGED = 3, 'Status alterado'
+    REASSIGNED = 4, 'Responsável alterado'
+    DELETED = 5, 'Excluída'
+
+
+class NotificationKind(models.IntegerChoices):
+    TASK_ASSIGNED = 1, 'Tarefa atribuída'
+    PROJECT_JOINED = 2, 'Adicionado a um projeto'
+
+
+class JobStatus(models.TextChoices):
+    QUEUED = 'queued', 'Na fila'
+    RUNNING = 'running', 'Executando'
+    SUCCEEDED = 'succeeded', 'Concluído'
+    FAILED = 'failed', 'Falhou'
+
+
+class RecurrenceFrequency(models.TextChoices):
+    DAILY = 'daily', 'Diária'
+    WEEKLY = 'weekly', 'Semanal'
+    MONTHLY = 'monthly', 'Mensal'
+
+
+class ChangeKind(models.IntegerChoices):
+    TASK = 1, 'Tarefa'
+    PROJECT = 2, 'Projeto'
+    ACCESS = 3, 'Acesso ao projeto'
@@ -0,0 +1,121 @@
+"""Exclusão em cascata por conjuntos, em lotes.
+
+O `Collector` do Django carrega em memória todas as linhas relacionadas antes
+de apagar qualquer coisa e faz tudo numa transação só. Para apagar um projeto
+com centenas de milhares de tarefas isso trava a requisição e segura o lock de
+escrita do SQLite por muito tempo.
+
+`fast_delete` segue as mesmas regras de `on_delete` dos models, mas apaga com
+`DELETE ... WHERE pk IN (...)` em lotes, sempre dos filhos para os pais, com
+uma transação curta por lote. Se o processo parar no meio nada fica órfão:
+os filhos de uma linha sempre somem antes dela.
+"""
+from collections import Counter
+
+from django.db import models, router, transaction
+from django.db.models import signals
+from django.db.models.deletion import get_candidate_relations_to_delete
+
+
+class FastDeleter:
+    def __init__(self, using, origin=None, chunk_size=1000, send_signals=True, progress=None):
+        self.using = using
+        self.origin = origin
+        self.chunk_size = chunk_size
+        self.send_signals = send_signals
+        self.progress = progress
+        self.deleted = Counter()
+
+    @staticmethod
+    def has_signal_listeners(model):
+        return signals.pre_delete.has_listeners(model) or signals.post_delete.has_listeners(model)
+
+    @classmethod
+    def can_handle(cls, model, seen=None):
+        """False se algum model da cascata exigir o Collector (PROTECT, RESTRICT, SET(...) ou herança)."""
+        seen = seen if seen is not None else set()
+        if model in seen:
+            return True
+        seen.add(model)
+        if model._meta.parents:
+            return False
+        for related in get_candidate_relations_to_delete(model._meta):
+            on_delete = related.field.remote_field.on_delete
+            if on_delete not in (models.CASCADE, models.SET_NULL, models.SET_DEFAULT, models.DO_NOTHING):
+                return False
+            if on_delete is models.CASCADE and not cls.can_handle(related.related_model, seen):
+                return False
+        return True
+
+    def delete_queryset(self, queryset):
+        """Apaga as linhas do queryset (e a cascata), `chunk_size` linhas por vez."""
+        model = queryset.model
+        pks = queryset.order_by().values_list('pk', flat=True)
+        while True:
+            # o queryset é reavaliado a cada volta: as linhas já apagadas não aparecem mais
+            chunk = list(pks[:self.chunk_size])
+            if not chunk:
+                break
+            self.delete_pks(model, chunk)
+            if len(chunk) < self.chunk_size:
+                break
+
+    def delete_related(self, model, pks):
+        """Aplica o on_delete das relações que apontam para as linhas `pks` de `model`."""
+        for related in get_candidate_relations_to_delete(model._meta):
+            field = related.field
+            on_delete = field.remote_field.on_delete
+            if on_delete is models.DO_NOTHING:
+                continue
+            if not router.allow_migrate_model(self.using, related.related_model):
+                continue  # tabela que não existe neste banco (ver core/sharding.py)
+            children = related.related_model._base_manager.using(self.using).filter(
+                **{f'{field.name}__in': pks}
+            )
+            if on_delete is models.CASCADE:
+                self.delete_queryset(children)
+            elif on_delete is models.SET_NULL:
+                children.update(**{field.name: None})
+            elif on_delete is models.SET_DEFAULT:
+                children.update(**{field.name: field.get_default()})
+
+    def delete_pks(self, model, pks):
+        manager = model._base_manager.using(self.using)
+
+        # 1) relações que apontam para estas linhas, na ordem de dependência
+        self.delete_related(model, pks)
+
+        # 2) as próprias linhas, numa transação curta
+        with transaction.atomic(using=self.using, savepoint=False):
+            if self.send_signals and self.has_signal_listeners(model):
+                instances = list(manager.filter(pk__in=pks))
+                for instance in instances:
+                    signals.pre_delete.send(sender=model, instance=instance, using=self.using, origin=self.origin)
+                count = manager.filter(pk__in=pks)._raw_delete(self.using)
+                for instance in instances:
+                    signals.post_delete.send(sender=model, instance=instance, using=self.using, origin=self.origin)
+            else:
+                count = manager.filter(pk__in=pks)._raw_delete(self.using)
+
+        self.deleted[model._meta.label] += count
+        if self.progress:
+            self.progress(model._meta.label, sum(self.deleted.values()))
+
+
+def fast_delete(queryset, chunk_size=1000, send_signals=True, progress=None):
+    """Apaga `queryset` com a mesma cascata de `QuerySet.delete()`, em lotes.
+
+    Retorna o mesmo formato de `QuerySet.delete()`: (total, {label: quantidade}).
+    Com `send_signals=False` os sinais pre_delete/post_delete não são enviados;
+    quando enviados, as instâncias são carregadas só do lote atual. Se algum
+    model da cascata usar PROTECT/RESTRICT/SET(...) ou herança multi-tabela, cai no
+    `QuerySet.delete()` do Django, que sabe validar esses casos.
+    """
+    model = queryset.model
+    if not FastDeleter.can_handle(model):
+        return queryset.delete()
+
+    using = queryset.db
+    deleter = FastDeleter(using, origin=queryset, chunk_size=chunk_size, send_signals=send_signals, progress=progress)
+    deleter.delete_queryset(queryset)
+    return sum(deleter.deleted.values()), dict(deleter.deleted)
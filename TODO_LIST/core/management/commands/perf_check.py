@@ -0,0 +1,26 @@
+from django.core.checks import ERROR, WARNING
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from core.checks import PERFORMANCE
+
+
+class Command(BaseCommand):
+    help = (
+        'Verifica as configurações que afetam o desempenho (core/checks.py) e avisa o que falta. '
+        'Rode ao subir a aplicação; com --strict, qualquer aviso faz o comando falhar.'
+    )
+    requires_system_checks = []
+
+    def add_arguments(self, parser):
+        parser.add_argument('--strict', action='store_true', help='Falha (código 1) se houver avisos.')
+        parser.add_argument('--skip-db', action='store_true', help='Não consulta os bancos.')
+
+    def handle(self, *args, **options):
+        self.check(
+            tags=[PERFORMANCE],
+            include_deployment_checks=True,
+            display_num_errors=True,
+            fail_level=WARNING if options['strict'] else ERROR,
+            databases=[] if options['skip_db'] else list(connections),
+        )
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from core.ratelimit import fired_counts
+
+
+class Command(BaseCommand):
+    help = 'Quantas requisições o limite de taxa (core/ratelimit.py) recusou nas últimas horas.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--hours', type=int, default=24)
+
+    def handle(self, *args, **options):
+        for (scope, kind), counts in sorted(fired_counts(options['hours']).items()):
+            recent = ' '.join(str(count) for count in counts[-6:])
+            self.stdout.write(f'{scope}/{kind}: {sum(counts)} recusa(s) em {options["hours"]}h (últimas horas: {recent})')
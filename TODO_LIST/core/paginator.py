@@ -0,0 +1,55 @@
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.utils import DatabaseError
+from django.utils.functional import cached_property
+
+
+def estimate_table_rows(model, using='default'):
+    """Número aproximado de linhas da tabela do model, sem COUNT(*).
+
+    No SQLite usa as estatísticas do ANALYZE (sqlite_stat1) quando existem e,
+    caso contrário, o maior rowid, que é um limite superior lido direto do
+    fim da B-tree. Retorna None quando não há como estimar.
+    """
+    connection = connections[using]
+    table = model._meta.db_table
+    try:
+        with connection.cursor() as cursor:
+            if connection.vendor == 'postgresql':
+                cursor.execute('SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass', [table])
+                row = cursor.fetchone()
+                return row[0] if row and row[0] >= 0 else None
+
+            if connection.vendor == 'sqlite':
+                cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'sqlite_stat1'")
+                if cursor.fetchone():
+                    cursor.execute('SELECT stat FROM sqlite_stat1 WHERE tbl = %s LIMIT 1', [table])
+                    row = cursor.fetchone()
+                    if row and row[0]:
+                        return int(row[0].split()[0])
+                cursor.execute('SELECT MAX(rowid) FROM %s' % connection.ops.quote_name(table))
+                row = cursor.fetchone()
+                return row[0] or 0
+    except DatabaseError:
+        return None
+    return None
+
+
+class EstimatedCountPaginator(Paginator):
+    """Paginator que troca o COUNT(*) exato por uma estimativa em tabelas grandes.
+
+    A estimativa só é usada quando a listagem não tem filtro nenhum (a tabela
+    inteira) e passa de `estimate_threshold` linhas; com filtros ou em tabelas
+    pequenas o comportamento é o do Paginator padrão.
+    """
+    estimate_threshold = 100_000
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        query = getattr(queryset, 'query', None)
+        if query is not None and not query.where and not query.distinct:
+            estimate = estimate_table_rows(queryset.model, queryset.db)
+            if estimate is not None and estimate > self.estimate_threshold:
+                return estimate
+        return super().count
@@ -0,0 +1,97 @@
+"""Chaves de ordenação lexicográficas (fractional indexing).
+
+Cada chave é uma fração em base 62 escrita só com os dígitos após a vírgula
+('V' = 31/62, 'V8' = 31/62 + 8/62², ...). Como os dígitos estão em ordem
+ASCII, comparar as strings dá a mesma ordem que comparar as frações, então o
+banco ordena direto pela coluna. Entre duas chaves sempre existe outra, o que
+permite mover um item gravando só a linha dele.
+
+As chaves nunca terminam em '0' ('V' e 'V0' seriam a mesma fração).
+"""
+DIGITS = '0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz'
+BASE = len(DIGITS)
+
+# largura usada ao acrescentar no fim/início de uma coluna: 62**4 posições sem crescer a chave
+STEP_WIDTH = 4
+
+
+def _midpoint(a, b):
+    """Chave entre a e b ('' = 0, None = 1), sem zeros à direita."""
+    if b is not None:
+        # prefixo comum (completando `a` com zeros)
+        n = 0
+        while n < len(b) and (a[n] if n < len(a) else '0') == b[n]:
+            n += 1
+        if n > 0:
+            return b[:n] + _midpoint(a[n:], b[n:])
+
+    digit_a = DIGITS.index(a[0]) if a else 0
+    digit_b = DIGITS.index(b[0]) if b is not None else BASE
+    if digit_b - digit_a > 1:
+        return DIGITS[(digit_a + digit_b + 1) // 2]
+    # dígitos consecutivos: resolve na próxima casa
+    if b is not None and len(b) > 1:
+        return b[:1]
+    return DIGITS[digit_a] + _midpoint(a[1:], None)
+
+
+def rank_between(before=None, after=None):
+    """Chave estritamente entre `before` e `after` (None ou '' = sem limite daquele lado)."""
+    before = before or ''
+    if after and before >= after:
+        raise ValueError(f'Chaves fora de ordem: {before!r} >= {after!r}.')
+    return _midpoint(before, after or None)
+
+
+def _to_int(key):
+    value = 0
+    for char in key.ljust(STEP_WIDTH, '0')[:STEP_WIDTH]:
+        value = value * BASE + DIGITS.index(char)
+    return value
+
+
+def _from_int(value):
+    chars = []
+    for _ in range(STEP_WIDTH):
+        value, digit = divmod(value, BASE)
+        chars.append(DIGITS[digit])
+    return ''.join(reversed(chars)).rstrip('0')
+
+
+def rank_after(key):
+    """Próxima chave depois de `key` para acrescentar no fim, sem aumentar o tamanho da chave."""
+    if not key:
+        return rank_between()
+    if len(key) <= STEP_WIDTH:
+        value = _to_int(key) + 1
+        if value < BASE ** STEP_WIDTH:
+            return _from_int(value)
+    return rank_between(key, None)
+
+
+def rank_before(key):
+    """Chave imediatamente antes de `key` para inserir no início."""
+    if not key:
+        return rank_between()
+    if len(key) <= STEP_WIDTH:
+        value = _to_int(key) - 1
+        if value > 0:
+            return _from_int(value)
+    return rank_between(None, key)
+
+
+def spread_ranks(count):
+    """`count` chaves em ordem crescente, espaçadas igualmente (para ordenar ou reordenar uma coluna)."""
+    width = 1
+    while BASE ** width <= count + 1:
+        width += 1
+    space = BASE ** width
+    ranks = []
+    for index in range(1, count + 1):
+        value = index * space // (count + 1)
+        chars = []
+        for _ in range(width):
+            value, digit = divmod(value, BASE)
+            chars.append(DIGITS[digit])
+        ranks.append(''.join(reversed(chars)).rstrip('0'))
+    return ranks
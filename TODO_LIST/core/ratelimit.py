@@ -0,0 +1,192 @@
+"""Limite de requisições por usuário e por IP, para um cliente não monopolizar o único escritor do SQLite.
+
+Cada identidade (usuário autenticado e IP) tem um token bucket para
+leituras (GET/HEAD/OPTIONS) e outro para escritas, configurados em
+RATE_LIMITS como (fichas por segundo, tamanho do balde). Acima do limite a
+resposta é 429 com Retry-After.
+
+Duas camadas:
+
+- o balde local, num dicionário do processo, sem trava nem I/O: um cliente
+  martelando o servidor é recusado sem consultar os baldes do cache. Threads
+  concorrentes podem deixar passar uma ficha a mais, o que é aceitável aqui;
+- quando o cache padrão é compartilhado (Redis, por exemplo), uma janela de
+  `balde / taxa` segundos com no máximo `balde` requisições, contada com
+  `add`/`incr` (atômicos no backend), soma o que passou em todos os
+  processos. Com LocMemCache (um cache por processo) essa camada seria
+  redundante e é pulada.
+
+Uma requisição só gasta ficha se todos os escopos (usuário e IP) a
+aceitarem: os baldes locais são conferidos antes de qualquer consumo, e as
+contagens do cache já feitas são devolvidas (`decr`) quando um escopo
+seguinte recusa. Assim as recusas por IP não consomem a cota do usuário.
+
+Cada recusa incrementa um contador por hora no cache (ver `fired_counts` e o
+comando `ratelimit_stats`): é a única escrita no cache de uma requisição
+recusada pelo balde local.
+"""
+import logging
+import math
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import DEFAULT_CACHE_ALIAS, cache, caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.http import HttpResponse
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+# acima disso o dicionário local é esvaziado (os baldes recomeçam cheios)
+MAX_LOCAL_KEYS = 10_000
+METRICS_TTL = 48 * 3600
+
+# chave -> [fichas, instante da última atualização]
+_buckets = {}
+
+
+def _local_wait(key, rate, burst, now):
+    """Segundos até o balde local ter uma ficha (0 se já tem), sem consumir."""
+    bucket = _buckets.get(key)
+    if bucket is None:
+        return 0
+    tokens = min(burst, bucket[0] + (now - bucket[1]) * rate)
+    return 0 if tokens >= 1 else (1 - tokens) / rate
+
+
+def _take_local(key, rate, burst, now):
+    """Tira uma ficha do balde local (já conferido com `_local_wait`)."""
+    bucket = _buckets.get(key)
+    if bucket is None:
+        if len(_buckets) >= MAX_LOCAL_KEYS:
+            _buckets.clear()
+        bucket = _buckets[key] = [float(burst), now]
+    bucket[0] = max(min(burst, bucket[0] + (now - bucket[1]) * rate) - 1, 0)
+    bucket[1] = now
+
+
+def _shared_key(key, rate, burst, now):
+    period = burst / rate
+    window = int(now // period)
+    return f'ratelimit:{key}:{window}', period, window
+
+
+def _take_shared(key, rate, burst, now):
+    """Conta a requisição na janela atual do cache; devolve 0 ou os segundos até a próxima janela."""
+    cache_key, period, window = _shared_key(key, rate, burst, now)
+    if cache.add(cache_key, 1, math.ceil(period) + 1):
+        return 0
+    try:
+        count = cache.incr(cache_key)
+    except ValueError:
+        return 0  # a chave expirou entre o add e o incr
+    if count <= burst:
+        return 0
+    return (window + 1) * period - now
+
+
+def _refund_shared(key, rate, burst, now):
+    """Desfaz a contagem de `_take_shared` de uma requisição que acabou recusada."""
+    try:
+        cache.decr(_shared_key(key, rate, burst, now)[0])
+    except ValueError:
+        pass  # a janela já expirou
+
+
+def _shared_cache():
+    return not isinstance(caches[DEFAULT_CACHE_ALIAS], (LocMemCache, DummyCache))
+
+
+def _hour(moment):
+    return moment.strftime('%Y%m%d%H')
+
+
+def record_limited(scope, kind):
+    key = f'ratelimit:fired:{scope}:{kind}:{_hour(timezone.now())}'
+    if not cache.add(key, 1, METRICS_TTL):
+        try:
+            cache.incr(key)
+        except ValueError:
+            pass
+
+
+def fired_counts(hours=24):
+    """{(escopo, tipo): [recusas por hora, da mais antiga à atual]} das últimas `hours` horas."""
+    now = timezone.now()
+    stamps = [_hour(now - timedelta(hours=offset)) for offset in reversed(range(hours))]
+    series = {(scope, kind): [] for scope, kinds in settings.RATE_LIMITS.items() for kind in kinds}
+    keys = {(scope, kind, stamp): f'ratelimit:fired:{scope}:{kind}:{stamp}' for scope, kind in series for stamp in stamps}
+    values = cache.get_many(keys.values())
+    for (scope, kind, stamp), key in keys.items():
+        series[scope, kind].append(values.get(key, 0))
+    return series
+
+
+def client_ip(request):
+    return request.META.get(getattr(settings, 'RATE_LIMIT_IP_META', 'REMOTE_ADDR'), '') or 'desconhecido'
+
+
+class RateLimitMiddleware:
+    """Aplica RATE_LIMITS a cada requisição; deve vir depois do AuthenticationMiddleware."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.shared = _shared_cache()
+
+    def __call__(self, request):
+        if getattr(settings, 'RATE_LIMIT_ENABLED', True) and not request.path.startswith(
+            tuple(getattr(settings, 'RATE_LIMIT_EXEMPT_PATHS', ()))
+        ):
+            response = self.check(request)
+            if response is not None:
+                return response
+        return self.get_response(request)
+
+    def identities(self, request):
+        if request.user.is_authenticated:
+            yield 'user', request.user.pk
+        yield 'ip', client_ip(request)
+
+    def limits(self, request, kind):
+        """[(escopo, identidade, chave, taxa, balde)] que valem para a requisição."""
+        limits = []
+        for scope, ident in self.identities(request):
+            limit = settings.RATE_LIMITS.get(scope, {}).get(kind)
+            if limit:
+                limits.append((scope, ident, f'{scope}:{kind}:{ident}', *limit))
+        return limits
+
+    def check(self, request):
+        kind = 'read' if request.method in SAFE_METHODS else 'write'
+        now = time.time()
+        limits = self.limits(request, kind)
+        refused = [
+            (scope, ident, wait) for scope, ident, key, rate, burst in limits
+            if (wait := _local_wait(key, rate, burst, now))
+        ]
+        if not refused and self.shared:
+            taken = []
+            for scope, ident, key, rate, burst in limits:
+                wait = _take_shared(key, rate, burst, now)
+                taken.append((key, rate, burst))
+                if wait:
+                    for args in taken:
+                        _refund_shared(*args, now)
+                    refused = [(scope, ident, wait)]
+                    break
+        if refused:
+            return self.refuse(kind, refused)
+        for _, _, key, rate, burst in limits:
+            _take_local(key, rate, burst, now)
+        return None
+
+    def refuse(self, kind, refused):
+        for scope, ident, _ in refused:
+            record_limited(scope, kind)
+            logger.info('Limite de %s (%s) atingido por %s', kind, scope, ident)
+        response = HttpResponse('Muitas requisições. Tente novamente em instantes.', status=429)
+        response['Retry-After'] = str(max(1, math.ceil(max(wait for _, _, wait in refused))))
+        return response
@@ -0,0 +1,210 @@
+"""Particionamento horizontal: projetos e suas tarefas espalhados por vários bancos.
+
+PROJECT_SHARDS lista os aliases de DATABASES que guardam projetos (o
+primeiro costuma ser o próprio 'default'). Os models dos apps de
+SHARDED_APPS ficam no shard do projeto; o resto (usuários, sessões, jobs,
+notificações e o diretório projects.ProjectShard) fica só no 'default'.
+Com um único shard, que é a configuração padrão, nada muda: tudo vai para o
+'default' e nenhuma consulta extra é feita.
+
+Como o banco de cada consulta é escolhido:
+
+- numa requisição ligada a um projeto ou tarefa, o ShardMiddleware
+  (projects/shards.py) fixa o shard com `pin()` e o ShardRouter manda para ele
+  todas as consultas dos models particionados;
+- fora disso vale o banco da instância (ex.: `project.task_set` lê do shard
+  de onde `project` veio) ou um `.using(alias)` explícito;
+- listas de vários projetos (projetos do usuário, "minhas tarefas") consultam
+  cada shard com `fan_out` e intercalam os resultados já ordenados.
+
+Os ids precisam ser únicos entre os shards, porque o mesmo id de tarefa é
+usado em URLs e pode mudar de shard junto com o projeto. Os projetos recebem
+o id do diretório no 'default'; as demais tabelas começam em
+`posição do shard * SHARD_ID_SPAN` (ver `seed_sequences`).
+
+As FKs de tabelas particionadas para users_user não existem nos outros
+shards: esses bancos precisam de `'OPTIONS': {'init_command': 'PRAGMA foreign_keys = OFF'}`,
+e a exclusão de um usuário limpa os shards explicitamente (projects.shards.delete_user_rows).
+"""
+import heapq
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.apps import apps
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections, router
+
+SHARD_ID_SPAN = 10 ** 12
+
+# shard fixado para a requisição (ou bloco `with pin(...)`) atual
+_pinned = ContextVar('pinned_shard', default=None)
+
+
+def shard_aliases():
+    return list(getattr(settings, 'PROJECT_SHARDS', None) or [DEFAULT_DB_ALIAS])
+
+
+def is_sharded_setup():
+    return len(shard_aliases()) > 1
+
+
+def is_sharded(model):
+    meta = model._meta
+    if meta.label_lower in getattr(settings, 'UNSHARDED_MODELS', ()):
+        return False
+    return meta.app_label in getattr(settings, 'SHARDED_APPS', ())
+
+
+def pinned_shard():
+    return _pinned.get()
+
+
+def pin_shard(alias):
+    """Fixa o shard até `unpin_shard(token)`; prefira `with pin(alias)`."""
+    return _pinned.set(alias)
+
+
+def unpin_shard(token):
+    _pinned.reset(token)
+
+
+@contextmanager
+def pin(alias):
+    """Manda as consultas dos models particionados para `alias` dentro do bloco."""
+    token = pin_shard(alias)
+    try:
+        yield alias
+    finally:
+        unpin_shard(token)
+
+
+def db_for(model):
+    """Alias em que `model` deve ser lido/escrito agora (para SQL direto e transaction.atomic)."""
+    return router.db_for_write(model)
+
+
+def connection_for(model):
+    return connections[db_for(model)]
+
+
+def read_aliases(model):
+    """Shards a consultar para uma lista de `model`: o fixado, se houver; senão todos."""
+    if not is_sharded(model):
+        return [DEFAULT_DB_ALIAS]
+    pinned = pinned_shard()
+    return [pinned] if pinned else shard_aliases()
+
+
+def fan_out(queryset, key, reverse=False, limit=None):
+    """Executa `queryset` em cada shard e intercala os resultados pela ordem `key`.
+
+    `queryset` já deve vir ordenado pela mesma chave; cada shard devolve no
+    máximo `limit` linhas e o resultado final também é cortado em `limit`.
+    Com um shard só é a própria consulta.
+    """
+    aliases = read_aliases(queryset.model)
+    if len(aliases) == 1:
+        rows = queryset.using(aliases[0])
+        return list(rows[:limit] if limit is not None else rows)
+    parts = [list(queryset.using(alias)[:limit] if limit is not None else queryset.using(alias)) for alias in aliases]
+    merged = heapq.merge(*parts, key=key, reverse=reverse)
+    return [row for _, row in zip(range(limit), merged)] if limit is not None else list(merged)
+
+
+class FanOutList:
+    """Lista ordenada espalhada pelos shards, no formato que o Paginator espera.
+
+    `count()` soma as contagens de cada shard; um fatiamento [a:b] busca as
+    primeiras b linhas de cada shard e intercala.
+    """
+
+    def __init__(self, queryset, key, reverse=False):
+        self.queryset = queryset
+        self.model = queryset.model
+        self.key = key
+        self.reverse = reverse
+
+    def count(self):
+        return sum(self.queryset.using(alias).count() for alias in read_aliases(self.model))
+
+    def __len__(self):
+        return self.count()
+
+    def __iter__(self):
+        return iter(fan_out(self.queryset, self.key, self.reverse))
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return fan_out(self.queryset, self.key, self.reverse, limit=index.stop)[index]
+        return self[index:index + 1][0]
+
+
+def sharded_list(queryset, key, reverse=False):
+    """O próprio queryset com um shard só; senão um FanOutList com a mesma ordem."""
+    if len(read_aliases(queryset.model)) == 1:
+        return queryset.using(read_aliases(queryset.model)[0])
+    return FanOutList(queryset, key, reverse)
+
+
+class ShardRouter:
+    """Escolhe o shard dos models de SHARDED_APPS; os demais ficam no 'default'."""
+
+    def _db(self, model, hints):
+        # __class__ e não type(): a dica pode ser um SimpleLazyObject (request.user)
+        if not is_sharded(model):
+            # sem isto o Django usaria o banco da instância da dica (ex.: o dono de uma tarefa de outro shard)
+            return DEFAULT_DB_ALIAS
+        pinned = pinned_shard()
+        if pinned:
+            return pinned
+        instance = hints.get('instance')
+        if instance is not None and is_sharded(instance.__class__) and instance._state.db:
+            return instance._state.db
+        return None
+
+    def db_for_read(self, model, **hints):
+        return self._db(model, hints)
+
+    def db_for_write(self, model, **hints):
+        return self._db(model, hints)
+
+    def allow_relation(self, obj1, obj2, **hints):
+        if is_sharded(obj1.__class__) and is_sharded(obj2.__class__):
+            return obj1._state.db == obj2._state.db
+        return True  # ex.: tarefa num shard apontando para um usuário do 'default'
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db == DEFAULT_DB_ALIAS or db not in shard_aliases():
+            return None
+        if app_label not in getattr(settings, 'SHARDED_APPS', ()):
+            return False
+        if model_name is not None:
+            return f'{app_label}.{model_name}' not in getattr(settings, 'UNSHARDED_MODELS', ())
+        return True
+
+
+def seed_sequences(using=DEFAULT_DB_ALIAS, **kwargs):
+    """Faz as tabelas particionadas do shard `using` gerarem ids a partir de posição * SHARD_ID_SPAN.
+
+    Usa o AUTOINCREMENT do SQLite (sqlite_sequence); é idempotente e só sobe o
+    contador. Ligado ao post_migrate em projects/apps.py.
+    """
+    aliases = shard_aliases()
+    if using not in aliases or aliases.index(using) == 0:
+        return
+    connection = connections[using]
+    if connection.vendor != 'sqlite':
+        return
+    base = aliases.index(using) * SHARD_ID_SPAN
+    tables = [
+        model._meta.db_table for model in apps.get_models(include_auto_created=True)
+        if is_sharded(model) and model._meta.pk.get_internal_type() in ('AutoField', 'BigAutoField')
+    ]
+    with connection.cursor() as cursor:
+        for table in tables:
+            cursor.execute('SELECT seq FROM sqlite_sequence WHERE name = %s', [table])
+            row = cursor.fetchone()
+            if row is None:
+                cursor.execute('INSERT INTO sqlite_sequence (name, seq) VALUES (%s, %s)', [table, base])
+            elif row[0] < base:
+                cursor.execute('UPDATE sqlite_sequence SET seq = %s WHERE name = %s', [base, table])
@@ -0,0 +1,321 @@
+import importlib
+import io
+import os
+import sys
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management import call_command
+from django.core.management.base import SystemCheckError
+from django.db import DEFAULT_DB_ALIAS
+from django.db.models import signals
+from django.http import HttpResponse
+from django.urls import reverse
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+
+from jobs.models import Job
+from jobs.registry import enqueue
+from jobs.worker import claim_job, run_job
+from projects.models import Project, ProjectShard
+from tasks.models import Label, RecurrenceRule, Task, TaskDependency
+from users.models import User
+
+from . import ratelimit
+from .checks import check_settings, check_sqlite_journal
+from .deletion import FastDeleter, fast_delete
+from .ranking import rank_after, rank_before, rank_between, spread_ranks
+from .paginator import EstimatedCountPaginator, estimate_table_rows
+from .ratelimit import RateLimitMiddleware, fired_counts
+from .sharding import ShardRouter, fan_out, pin, read_aliases
+
+SHARDS = ['default', 'shard_test']
+
+
+def make_user():
+    user = User.objects.create_user('dono@example.com', 'Dono', 'senha-123', cpf='1')
+    # o banco de teste do shard é migrado inteiro, com as FKs para users_user: a cópia as satisfaz
+    user.save(using='shard_test', force_insert=True)
+    return user
+
+
+class EstimatedCountPaginatorTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('dono@example.com', 'Dono', 'senha-123', cpf='1')
+        project = Project.objects.create(name='Projeto', owner=self.user)
+        Task.objects.bulk_create([
+            Task(project=project, owner=self.user, name=f'Tarefa {n}', description='', start_date='2026-01-01') for n in range(5)
+        ])
+        # um buraco nos ids: o maior rowid passa a ser um limite superior, não a contagem
+        Task.objects.filter(name='Tarefa 2').delete()
+
+    def test_estimate_is_used_only_for_unfiltered_large_tables(self):
+        max_id = Task.objects.order_by('-pk').values_list('pk', flat=True)[0]
+        self.assertEqual(estimate_table_rows(Task), max_id)
+        paginator = EstimatedCountPaginator(Task.objects.order_by('pk'), 2)
+        self.assertEqual(paginator.count, 4)
+        paginator = EstimatedCountPaginator(Task.objects.order_by('pk'), 2)
+        paginator.estimate_threshold = 3
+        self.assertEqual(paginator.count, max_id)
+        paginator = EstimatedCountPaginator(Task.objects.filter(name__startswith='Tarefa').order_by('pk'), 2)
+        paginator.estimate_threshold = 3
+        self.assertEqual(paginator.count, 4)
+
+    def test_admin_changelists_and_prefix_search(self):
+        admin = User.objects.create_superuser('admin@example.com', 'Admin', 'senha-123', cpf='2')
+        self.client.force_login(admin)
+        for name in ('admin:tasks_task_changelist', 'admin:projects_project_changelist', 'admin:users_user_changelist'):
+            with self.subTest(name=name):
+                self.assertEqual(self.client.get(reverse(name)).status_code, 200)
+        response = self.client.get(reverse('admin:users_user_changelist'), {'q': 'DONO@'})
+        self.assertEqual([user.email for user in response.context['cl'].result_list], ['dono@example.com'])
+
+
+class RankingTests(SimpleTestCase):
+    def test_rank_between_is_strictly_between(self):
+        for before, after in (('', None), ('1', '2'), ('1', '11'), ('az', 'b'), ('U', 'U1'), ('zz', None)):
+            with self.subTest(before=before, after=after):
+                rank = rank_between(before, after)
+                self.assertLess(before, rank)
+                if after:
+                    self.assertLess(rank, after)
+        with self.assertRaises(ValueError):
+            rank_between('b', 'a')
+
+    def test_append_and_prepend_keep_short_keys(self):
+        ranks = ['U']
+        for _ in range(100):
+            ranks.append(rank_after(ranks[-1]))
+            ranks.insert(0, rank_before(ranks[0]))
+        self.assertEqual(ranks, sorted(ranks))
+        self.assertEqual(len(set(ranks)), len(ranks))
+        self.assertLessEqual(max(len(rank) for rank in ranks), 4)
+
+    def test_spread_ranks(self):
+        for count in (1, 61, 62, 1000):
+            ranks = spread_ranks(count)
+            self.assertEqual(len(ranks), count)
+            self.assertEqual(ranks, sorted(set(ranks)))
+            self.assertNotIn('', ranks)
+
+
+class FastDeleteTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('dono@example.com', 'Dono', 'senha-123', cpf='1')
+        self.member = User.objects.create_user('membro@example.com', 'Membro', 'senha-123', cpf='2')
+
+    def make_project(self, name, tasks=5):
+        project = Project.objects.create(name=name, owner=self.user)
+        project.participants.add(self.user, self.member)
+        created = Task.objects.bulk_create([
+            Task(project=project, owner=self.user, assigned_to=self.member, name=f'{name} {n}', description='', start_date='2026-01-01')
+            for n in range(tasks)
+        ])
+        label = Label.objects.create(project=project, name='infra')
+        for task in created:
+            task.labels.add(label)
+        TaskDependency.objects.create(task=created[1], depends_on=created[0])
+        rule = RecurrenceRule.objects.create(template=created[0], starts_on='2026-01-01', next_occurrence='2026-01-02')
+        Task.objects.filter(pk=created[2].pk).update(recurrence=rule)
+        return project
+
+    def test_same_cascade_as_queryset_delete(self):
+        fast, slow = self.make_project('A'), self.make_project('B')
+        progress = []
+        count, per_model = fast_delete(Project.objects.filter(pk=fast.pk), chunk_size=2, progress=lambda label, total: progress.append(total))
+        self.assertEqual((count, per_model), Project.objects.filter(pk=slow.pk).delete())
+        self.assertEqual(per_model['tasks.Task'], 5)
+        self.assertEqual(progress[-1], count)
+        self.assertFalse(Task.objects.exists())
+        self.assertEqual(User.objects.count(), 2)
+
+    def test_set_null_and_signals(self):
+        project = self.make_project('A', tasks=3)
+        deleted = []
+
+        def receiver(sender, instance, **kwargs):
+            deleted.append(instance.pk)
+
+        signals.post_delete.connect(receiver, sender=RecurrenceRule)
+        self.addCleanup(signals.post_delete.disconnect, receiver, sender=RecurrenceRule)
+        rules = RecurrenceRule.objects.filter(template__project=project)
+        rule_ids = list(rules.values_list('pk', flat=True))
+        fast_delete(rules)
+        self.assertEqual(deleted, rule_ids)
+        # Task.recurrence é SET_NULL: a tarefa fica, sem a regra
+        self.assertEqual(Task.objects.filter(project=project).count(), 3)
+        self.assertFalse(Task.objects.filter(recurrence__isnull=False).exists())
+
+    def test_can_handle_the_project_and_user_cascades(self):
+        self.assertTrue(FastDeleter.can_handle(Project))
+        self.assertTrue(FastDeleter.can_handle(User))
+
+    def test_delete_jobs(self):
+        project = self.make_project('A')
+        enqueue('projects.delete_project', project_id=project.pk)
+        run_job(claim_job('w1'))
+        self.assertEqual(Job.objects.get().result['per_model']['tasks.Task'], 5)
+        self.assertFalse(Project.objects.exists())
+
+        enqueue('users.delete_user', user_id=self.member.pk)
+        run_job(claim_job('w1'))
+        self.assertFalse(User.objects.filter(pk=self.member.pk).exists())
+
+
+@override_settings(PROJECT_SHARDS=SHARDS)
+class ShardRouterTests(SimpleTestCase):
+    router = ShardRouter()
+
+    def test_sharded_models_follow_the_pinned_shard(self):
+        with pin('shard_test'):
+            self.assertEqual(self.router.db_for_write(Task), 'shard_test')
+            self.assertEqual(self.router.db_for_read(Project), 'shard_test')
+            # usuários, jobs e o diretório ficam sempre no 'default'
+            self.assertEqual(self.router.db_for_write(User), DEFAULT_DB_ALIAS)
+            self.assertEqual(self.router.db_for_write(ProjectShard), DEFAULT_DB_ALIAS)
+            self.assertEqual(read_aliases(Task), ['shard_test'])
+        self.assertEqual(read_aliases(Task), SHARDS)
+
+    def test_unpinned_write_uses_the_instance_shard(self):
+        project = Project(pk=1)
+        project._state.db = 'shard_test'
+        self.assertEqual(self.router.db_for_write(Task, instance=project), 'shard_test')
+        self.assertIsNone(self.router.db_for_write(Task))
+        # a dica de um usuário (do 'default') não arrasta a tarefa para lá
+        self.assertEqual(self.router.db_for_write(User, instance=project), DEFAULT_DB_ALIAS)
+
+    def test_shards_only_migrate_sharded_apps(self):
+        self.assertTrue(self.router.allow_migrate('shard_test', 'tasks', 'task'))
+        self.assertFalse(self.router.allow_migrate('shard_test', 'users', 'user'))
+        self.assertFalse(self.router.allow_migrate('shard_test', 'projects', 'projectshard'))
+        self.assertIsNone(self.router.allow_migrate('default', 'users', 'user'))
+
+
+@override_settings(PROJECT_SHARDS=SHARDS)
+class FanOutTests(TestCase):
+    databases = {'default', 'shard_test'}
+
+    def test_fan_out_merges_ordered_shards(self):
+        user = make_user()
+        for alias, names in (('default', ['a', 'c', 'e']), ('shard_test', ['b', 'd'])):
+            project = Project(name=alias, owner=user)
+            project.save(using=alias)
+            Task.objects.using(alias).bulk_create([
+                Task(project=project, owner=user, name=name, description='', start_date='2026-01-01') for name in names
+            ])
+
+        queryset = Task.objects.order_by('name')
+        self.assertEqual([task.name for task in fan_out(queryset, key=lambda task: task.name)], ['a', 'b', 'c', 'd', 'e'])
+        self.assertEqual([task.name for task in fan_out(queryset, key=lambda task: task.name, limit=3)], ['a', 'b', 'c'])
+        with pin('shard_test'):
+            self.assertEqual([task.name for task in fan_out(queryset, key=lambda task: task.name)], ['b', 'd'])
+
+
+# usuário: 2 requisições de rajada; IP: 1 (o IP recusa antes do usuário)
+LIMITS = {'user': {'write': (0.01, 2)}, 'ip': {'write': (0.01, 1)}}
+
+
+@override_settings(RATE_LIMITS=LIMITS, RATE_LIMIT_EXEMPT_PATHS=[])
+class RateLimitTests(SimpleTestCase):
+    def setUp(self):
+        ratelimit._buckets.clear()
+        cache.clear()
+        self.middleware = RateLimitMiddleware(lambda request: HttpResponse('ok'))
+
+    def post(self, user, ip='10.0.0.1'):
+        request = RequestFactory().post('/tarefas/', REMOTE_ADDR=ip)
+        request.user = user
+        return self.middleware(request)
+
+    def test_refusal_returns_429_and_counts_it(self):
+        self.assertEqual(self.post(AnonymousUser()).status_code, 200)
+        response = self.post(AnonymousUser())
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response['Retry-After'], '100')
+        self.assertEqual(fired_counts(1)['ip', 'write'], [1])
+        self.assertEqual(fired_counts(1)['user', 'write'], [0])
+
+    def test_ip_refusal_does_not_spend_the_user_quota(self):
+        user = User(pk=7)
+        self.assertEqual(self.post(user).status_code, 200)
+        for _ in range(3):
+            self.assertEqual(self.post(user).status_code, 429)
+        # o balde do usuário só perdeu a ficha da requisição aceita
+        self.assertEqual(self.post(user, ip='10.0.0.2').status_code, 200)
+        self.assertEqual(self.post(user, ip='10.0.0.3').status_code, 429)
+        self.assertEqual(fired_counts(1)['user', 'write'], [1])
+
+    def test_shared_window_refunds_counts_of_refused_requests(self):
+        self.middleware.shared = True
+        user = User(pk=7)
+        self.assertEqual(self.post(user).status_code, 200)
+        # o balde local do IP esvaziado por outro processo: só a janela do cache barra
+        ratelimit._buckets.clear()
+        self.assertEqual(self.post(user).status_code, 429)
+        ratelimit._buckets.clear()
+        self.assertEqual(self.post(user, ip='10.0.0.2').status_code, 200)
+        ratelimit._buckets.clear()
+        self.assertEqual(self.post(user, ip='10.0.0.3').status_code, 429)
+        self.assertEqual(fired_counts(1)['user', 'write'], [1])
+
+    @override_settings(RATE_LIMIT_ENABLED=False)
+    def test_disabled(self):
+        for _ in range(3):
+            self.assertEqual(self.post(AnonymousUser()).status_code, 200)
+
+
+
+def load_prod_settings(**environ):
+    """Importa de novo o perfil de produção com as variáveis de ambiente dadas."""
+    sys.modules.pop('TODO_LIST.settings.prod', None)
+    try:
+        with mock.patch.dict(os.environ, environ):
+            return importlib.import_module('TODO_LIST.settings.prod')
+    finally:
+        sys.modules.pop('TODO_LIST.settings.prod', None)
+
+
+class PerformanceCheckTests(TestCase):
+    def ids(self, warnings):
+        return {warning.id for warning in warnings}
+
+    @override_settings(DEBUG=True)
+    def test_dev_profile_is_flagged(self):
+        ids = self.ids(check_settings())
+        self.assertLessEqual({'core.W001', 'core.W003', 'core.W004', 'core.W005', 'core.W006', 'core.W008'}, ids)
+        # sem 'loaders' o Django já usa o loader em cache; com loaders explícitos sem ele, não
+        self.assertNotIn('core.W002', ids)
+        self.assertNotIn('core.W007', ids)
+        loaders = ['django.template.loaders.app_directories.Loader']
+        templates = [{**settings.TEMPLATES[0], 'APP_DIRS': False, 'OPTIONS': {**settings.TEMPLATES[0]['OPTIONS'], 'loaders': loaders}}]
+        with override_settings(TEMPLATES=templates):
+            self.assertIn('core.W002', self.ids(check_settings()))
+
+    def test_prod_profile_passes(self):
+        with self.assertRaises(ImproperlyConfigured):
+            load_prod_settings()
+        prod = load_prod_settings(DJANGO_SECRET_KEY='segredo', DJANGO_REDIS_URL='redis://localhost:6379/0')
+        for database in prod.DATABASES.values():
+            self.assertEqual(database['CONN_MAX_AGE'], 600)
+            self.assertIn('PRAGMA journal_mode=WAL', database['OPTIONS']['init_command'])
+        names = ['DEBUG', 'TEMPLATES', 'CACHES', 'STORAGES', 'MIDDLEWARE', 'SESSION_ENGINE']
+        # os bancos do teste não são trocados: só o aviso de conexões persistentes sobra
+        with override_settings(**{name: getattr(prod, name) for name in names}):
+            self.assertEqual(self.ids(check_settings()), {'core.W003'})
+        # sem Redis o cache volta a ser um por processo
+        self.assertTrue(load_prod_settings(DJANGO_SECRET_KEY='segredo').CACHES['default']['BACKEND'].endswith('LocMemCache'))
+
+    def test_journal_mode_is_checked_only_with_databases(self):
+        self.assertEqual(check_sqlite_journal(), [])
+        warnings = check_sqlite_journal(databases=['default'])
+        self.assertEqual(self.ids(warnings), {'core.W009'})  # o banco de teste fica em memória
+
+    def test_perf_check_command(self):
+        out, err = io.StringIO(), io.StringIO()
+        call_command('perf_check', '--skip-db', stdout=out, stderr=err)
+        self.assertIn('core.W006', err.getvalue())
+        self.assertNotIn('core.W009', err.getvalue())
+        with self.assertRaises(SystemCheckError):
+            call_command('perf_check', '--skip-db', '--strict', stdout=io.StringIO(), stderr=io.StringIO())
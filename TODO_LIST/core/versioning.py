@@ -0,0 +1,214 @@
+"""Concorrência otimista: coluna `version` e escrita condicional (compare-and-swap).
+
+`VersionedModel.save()` de uma linha existente vira
+
+    UPDATE ... SET <campos>, version = <lida + 1> WHERE id = ? AND version = <lida>
+
+e levanta EditConflict se outra escrita mudou a linha depois da leitura.
+Com `update_fields`, só essas colunas (e a versão) são escritas.
+
+`VersionedFormMixin` faz o merge de três vias dos formulários de edição. Cada
+campo vai para a página junto com o valor de partida escondido
+(`show_hidden_initial`); no envio, o que o usuário mudou em relação ao valor
+de partida é aplicado sobre a linha atual e o que só outra pessoa mudou é
+mantido. Se os dois mudaram o mesmo campo para valores diferentes, o envio
+é recusado com EditConflict, e `VersionedUpdateMixin` responde 409 com os
+dois valores (HTML com o formulário já rebaseado, ou JSON).
+"""
+from django.core.exceptions import ValidationError
+from django.db import models, router, transaction
+from django.forms.models import model_to_dict
+from django.http import JsonResponse
+
+# tentativas de gravar o merge quando a linha muda entre a leitura e a escrita
+MAX_ATTEMPTS = 3
+
+
+class EditConflict(Exception):
+    """A linha mudou desde a leitura. `fields` lista os campos em conflito num formulário."""
+
+    def __init__(self, instance=None, fields=(), form=None):
+        super().__init__('O registro foi alterado por outra pessoa.')
+        self.instance = instance
+        self.fields = list(fields)
+        self.form = form
+
+
+class VersionedModel(models.Model):
+    version = models.PositiveIntegerField(default=1, editable=False)
+
+    class Meta:
+        abstract = True
+
+    def save(self, *args, **kwargs):
+        if self._state.adding:
+            return super().save(*args, **kwargs)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            if not update_fields:
+                return None
+            kwargs['update_fields'] = {*update_fields, 'version'}
+        expected = self.version
+        self._expected_version = expected
+        self.version = expected + 1
+        using = kwargs.get('using') or router.db_for_write(type(self), instance=self)
+        try:
+            # savepoint próprio: um conflito não deixa a transação de quem chamou marcada para rollback
+            with transaction.atomic(using=using):
+                return super().save(*args, **kwargs)
+        except BaseException:
+            self.version = expected
+            raise
+        finally:
+            del self._expected_version
+
+    def _do_update(self, base_qs, using, pk_val, values, update_fields, forced_update):
+        expected = getattr(self, '_expected_version', None)
+        if expected is None:
+            return super()._do_update(base_qs, using, pk_val, values, update_fields, forced_update)
+        updated = super()._do_update(base_qs.filter(version=expected), using, pk_val, values, update_fields, forced_update)
+        if not updated and base_qs.filter(pk=pk_val).exists():
+            raise EditConflict(self)
+        return updated
+
+
+class VersionedFormMixin:
+    """ModelForm de VersionedModel com merge de três vias na edição (ver o topo do módulo).
+
+    Campos que não são do model (ex.: etiquetas digitadas) entram no merge
+    pelo valor de `current_values()`; quem os grava deve olhar `changed_fields`.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.changed_fields = None
+        if self.instance.pk is not None:
+            for field in self.fields.values():
+                field.show_hidden_initial = True
+            self._load(self.instance)
+
+    def current_values(self, instance):
+        """Valores atuais de cada campo do formulário, como no `initial`."""
+        values = model_to_dict(instance, self._meta.fields, self._meta.exclude)
+        return {name: values[name] if name in values else self.get_initial_for_field(field, name) for name, field in self.fields.items()}
+
+    def _load(self, instance):
+        self._row = {field.attname: getattr(instance, field.attname) for field in instance._meta.concrete_fields}
+        self._current = self.current_values(instance)
+
+    def _base_value(self, name):
+        """Valor de partida enviado pelo navegador (None se o envio não o trouxe)."""
+        bound = self[name]
+        if bound.html_initial_name not in self.data:
+            return None
+        return self._widget_data_value(bound.field.hidden_widget(), bound.html_initial_name)
+
+    def merge(self):
+        """Decide o que gravar: os campos mudados pelo usuário sobre a linha atual."""
+        mine, conflicts = [], []
+        for name, field in self.fields.items():
+            data, current = self[name].data, self._current[name]
+            base = self._base_value(name)
+            if base is None:
+                if field.has_changed(current, data):
+                    mine.append(name)
+                continue
+            try:
+                changed_by_me = field.has_changed(field.to_python(base), data)
+            except ValidationError:
+                changed_by_me = True
+            if not changed_by_me:
+                continue
+            mine.append(name)
+            if field.has_changed(current, base) and field.has_changed(current, data):
+                conflicts.append(name)
+        if conflicts:
+            raise EditConflict(self.instance, conflicts, form=self)
+        # o resto da instância volta a ser a linha atual (o _post_clean pôs nela todos os valores enviados)
+        model_fields = {field.name for field in self.instance._meta.concrete_fields if field.name in mine}
+        for field in self.instance._meta.concrete_fields:
+            if field.name not in model_fields:
+                setattr(self.instance, field.attname, self._row[field.attname])
+        self.changed_fields = mine
+        return [name for name in mine if name in model_fields]
+
+    def save(self, commit=True):
+        if self.instance.pk is None or not commit:
+            return super().save(commit)
+        for attempt in range(MAX_ATTEMPTS):
+            update_fields = self.merge()
+            try:
+                self.instance.save(update_fields=update_fields)
+                break
+            except EditConflict:
+                if attempt == MAX_ATTEMPTS - 1:
+                    raise
+                # outra escrita passou entre a leitura e o UPDATE: refaz o merge sobre a linha nova
+                manager = type(self.instance)._base_manager.using(self.instance._state.db)
+                self._load(manager.get(pk=self.instance.pk))
+        self._save_m2m()
+        return self.instance
+
+    def conflict_data(self):
+        """Dados enviados, com os valores de partida trocados pelos atuais: reenviar mantém os do usuário."""
+        data = self.data.copy()
+        for name, field in self.fields.items():
+            value = field.prepare_value(self._current[name])
+            data[self[name].html_initial_name] = '' if value is None else str(value)
+        return data
+
+    def conflict_details(self, names):
+        return [
+            {'name': name, 'label': self[name].label, 'mine': self._display(name, self[name].data),
+             'current': self._display(name, self._current[name])}
+            for name in names
+        ]
+
+    def _display(self, name, value):
+        field = self.fields[name]
+        try:
+            value = field.clean(value) if isinstance(value, str) or value is None else value
+        except ValidationError:
+            return str(value)
+        if hasattr(field, 'label_from_instance'):
+            if value is not None and not isinstance(value, models.Model):
+                value = field.queryset.filter(pk=value).first()
+            return field.label_from_instance(value) if value is not None else '—'
+        choices = dict(getattr(field, 'choices', ()))
+        if value in choices:
+            return str(choices[value])
+        if isinstance(value, (list, tuple)):
+            return ', '.join(map(str, value)) or '—'
+        return '—' if value in (None, '') else str(value)
+
+
+class VersionedUpdateMixin:
+    """UpdateView com formulário VersionedFormMixin: responde 409 quando a edição colide com outra.
+
+    Pedidos com `Accept: application/json` recebem os campos em conflito em
+    JSON; os demais, o formulário com os valores do usuário sobre a versão
+    atual e o aviso do conflito (contexto `conflict`).
+    """
+
+    def post(self, request, *args, **kwargs):
+        try:
+            return super().post(request, *args, **kwargs)
+        except EditConflict as conflict:
+            if conflict.form is None:
+                raise
+            return self.conflict_response(conflict)
+
+    def conflict_response(self, conflict):
+        form = conflict.form
+        details = form.conflict_details(conflict.fields)
+        if 'application/json' in self.request.headers.get('Accept', ''):
+            return JsonResponse({
+                'error': 'conflict',
+                'version': form._row['version'],
+                'fields': {item['name']: {'label': str(item['label']), 'mine': item['mine'], 'current': item['current']} for item in details},
+            }, status=409)
+        self.object = self.get_object()
+        kwargs = self.get_form_kwargs()
+        kwargs['data'] = form.conflict_data()
+        context = self.get_context_data(form=self.get_form_class()(**kwargs), conflict=details)
+        return self.render_to_response(context, status=409)
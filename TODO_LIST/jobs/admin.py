@@ -0,0 +1,10 @@
+from django.contrib import admin
+from .models import Job
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = ['id', 'name', 'owner', 'status', 'progress', 'attempts', 'run_at', 'finished_at']
+    list_select_related = ['owner']
+    list_filter = ['status', 'name']
+    raw_id_fields = ['owner']
+    readonly_fields = ['created_at', 'updated_at']
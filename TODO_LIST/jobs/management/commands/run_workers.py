@@ -0,0 +1,81 @@
+import multiprocessing
+import os
+import signal
+import threading
+
+import django
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from jobs.worker import requeue_stale_jobs, start_threads, work
+
+
+def _process_main(index, options):
+    # no modo 'spawn' o processo filho começa sem o Django configurado
+    django.setup()
+    stop_event = threading.Event()
+    signal.signal(signal.SIGTERM, lambda *args: stop_event.set())
+    signal.signal(signal.SIGINT, lambda *args: stop_event.set())
+    work(index, stop_event, **options)
+
+
+class Command(BaseCommand):
+    help = 'Executa os workers da fila de jobs em segundo plano.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers', type=int, default=getattr(settings, 'JOBS_WORKERS', os.cpu_count() or 1),
+            help='Quantidade de workers (padrão: JOBS_WORKERS ou o número de CPUs).',
+        )
+        parser.add_argument(
+            '--mode', choices=['thread', 'process'], default=getattr(settings, 'JOBS_WORKER_MODE', 'thread'),
+            help='thread para jobs que esperam I/O, process para jobs que usam CPU.',
+        )
+        parser.add_argument('--poll-interval', type=float, default=1.0, help='Segundos entre consultas com a fila vazia.')
+        parser.add_argument('--once', action='store_true', help='Processa o que estiver na fila e sai.')
+
+    def handle(self, *args, **options):
+        count = max(1, options['workers'])
+        worker_options = {'poll_interval': options['poll_interval'], 'once': options['once']}
+
+        requeued = requeue_stale_jobs()
+        if requeued:
+            self.stdout.write(self.style.WARNING(f'{requeued} job(s) abandonados voltaram para a fila.'))
+
+        self.stdout.write(f'Iniciando {count} worker(s) no modo {options["mode"]}.')
+        if options['mode'] == 'thread':
+            self._run_threads(count, worker_options)
+        else:
+            self._run_processes(count, worker_options)
+
+    def _run_threads(self, count, worker_options):
+        stop_event = threading.Event()
+        signal.signal(signal.SIGTERM, lambda *args: stop_event.set())
+        threads = start_threads(count, stop_event, **worker_options)
+        try:
+            for thread in threads:
+                while thread.is_alive():
+                    thread.join(timeout=0.5)
+        except KeyboardInterrupt:
+            stop_event.set()
+            for thread in threads:
+                thread.join()
+
+    def _run_processes(self, count, worker_options):
+        # conexões abertas não podem ser herdadas pelos processos filhos
+        connections.close_all()
+        processes = [
+            multiprocessing.Process(target=_process_main, args=(index, worker_options), name=f'job-worker-{index}')
+            for index in range(count)
+        ]
+        for process in processes:
+            process.start()
+        try:
+            for process in processes:
+                process.join()
+        except KeyboardInterrupt:
+            for process in processes:
+                process.terminate()
+            for process in processes:
+                process.join()
@@ -0,0 +1,41 @@
+from django.utils import timezone
+from .models import Job
+
+_handlers = {}
+
+
+def job(name):
+    """Registra uma função como handler de job.
+
+    O handler recebe o próprio Job e o payload como kwargs, e o que ele
+    retornar (precisa ser serializável em JSON) vira `Job.result`:
+
+        @job('projects.delete')
+        def delete_project(job, project_id):
+            ...
+    """
+    def decorator(func):
+        if name in _handlers and _handlers[name] is not func:
+            raise ValueError(f'Já existe um job registrado com o nome "{name}".')
+        _handlers[name] = func
+        return func
+    return decorator
+
+
+def get_handler(name):
+    try:
+        return _handlers[name]
+    except KeyError:
+        raise LookupError(f'Nenhum job registrado com o nome "{name}".') from None
+
+
+def enqueue(name, *, owner=None, run_at=None, max_attempts=3, **payload):
+    """Coloca um job na fila e retorna o Job criado (a view devolve o id para o usuário)."""
+    get_handler(name)  # falha já aqui se o nome estiver errado
+    return Job.objects.create(
+        name=name,
+        payload=payload,
+        owner=owner,
+        run_at=run_at or timezone.now(),
+        max_attempts=max_attempts,
+    )
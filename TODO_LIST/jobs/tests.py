@@ -0,0 +1,106 @@
+from datetime import timedelta
+
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from core.choices import JobStatus
+from users.models import User
+
+from .models import Job
+from .registry import enqueue, job
+from .worker import claim_job, requeue_stale_jobs, run_job
+
+
+@job('tests.add')
+def add_job(job, a, b):
+    return {'sum': a + b}
+
+
+@job('tests.object')
+def object_job(job):
+    return {'value': object()}
+
+
+@job('tests.fail')
+def fail_job(job):
+    raise RuntimeError('falhou')
+
+
+@override_settings(JOBS_RETRY_BASE_DELAY=30, JOBS_RETRY_MAX_DELAY=3600)
+class JobQueueTests(TestCase):
+    def test_claim_takes_ready_jobs_in_order_and_only_once(self):
+        later = enqueue('tests.add', a=1, b=2, run_at=timezone.now() + timedelta(hours=1))
+        second = enqueue('tests.add', a=1, b=2, run_at=timezone.now() - timedelta(minutes=1))
+        first = enqueue('tests.add', a=1, b=2, run_at=timezone.now() - timedelta(minutes=5))
+
+        claimed = claim_job('w1')
+        self.assertEqual((claimed.pk, claimed.status, claimed.locked_by, claimed.attempts), (first.pk, JobStatus.RUNNING, 'w1', 1))
+        self.assertEqual(claim_job('w2').pk, second.pk)
+        self.assertIsNone(claim_job('w3'))  # `later` ainda não está pronto
+        self.assertEqual(Job.objects.get(pk=later.pk).status, JobStatus.QUEUED)
+
+    def test_successful_run_stores_the_result(self):
+        enqueue('tests.add', a=2, b=3)
+        self.assertTrue(run_job(claim_job('w1')))
+        job = Job.objects.get()
+        self.assertEqual((job.status, job.result, job.progress, job.locked_by), (JobStatus.SUCCEEDED, {'sum': 5}, 100, ''))
+        self.assertIsNotNone(job.finished_at)
+
+    def test_failure_is_retried_with_backoff_then_fails(self):
+        queued = enqueue('tests.fail', max_attempts=2)
+        before = timezone.now()
+        with self.assertLogs('jobs.worker', 'WARNING'):
+            self.assertFalse(run_job(claim_job('w1')))
+        job = Job.objects.get(pk=queued.pk)
+        self.assertEqual((job.status, job.attempts), (JobStatus.QUEUED, 1))
+        self.assertIn('RuntimeError: falhou', job.error)
+        self.assertGreaterEqual(job.run_at, before + timedelta(seconds=30))
+        self.assertIsNone(claim_job('w1'))  # só volta depois do atraso
+
+        Job.objects.filter(pk=job.pk).update(run_at=timezone.now())
+        with self.assertLogs('jobs.worker', 'ERROR'):
+            self.assertFalse(run_job(claim_job('w1')))
+        job = Job.objects.get(pk=queued.pk)
+        self.assertEqual((job.status, job.attempts), (JobStatus.FAILED, 2))
+        self.assertIsNotNone(job.finished_at)
+
+    @override_settings(JOBS_STALE_AFTER=60)
+    def test_stale_running_jobs_are_requeued(self):
+        enqueue('tests.add', a=1, b=1)
+        claimed = claim_job('w1')
+        self.assertEqual(requeue_stale_jobs(), 0)
+        Job.objects.filter(pk=claimed.pk).update(updated_at=timezone.now() - timedelta(minutes=5))
+        self.assertEqual(requeue_stale_jobs(), 1)
+        self.assertEqual(claim_job('w2').pk, claimed.pk)
+
+    @override_settings(JOBS_STALE_AFTER=60)
+    def test_progress_keeps_long_jobs_running(self):
+        enqueue('tests.add', a=1, b=1)
+        claimed = claim_job('w1')
+        Job.objects.filter(pk=claimed.pk).update(locked_at=timezone.now() - timedelta(hours=1), updated_at=timezone.now() - timedelta(hours=1))
+        claimed.set_progress(50, 'metade')
+        self.assertEqual(requeue_stale_jobs(), 0)
+        self.assertEqual(Job.objects.get(pk=claimed.pk).status, JobStatus.RUNNING)
+
+    def test_unserializable_result_fails_the_job(self):
+        enqueue('tests.object')
+        with self.assertLogs('jobs.worker', 'ERROR'):
+            self.assertFalse(run_job(claim_job('w1')))
+        job = Job.objects.get()
+        self.assertEqual((job.status, job.attempts, job.locked_by), (JobStatus.FAILED, 1, ''))
+        self.assertIn('TypeError', job.error)
+
+    def test_enqueue_rejects_unknown_names(self):
+        with self.assertRaises(LookupError):
+            enqueue('tests.nao_existe')
+
+    def test_status_is_visible_only_to_the_owner(self):
+        owner = User.objects.create_user('dono@example.com', 'Dono', 'senha-123', cpf='1')
+        other = User.objects.create_user('outro@example.com', 'Outro', 'senha-123', cpf='2')
+        queued = enqueue('tests.add', owner=owner, a=1, b=1)
+        self.client.force_login(owner)
+        data = self.client.get(reverse('job-status', args=[queued.pk])).json()
+        self.assertEqual((data['status'], data['finished']), (JobStatus.QUEUED, False))
+        self.client.force_login(other)
+        self.assertEqual(self.client.get(reverse('job-status', args=[queued.pk])).status_code, 404)
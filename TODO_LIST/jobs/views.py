@@ -0,0 +1,48 @@
+from django.views.generic import ListView, DetailView
+from django.views.generic.detail import BaseDetailView
+from django.contrib.auth.mixins import LoginRequiredMixin
+from django.http import JsonResponse
+from .models import Job
+
+
+class JobOwnerMixin(LoginRequiredMixin):
+    def get_queryset(self):
+        # cada usuário só enxerga os próprios jobs; staff enxerga todos
+        if self.request.user.is_staff:
+            return Job.objects.all()
+        return Job.objects.filter(owner=self.request.user)
+
+
+class JobListView(JobOwnerMixin, ListView):
+    model = Job
+    template_name = 'jobs/job_list.html'
+    context_object_name = 'jobs'
+    paginate_by = 25
+
+    def get_queryset(self):
+        return super().get_queryset().order_by('-id')
+
+
+class JobDetailView(JobOwnerMixin, DetailView):
+    model = Job
+    template_name = 'jobs/job_detail.html'
+    context_object_name = 'job'
+
+
+class JobStatusView(JobOwnerMixin, BaseDetailView):
+    """Status do job em JSON, consultado pela página de detalhe enquanto ele roda."""
+    model = Job
+
+    def render_to_response(self, context):
+        job = self.object
+        return JsonResponse({
+            'id': job.pk,
+            'name': job.name,
+            'status': job.status,
+            'status_display': job.get_status_display(),
+            'progress': job.progress,
+            'progress_message': job.progress_message,
+            'attempts': job.attempts,
+            'result': job.result,
+            'finished': job.is_finished,
+        })
@@ -0,0 +1,147 @@
+import json
+import logging
+import os
+import socket
+import threading
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections, connection
+from django.db.models import F
+from django.db.utils import OperationalError
+from django.utils import timezone
+
+from core.choices import JobStatus
+from .models import Job
+from .registry import get_handler
+
+logger = logging.getLogger(__name__)
+
+# quantos candidatos olhar por vez ao tentar pegar um job (outros workers podem ganhar a disputa)
+CLAIM_CANDIDATES = 5
+
+
+def retry_delay(attempt):
+    """Backoff exponencial: base, 2*base, 4*base... limitado a JOBS_RETRY_MAX_DELAY."""
+    base = getattr(settings, 'JOBS_RETRY_BASE_DELAY', 30)
+    ceiling = getattr(settings, 'JOBS_RETRY_MAX_DELAY', 3600)
+    return timedelta(seconds=min(ceiling, base * 2 ** max(0, attempt - 1)))
+
+
+def claim_job(worker_id):
+    """Pega o próximo job pronto de forma atômica.
+
+    O UPDATE só altera a linha se ela ainda estiver 'queued', então se dois
+    workers escolherem o mesmo candidato só um deles recebe rowcount 1.
+    """
+    now = timezone.now()
+    candidates = list(
+        Job.objects.filter(status=JobStatus.QUEUED, run_at__lte=now)
+        .order_by('run_at', 'id')
+        .values_list('pk', flat=True)[:CLAIM_CANDIDATES]
+    )
+    for pk in candidates:
+        claimed = Job.objects.filter(pk=pk, status=JobStatus.QUEUED).update(
+            status=JobStatus.RUNNING,
+            locked_by=worker_id,
+            locked_at=now,
+            attempts=F('attempts') + 1,
+            updated_at=now,
+        )
+        if claimed:
+            return Job.objects.get(pk=pk)
+    return None
+
+
+def run_job(job):
+    """Executa o handler do job e grava o resultado, o erro ou o reagendamento."""
+    try:
+        handler = get_handler(job.name)
+        result = handler(job, **job.payload)
+    except Exception:
+        error = traceback.format_exc()
+        now = timezone.now()
+        if job.attempts < job.max_attempts:
+            logger.warning('Job %s falhou (tentativa %s/%s), reagendando.', job.pk, job.attempts, job.max_attempts)
+            Job.objects.filter(pk=job.pk).update(
+                status=JobStatus.QUEUED, run_at=now + retry_delay(job.attempts),
+                locked_by='', locked_at=None, error=error, updated_at=now,
+            )
+        else:
+            logger.error('Job %s falhou definitivamente após %s tentativas.', job.pk, job.attempts)
+            Job.objects.filter(pk=job.pk).update(
+                status=JobStatus.FAILED, locked_by='', locked_at=None,
+                error=error, finished_at=now, updated_at=now,
+            )
+        return False
+
+    now = timezone.now()
+    try:
+        # antes do UPDATE: um erro dentro dele invalidaria a transação em que o worker estiver
+        json.dumps(result, cls=Job._meta.get_field('result').encoder)
+    except (TypeError, ValueError):
+        # o handler já rodou, então não há nova tentativa
+        logger.error('Job %s terminou com um resultado que não pode ser gravado em JSON.', job.pk)
+        Job.objects.filter(pk=job.pk).update(
+            status=JobStatus.FAILED, locked_by='', locked_at=None,
+            error=traceback.format_exc(), finished_at=now, updated_at=now,
+        )
+        return False
+    Job.objects.filter(pk=job.pk).update(
+        status=JobStatus.SUCCEEDED, result=result, progress=100, error='',
+        locked_by='', locked_at=None, finished_at=now, updated_at=now,
+    )
+    return True
+
+
+def requeue_stale_jobs():
+    """Devolve para a fila jobs 'running' cujo worker morreu.
+
+    Morto é quem não dá sinal há JOBS_STALE_AFTER segundos: `updated_at` é
+    gravado ao pegar o job e a cada `Job.set_progress`, então um job longo que
+    informa o progresso não volta para a fila no meio da execução.
+    """
+    stale_after = getattr(settings, 'JOBS_STALE_AFTER', 600)
+    limit = timezone.now() - timedelta(seconds=stale_after)
+    return Job.objects.filter(status=JobStatus.RUNNING, updated_at__lt=limit).update(
+        status=JobStatus.QUEUED, locked_by='', locked_at=None, updated_at=timezone.now(),
+    )
+
+
+def make_worker_id(index):
+    return f'{socket.gethostname()}:{os.getpid()}:{index}'
+
+
+def work(index, stop_event, poll_interval=1.0, once=False):
+    """Loop de um worker: pega um job, executa, repete até stop_event (ou a fila esvaziar com once=True)."""
+    worker_id = make_worker_id(index)
+    logger.info('Worker %s iniciado.', worker_id)
+    try:
+        while not stop_event.is_set():
+            close_old_connections()
+            try:
+                job = claim_job(worker_id)
+            except OperationalError:
+                # SQLite ocupado por outro escritor; tenta de novo no próximo ciclo
+                logger.debug('Banco ocupado ao buscar job, aguardando.', exc_info=True)
+                job = None
+            if job is None:
+                if once:
+                    break
+                stop_event.wait(poll_interval)
+                continue
+            run_job(job)
+    finally:
+        connection.close()
+        logger.info('Worker %s finalizado.', worker_id)
+
+
+def start_threads(count, stop_event, **options):
+    threads = [
+        threading.Thread(target=work, args=(index, stop_event), kwargs=options, name=f'job-worker-{index}', daemon=True)
+        for index in range(count)
+    ]
+    for thread in threads:
+        thread.start()
+    return threads
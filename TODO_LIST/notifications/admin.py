@@ -0,0 +1,11 @@
+from django.contrib import admin
+from .models import Notification
+
+
+@admin.register(Notification)
+class NotificationAdmin(admin.ModelAdmin):
+    list_display = ['id', 'recipient', 'kind', 'message', 'created_at', 'read_at']
+    list_select_related = ['recipient']
+    list_filter = ['kind']
+    raw_id_fields = ['recipient']
+    list_per_page = 50
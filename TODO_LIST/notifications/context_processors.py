@@ -0,0 +1,11 @@
+from django.utils.functional import SimpleLazyObject
+
+from .services import unread_count
+
+
+def unread_notifications(request):
+    """Contador de não lidas da barra lateral: lido do cache só quando o template o usa."""
+    user = getattr(request, 'user', None)
+    if user is None or not user.is_authenticated:
+        return {}
+    return {'unread_notifications': SimpleLazyObject(lambda: unread_count(user))}
@@ -0,0 +1,28 @@
+from django.db import models
+from django.conf import settings
+from django.utils import timezone
+from core.choices import NotificationKind
+
+
+class Notification(models.Model):
+    recipient = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, db_index=False, related_name='notifications')
+    kind = models.PositiveSmallIntegerField(choices=NotificationKind)
+    message = models.CharField(max_length=255)
+    url = models.CharField(max_length=200, blank=True)
+    created_at = models.DateTimeField(default=timezone.now)
+    read_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            # lista do usuário, da mais recente para a mais antiga
+            models.Index(fields=['recipient', '-id'], name='notifications_recipient_idx'),
+            # recontagem das não lidas quando o contador some do cache: só as não lidas entram no índice
+            models.Index(fields=['recipient'], condition=models.Q(read_at__isnull=True), name='notifications_unread_idx'),
+        ]
+
+    def __str__(self):
+        return self.message
+
+    @property
+    def is_read(self):
+        return self.read_at is not None
@@ -0,0 +1,81 @@
+"""Envio de notificações e contador de não lidas.
+
+O envio para N destinatários é um único `bulk_create` (em lotes de
+BATCH_SIZE linhas), nunca um INSERT por usuário.
+
+O contador de não lidas de cada usuário fica no cache e é alterado com
+`incr`/`decr`, que são atômicos no backend de cache; a barra lateral lê só o
+cache. Quando a chave não existe (primeiro acesso, expirou ou foi
+invalidada), ela é recontada no banco pelo índice parcial das não lidas e
+gravada com `add`, que não sobrescreve um valor posto por outro processo no
+meio tempo. O TTL limita por quanto tempo um contador que perdeu uma
+atualização pode ficar errado.
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+
+from .models import Notification
+
+BATCH_SIZE = 500
+# acima disso o envio invalida as chaves (um delete_many) em vez de um incr por destinatário
+INCR_LIMIT = 100
+
+
+def _key(user_id):
+    return f'notifications:unread:{user_id}'
+
+
+def _ttl():
+    return getattr(settings, 'NOTIFICATIONS_UNREAD_TTL', 3600)
+
+
+def unread_count(user):
+    count = cache.get(_key(user.pk))
+    if count is None:
+        count = Notification.objects.filter(recipient=user, read_at__isnull=True).count()
+        cache.add(_key(user.pk), count, _ttl())
+    return count
+
+
+def notify(recipients, kind, message, url=''):
+    """Cria uma notificação para cada destinatário (usuários ou ids) e atualiza os contadores."""
+    recipient_ids = list(dict.fromkeys(getattr(r, 'pk', r) for r in recipients))
+    if not recipient_ids:
+        return []
+    now = timezone.now()
+    notifications = Notification.objects.bulk_create(
+        [Notification(recipient_id=pk, kind=kind, message=message[:255], url=url, created_at=now) for pk in recipient_ids],
+        batch_size=BATCH_SIZE,
+    )
+    if len(recipient_ids) > INCR_LIMIT:
+        cache.delete_many([_key(pk) for pk in recipient_ids])
+    else:
+        for pk in recipient_ids:
+            try:
+                cache.incr(_key(pk))
+            except ValueError:
+                pass  # sem contador no cache: será recontado no próximo acesso
+    return notifications
+
+
+def _decrement(user, amount):
+    if not amount:
+        return
+    try:
+        if cache.decr(_key(user.pk), amount) < 0:
+            cache.delete(_key(user.pk))
+    except ValueError:
+        pass
+
+
+def mark_read(user, notification_id):
+    updated = Notification.objects.filter(pk=notification_id, recipient=user, read_at__isnull=True).update(read_at=timezone.now())
+    _decrement(user, updated)
+    return updated
+
+
+def mark_all_read(user):
+    updated = Notification.objects.filter(recipient=user, read_at__isnull=True).update(read_at=timezone.now())
+    _decrement(user, updated)
+    return updated
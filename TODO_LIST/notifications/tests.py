@@ -0,0 +1,58 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+
+from core.choices import NotificationKind
+from users.models import User
+
+from . import services
+from .models import Notification
+from .services import mark_all_read, mark_read, notify, unread_count
+
+
+class NotificationCounterTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user('dono@example.com', 'Dono', 'senha-123', cpf='1')
+        self.other = User.objects.create_user('outro@example.com', 'Outro', 'senha-123', cpf='2')
+
+    def send(self, *recipients, message='Tarefa atribuída a você', url=''):
+        return notify(recipients, NotificationKind.TASK_ASSIGNED, message, url)
+
+    def test_counter_is_counted_once_then_kept_in_cache(self):
+        self.send(self.user)
+        self.assertEqual(unread_count(self.user), 1)
+        self.send(self.user, self.other, self.user.pk)  # repetidos contam uma vez
+        with self.assertNumQueries(0):
+            self.assertEqual(unread_count(self.user), 2)
+        self.assertEqual(unread_count(self.other), 1)
+
+    def test_mark_read_decrements(self):
+        first, second = self.send(self.user)[0], self.send(self.user)[0]
+        self.assertEqual(unread_count(self.user), 2)
+        self.assertEqual(mark_read(self.user, first.pk), 1)
+        self.assertEqual(mark_read(self.user, first.pk), 0)  # já lida: não desconta de novo
+        self.assertEqual(mark_read(self.other, second.pk), 0)
+        self.assertEqual(unread_count(self.user), 1)
+        self.assertEqual(mark_all_read(self.user), 1)
+        self.assertEqual(unread_count(self.user), 0)
+
+    def test_large_fan_out_invalidates_instead_of_incrementing(self):
+        unread_count(self.user)
+        with mock.patch.object(services, 'INCR_LIMIT', 1), mock.patch.object(services, 'BATCH_SIZE', 1):
+            self.send(self.user, self.other)
+        self.assertIsNone(cache.get(services._key(self.user.pk)))
+        self.assertEqual((unread_count(self.user), unread_count(self.other)), (1, 1))
+        self.assertEqual(Notification.objects.count(), 2)
+
+    def test_read_view_follows_only_local_links(self):
+        local = self.send(self.user, url='/tasks/1/')[0]
+        external = self.send(self.user, url='https://exemplo.com/')[0]
+        self.client.force_login(self.user)
+        self.assertRedirects(self.client.post(reverse('notification-read', args=[local.pk])), '/tasks/1/', fetch_redirect_response=False)
+        self.assertRedirects(self.client.post(reverse('notification-read', args=[external.pk])), reverse('notification-list'))
+        self.assertEqual(unread_count(self.user), 0)
+        self.client.force_login(self.other)
+        self.assertEqual(self.client.post(reverse('notification-read', args=[local.pk])).status_code, 404)
@@ -0,0 +1,35 @@
+from django.contrib.auth.mixins import LoginRequiredMixin
+from django.shortcuts import get_object_or_404, redirect
+from django.utils.http import url_has_allowed_host_and_scheme
+from django.views import View
+from django.views.generic import ListView
+
+from .models import Notification
+from .services import mark_all_read, mark_read
+
+
+class NotificationListView(LoginRequiredMixin, ListView):
+    model = Notification
+    template_name = 'notifications/notification_list.html'
+    context_object_name = 'notifications'
+    paginate_by = 25
+
+    def get_queryset(self):
+        return Notification.objects.filter(recipient=self.request.user).order_by('-id')
+
+
+class NotificationReadView(LoginRequiredMixin, View):
+    """Marca a notificação como lida e segue para o link dela."""
+
+    def post(self, request, pk):
+        notification = get_object_or_404(Notification, pk=pk, recipient=request.user)
+        mark_read(request.user, notification.pk)
+        if notification.url and url_has_allowed_host_and_scheme(notification.url, allowed_hosts={request.get_host()}):
+            return redirect(notification.url)
+        return redirect('notification-list')
+
+
+class NotificationReadAllView(LoginRequiredMixin, View):
+    def post(self, request):
+        mark_all_read(request.user)
+        return redirect('notification-list')
@@ -1,6 +1,15 @@
 from django.contrib import admin
+from core.paginator import EstimatedCountPaginator
 from .models import Project
 
 @admin.register(Project)
 class ProjectAdmin(admin.ModelAdmin):
     list_display = ['name', 'owner', 'status', 'start_date', 'end_date']
+    ordering = ['-id']
+    list_select_related = ['owner']
+    list_filter = ['status']
+    search_fields = ['^name']
+    autocomplete_fields = ['owner', 'participants']
+    list_per_page = 50
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
@@ -1,6 +1,11 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_migrate
 
 
 class ProjectsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'projects'
+
+    def ready(self):
+        from core.sharding import seed_sequences
+        post_migrate.connect(seed_sequences, dispatch_uid='core.sharding.seed_sequences')
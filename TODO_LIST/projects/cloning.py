@@ -0,0 +1,135 @@
+"""Cópia de projetos (ex.: um projeto modelo com centenas de tarefas).
+
+`clone_project` cria o projeto novo no shard do original e copia, numa só
+transação e sempre com `INSERT ... SELECT`, participantes, etiquetas,
+tarefas, etiquetas das tarefas e dependências: nenhuma tarefa passa pelo
+Python. As datas das tarefas andam a diferença entre o início do projeto
+novo e o do original; com `reset_status` todas voltam para "em andamento".
+A ordem no quadro (rank) é mantida.
+
+As tarefas novas entram na caixa de entrada e no histórico ("criada") também
+por INSERT ... SELECT; o feed de alterações vem dos triggers. Não são
+copiados as tarefas arquivadas, as regras de recorrência (as cópias são
+tarefas comuns), o histórico, os apontamentos de horas e os fechamentos.
+
+Projetos com mais de PROJECT_CLONE_BACKGROUND_THRESHOLD tarefas são
+copiados pelo job `projects.clone_project`.
+"""
+from datetime import timedelta
+
+from django.db import connections, transaction
+from django.utils import timezone
+
+from core.choices import TaskEvent, TaskStatus
+from core.sharding import db_for
+from tasks.inbox import sync_project_inbox
+from tasks.models import Label, Task, TaskActivity, TaskDependency, TaskLabel
+from .models import Project
+from .shards import assign_shard
+
+TASK_COLUMNS = ['project_id', 'assigned_to_id', 'owner_id', 'name', 'description', 'priority', 'rank']
+
+
+# id antigo -> id novo de cada tarefa copiada, só na conexão e só durante a cópia
+TASK_MAP = 'clone_task_map'
+
+
+def _task_map(task, source_id, clone_id):
+    """SQL que cria e preenche TASK_MAP.
+
+    A n-ésima tarefa do original (por id) vira a n-ésima da cópia: as cópias
+    são inseridas em ordem de id pelo mesmo INSERT ... SELECT, e o
+    AUTOINCREMENT dá ids crescentes na ordem de inserção. Os pares saem de um
+    LAG sobre as duas listas intercaladas (uma ordenação só); juntar as duas
+    numerações por igualdade viraria um loop aninhado no SQLite. A chave
+    primária da tabela é o que as cópias das etiquetas e dependências buscam.
+    """
+    return [
+        (f'DROP TABLE IF EXISTS temp.{TASK_MAP}', []),
+        (f'CREATE TEMP TABLE {TASK_MAP} (old_id INTEGER PRIMARY KEY, new_id INTEGER NOT NULL)', []),
+        (
+            f'INSERT INTO temp.{TASK_MAP} (old_id, new_id) SELECT old_id, id FROM ('
+            f' SELECT id, project_id, LAG(id) OVER (ORDER BY r, project_id = %s) AS old_id FROM ('
+            f'  SELECT id, project_id, ROW_NUMBER() OVER (PARTITION BY project_id ORDER BY id) AS r'
+            f'  FROM {task} WHERE project_id IN (%s, %s)'
+            f' )) WHERE project_id = %s',
+            [clone_id, source_id, clone_id, clone_id],
+        ),
+    ]
+
+
+def _statements(source_id, clone_id, days, reset_status, actor_id, connection):
+    """[(rótulo, sql, parâmetros)] da cópia, na ordem em que precisam rodar (rótulo None: passo auxiliar)."""
+    qn = connection.ops.quote_name
+    links = qn(Project.participants.through._meta.db_table)
+    task, label = qn(Task._meta.db_table), qn(Label._meta.db_table)
+    task_label, dependency = qn(TaskLabel._meta.db_table), qn(TaskDependency._meta.db_table)
+    shift = f'{days:+d} days'
+    return [
+        ('participantes', (
+            # o dono da cópia já entrou acima
+            f'INSERT INTO {links} (project_id, user_id) SELECT %s, user_id FROM {links}'
+            f' WHERE project_id = %s AND user_id NOT IN (SELECT user_id FROM {links} WHERE project_id = %s)'
+        ), [clone_id, source_id, clone_id]),
+        ('etiquetas', (
+            f'INSERT INTO {label} (project_id, name) SELECT %s, name FROM {label} WHERE project_id = %s'
+        ), [clone_id, source_id]),
+        ('tarefas', (
+            f'INSERT INTO {task} (version, {", ".join(TASK_COLUMNS)}, start_date, end_date, status)'
+            f' SELECT 1, %s, {", ".join(TASK_COLUMNS[1:])}, date(start_date, %s), date(end_date, %s),'
+            f' CASE WHEN %s THEN %s ELSE status END'
+            f' FROM {task} WHERE project_id = %s ORDER BY id'
+        ), [clone_id, shift, shift, reset_status, TaskStatus.IN_PROGRESS, source_id]),
+        *((None, sql, params) for sql, params in _task_map(task, source_id, clone_id)),
+        ('etiquetas das tarefas', (
+            f'INSERT INTO {task_label} (task_id, label_id)'
+            f' SELECT m.new_id, nl.id FROM {task_label} tl'
+            f' JOIN temp.{TASK_MAP} m ON m.old_id = tl.task_id'
+            f' JOIN {label} ol ON ol.id = tl.label_id'
+            f' JOIN {label} nl ON nl.project_id = %s AND nl.name = ol.name'
+            f' WHERE ol.project_id = %s'
+        ), [clone_id, source_id]),
+        ('dependências', (
+            f'INSERT INTO {dependency} (task_id, depends_on_id)'
+            f' SELECT t.new_id, d.new_id FROM temp.{TASK_MAP} t'
+            f' JOIN {dependency} dep ON dep.task_id = t.old_id JOIN temp.{TASK_MAP} d ON d.old_id = dep.depends_on_id'
+        ), []),
+        (None, f'DROP TABLE temp.{TASK_MAP}', []),
+        ('histórico', (
+            f'INSERT INTO {qn(TaskActivity._meta.db_table)} (task_id, project_id, actor_id, event, changes, created_at)'
+            f' SELECT id, project_id, %s, %s, %s, %s FROM {task} WHERE project_id = %s'
+        ), [actor_id, TaskEvent.CREATED, '{}', connection.ops.adapt_datetimefield_value(timezone.now()), clone_id]),
+    ]
+
+
+def clone_project(project, owner, name, start_date=None, reset_status=False, progress=None):
+    """Copia `project` para um projeto novo de `owner`, começando em `start_date` (padrão: o mesmo início).
+
+    Tudo numa transação no shard do original. `progress(rótulo, linhas)` é
+    chamado após cada tabela. Retorna (projeto novo, {rótulo: linhas copiadas}).
+    """
+    using = project._state.db or db_for(Project)
+    connection = connections[using]
+    start_date = start_date or project.start_date
+    days = (start_date - project.start_date).days
+    clone = Project(
+        name=name, owner=owner, description=project.description, start_date=start_date,
+        end_date=project.end_date + timedelta(days=days) if project.end_date else None,
+    )
+    # reserva o id no diretório fora da transação do shard; se a cópia falhar, o id só fica sem uso
+    assign_shard(clone, alias=using)
+    copied = {}
+    with transaction.atomic(using=using):
+        clone.save(using=using, force_insert=True)
+        clone.participants.add(owner)
+        statements = _statements(project.pk, clone.pk, days, reset_status, owner.pk, connection)
+        with connection.cursor() as cursor:
+            for label, sql, params in statements:
+                cursor.execute(sql, params)
+                if label is None:
+                    continue
+                copied[label] = cursor.rowcount
+                if progress:
+                    progress(label, copied[label])
+        copied['caixa de entrada'] = sync_project_inbox(clone.pk, using)
+    return clone, copied
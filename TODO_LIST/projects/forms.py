@@ -4,8 +4,9 @@ from .models import Project
 from django import forms
 from .models import Project
 from users.models import User
+from core.versioning import VersionedFormMixin
 
-class ProjectForm(forms.ModelForm):
+class ProjectForm(VersionedFormMixin, forms.ModelForm):
    
     participants_emails = forms.CharField(
         required=False,
@@ -26,6 +27,7 @@ class ProjectForm(forms.ModelForm):
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
+        self.added_participants = []
 
        
         for field in ['start_date', 'end_date']:
@@ -34,8 +36,12 @@ class ProjectForm(forms.ModelForm):
 
         
         if self.instance and self.instance.pk:
-            emails = self.instance.participants.values_list('email', flat=True)
-            self.fields['participants_emails'].initial = ', '.join(emails)
+            self.fields['participants_emails'].initial = self._current['participants_emails']
+
+    def current_values(self, instance):
+        values = super().current_values(instance)
+        values['participants_emails'] = ', '.join(instance.participant_users().values_list('email', flat=True))
+        return values
 
     def clean_participants_emails(self):
         raw = self.cleaned_data.get('participants_emails', '')
@@ -49,16 +55,27 @@ class ProjectForm(forms.ModelForm):
         return emails
 
     def save(self, commit=True):
-        instance = super().save(commit=False)
-        is_new = instance.pk is None
+        is_new = self.instance.pk is None
+        # na edição grava só os campos alterados, com checagem de versão (core/versioning.py)
+        instance = super().save(commit)
 
         if commit:
-            instance.save()
-
             instance.participants.add(instance.owner)
 
             emails = self.cleaned_data.get('participants_emails', [])
-            users = User.objects.filter(email__in=emails)
+            users = list(User.objects.filter(email__in=emails))
+            existing = set() if is_new else set(instance.participant_ids())
+            # quem entrou agora (exceto o dono): usado pelas views para notificar
+            self.added_participants = [user for user in users if user.pk not in existing and user.pk != instance.owner_id]
             instance.participants.add(*users)
 
         return instance
+
+
+class ProjectCloneForm(forms.Form):
+    name = forms.CharField(label='Nome do novo projeto', max_length=255)
+    start_date = forms.DateField(
+        label='Início', widget=forms.DateInput(attrs={'type': 'date'}, format='%Y-%m-%d'),
+        help_text='As datas das tarefas são deslocadas pela diferença para o início do projeto original.',
+    )
+    reset_status = forms.BooleanField(label='Reabrir todas as tarefas', required=False)
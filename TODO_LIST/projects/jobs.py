@@ -0,0 +1,47 @@
+from datetime import date
+
+from jobs.registry import job
+from core.deletion import fast_delete
+from core.sharding import pin, shard_aliases
+from tasks.models import Task
+from .cloning import clone_project
+from .models import Project
+from .shards import project_shard
+from .snapshots import take_snapshot
+
+
+@job('projects.delete_project')
+def delete_project_job(job, project_id):
+    alias = project_shard(project_id)
+    if alias is None:
+        return {'deleted': 0, 'per_model': {}}
+    with pin(alias):
+        total = Task.objects.filter(project_id=project_id).count() + 1
+
+        def progress(label, deleted):
+            job.set_progress(min(99, deleted * 100 // total), f'{deleted} registro(s) apagados')
+
+        count, per_model = fast_delete(Project.objects.filter(pk=project_id), progress=progress)
+    return {'deleted': count, 'per_model': per_model}
+
+
+@job('projects.snapshot_projects')
+def snapshot_projects_job(job, day=None):
+    day = date.fromisoformat(day) if day else None
+    return {'projects': sum(take_snapshot(day, using=alias) for alias in shard_aliases())}
+
+
+@job('projects.clone_project')
+def clone_project_job(job, project_id, project_name, start_date=None, reset_status=False):
+    alias = project_shard(project_id)
+    with pin(alias):
+        project = Project.objects.get(pk=project_id)
+        done = []
+
+        def progress(label, copied):
+            done.append(label)
+            job.set_progress(len(done) * 99 // 6, f'{label}: {copied} linha(s)')  # 6 tabelas copiadas
+
+        start_date = date.fromisoformat(start_date) if start_date else None
+        clone, copied = clone_project(project, job.owner, project_name, start_date, reset_status, progress=progress)
+    return {'project_id': clone.pk, 'copied': copied}
@@ -0,0 +1,82 @@
+import time
+import uuid
+
+from django.core.management.base import BaseCommand
+from django.db.models import signals
+from django.utils import timezone
+
+from core.deletion import fast_delete
+from projects.models import Project
+from tasks.models import Task
+from users.models import User
+
+
+def _noop_receiver(sender, **kwargs):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        'Benchmark: cria um projeto descartável com N tarefas e mede a exclusão com fast_delete '
+        '(e, com --collector, com o QuerySet.delete() do Django). Use num banco de testes.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tasks', type=int, default=500_000)
+        parser.add_argument('--chunk-size', type=int, default=1000)
+        parser.add_argument('--collector', action='store_true', help='Também mede o Collector do Django com o mesmo volume.')
+        parser.add_argument(
+            '--signals', action='store_true',
+            help='Conecta um receiver post_delete em Task, o que obriga o Collector a carregar todas as tarefas.',
+        )
+
+    def make_project(self, owner, count):
+        project = Project.objects.create(name=f'bench {uuid.uuid4().hex[:8]}', owner=owner)
+        today = timezone.localdate()
+        for start in range(0, count, 5000):
+            Task.objects.bulk_create(
+                Task(project=project, owner=owner, assigned_to=owner, name=f'Tarefa {i}', description='', start_date=today)
+                for i in range(start, min(count, start + 5000))
+            )
+        return project
+
+    def handle(self, *args, **options):
+        suffix = uuid.uuid4().hex[:12]
+        if options['signals']:
+            signals.post_delete.connect(_noop_receiver, sender=Task)
+        owner = User.objects.create_user(f'bench-{suffix}@example.com', 'Benchmark', None, cpf=suffix[:11])
+        try:
+            self.stdout.write(f'Criando projeto com {options["tasks"]} tarefas...')
+            project = self.make_project(owner, options['tasks'])
+            self.bench_fast(project, options['chunk_size'])
+            if options['collector']:
+                project = self.make_project(owner, options['tasks'])
+                self.bench_collector(project)
+        finally:
+            fast_delete(User.objects.filter(pk=owner.pk))
+
+    def bench_fast(self, project, chunk_size):
+        last = started = time.perf_counter()
+        longest = 0.0
+
+        def progress(label, deleted):
+            nonlocal last, longest
+            now = time.perf_counter()
+            longest = max(longest, now - last)
+            last = now
+
+        count, per_model = fast_delete(Project.objects.filter(pk=project.pk), chunk_size=chunk_size, progress=progress)
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f'fast_delete: {count} linhas em {elapsed:.2f}s ({count / elapsed:,.0f} linhas/s), '
+            f'lote mais longo {longest * 1000:.0f}ms'
+        ))
+        self.stdout.write(f'  {per_model}')
+
+    def bench_collector(self, project):
+        started = time.perf_counter()
+        count, per_model = Project.objects.filter(pk=project.pk).delete()
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f'Collector: {count} linhas em {elapsed:.2f}s ({count / elapsed:,.0f} linhas/s), numa única transação'
+        ))
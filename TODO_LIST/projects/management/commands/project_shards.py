@@ -0,0 +1,51 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Count
+
+from core.sharding import shard_aliases
+from projects.models import Project, ProjectShard
+from projects.shards import move_project, sync_directory
+from tasks.models import Task
+
+
+class Command(BaseCommand):
+    help = 'Administra os shards de projetos (ver core/sharding.py): situação, registro no diretório e mudança de shard.'
+
+    def add_arguments(self, parser):
+        subparsers = parser.add_subparsers(dest='action', required=True)
+        subparsers.add_parser('status', help='Projetos e tarefas em cada shard.')
+        subparsers.add_parser('sync', help='Registra no diretório os projetos que ainda não estão nele.')
+        move = subparsers.add_parser('move', help='Move um projeto (e todas as linhas dele) para outro shard.')
+        move.add_argument('project_id', type=int)
+        move.add_argument('target', help='Alias do shard de destino.')
+        move.add_argument('--batch-size', type=int, default=1000, help='Linhas copiadas por transação.')
+        move.add_argument('--grace', type=float, default=2, help='Segundos de espera pelas escritas em andamento após travar o projeto.')
+
+    def handle(self, *args, **options):
+        getattr(self, f'handle_{options["action"]}')(options)
+
+    def handle_status(self, options):
+        directory = dict(ProjectShard.objects.values_list('alias').annotate(total=Count('id')).order_by())
+        for alias in shard_aliases():
+            projects = Project.objects.using(alias).count()
+            tasks = Task.objects.using(alias).count()
+            self.stdout.write(f'{alias}: {projects} projeto(s), {tasks} tarefa(s), {directory.get(alias, 0)} no diretório')
+
+    def handle_sync(self, options):
+        added = sync_directory()
+        self.stdout.write(self.style.SUCCESS(f'{added} projeto(s) registrados no diretório.'))
+
+    def handle_move(self, options):
+        def progress(label, copied):
+            if options['verbosity'] > 1:
+                self.stdout.write(f'  {label}: {copied} linha(s) copiadas até agora')
+
+        try:
+            copied = move_project(
+                options['project_id'], options['target'], batch_size=options['batch_size'],
+                grace_seconds=options['grace'], progress=progress,
+            )
+        except ProjectShard.DoesNotExist:
+            raise CommandError('Projeto fora do diretório; rode `project_shards sync` antes.')
+        except ValueError as error:
+            raise CommandError(str(error))
+        self.stdout.write(self.style.SUCCESS(f'Projeto #{options["project_id"]} em {options["target"]}: {copied} linha(s) copiadas.'))
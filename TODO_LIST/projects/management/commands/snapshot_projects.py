@@ -0,0 +1,35 @@
+import time
+from datetime import date
+
+from django.core.management.base import BaseCommand
+
+from core.sharding import shard_aliases
+from jobs.registry import enqueue
+from projects.snapshots import take_snapshot
+
+
+class Command(BaseCommand):
+    help = (
+        'Grava o fechamento diário (tarefas por status) de todos os projetos, usado nos gráficos de progresso. '
+        'Deve rodar uma vez por dia, pelo cron ou enfileirado para os workers (--enqueue).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--day', type=date.fromisoformat, default=None, metavar='AAAA-MM-DD', help='Dia do fechamento (padrão: hoje).')
+        parser.add_argument('--enqueue', action='store_true', help='Coloca o fechamento na fila de jobs em vez de rodar agora.')
+
+    def handle(self, *args, **options):
+        day = options['day']
+        if options['enqueue']:
+            job = enqueue('projects.snapshot_projects', day=day.isoformat() if day else None)
+            self.stdout.write(self.style.SUCCESS(f'Fechamento enfileirado (job #{job.pk}).'))
+            return
+
+        started = time.perf_counter()
+        rows = 0
+        for alias in shard_aliases():
+            count = take_snapshot(day, using=alias)
+            if options['verbosity'] > 1:
+                self.stdout.write(f'  {alias}: {count} projeto(s)')
+            rows += count
+        self.stdout.write(self.style.SUCCESS(f'{rows} projeto(s) registrados em {time.perf_counter() - started:.2f}s.'))
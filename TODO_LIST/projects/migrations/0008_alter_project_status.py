@@ -0,0 +1,18 @@
+# Generated by Django 5.2.5 on 2026-10-19 12:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0007_alter_project_status'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='project',
+            name='status',
+            field=models.CharField(choices=[('in_progress', 'Em andamento'), ('completed', 'Concluído'), ('canceled', 'Cancelado'), ('pendent', 'Pendente')], db_index=True, default='in_progress', max_length=20),
+        ),
+    ]
@@ -2,7 +2,10 @@ from django.db import models
 from django.utils import timezone
 from django.conf import settings
 from core.choices import ProjectStatus
-class Project(models.Model):
+from core.versioning import VersionedModel
+
+
+class Project(VersionedModel):
     name = models.CharField(max_length=255)
     owner = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='owned_projects')
     participants = models.ManyToManyField('users.User', related_name='participated_projects', blank=True)
@@ -12,14 +15,76 @@ class Project(models.Model):
     start_date = models.DateField(default=timezone.now)
     end_date = models.DateField(null=True, blank=True)
 
-    status = models.CharField(max_length=20, choices=ProjectStatus, default=ProjectStatus.IN_PROGRESS)
+    status = models.CharField(max_length=20, choices=ProjectStatus, default=ProjectStatus.IN_PROGRESS, db_index=True)
 
 
     def save(self, *args, **kwargs):
         is_new = self.pk is None
+        if is_new and kwargs.get('using') is None:
+            from .shards import assign_shard
+            alias = assign_shard(self)  # com vários shards, o id vem do diretório
+            if alias:
+                kwargs.update(using=alias, force_insert=True)
         super().save(*args, **kwargs)
         if is_new:
             self.participants.add(self.owner)
 
+    def participant_ids(self):
+        """Ids dos participantes, lidos só da tabela de ligação no banco do projeto.
+
+        Com vários shards, users_user não existe no shard do projeto e o JOIN
+        de `participants.all()` não funciona lá (ver core/sharding.py).
+        """
+        links = self.participants.through.objects.using(self._state.db)
+        return list(links.filter(project_id=self.pk).values_list('user_id', flat=True))
+
+    def participant_users(self):
+        """Participantes como queryset de usuários (um JOIN só quando não há shards)."""
+        from core.sharding import is_sharded_setup
+        if not is_sharded_setup():
+            return self.participants.all()
+        return self.participants.model.objects.filter(pk__in=self.participant_ids())
+
+    def has_participant(self, user):
+        links = self.participants.through.objects.using(self._state.db)
+        return links.filter(project_id=self.pk, user_id=user.pk).exists()
+
     def __str__(self):
         return self.name
+
+
+class ProjectShard(models.Model):
+    """Diretório de shards (ver core/sharding.py): em que banco está cada projeto.
+
+    Fica só no 'default'. O id da linha é o id do projeto: criar a linha é o
+    que reserva um id único entre todos os shards. A linha não é apagada com o
+    projeto, então o id nunca é reutilizado.
+    """
+    alias = models.CharField(max_length=50, db_index=True)
+    # durante uma mudança de shard o projeto fica só para leitura (ver projects/shards.py)
+    locked = models.BooleanField(default=False)
+
+    def __str__(self):
+        return f'#{self.pk} -> {self.alias}'
+
+
+class ProjectSnapshot(models.Model):
+    """Contagem de tarefas por status de um projeto no fim de um dia (ver projects/snapshots.py).
+
+    Gravada pelo fechamento diário para todos os projetos de uma vez; os
+    gráficos do projeto leem só estas linhas. Inclui as tarefas arquivadas.
+    """
+    project = models.ForeignKey(Project, on_delete=models.CASCADE, db_index=False, related_name='snapshots')
+    day = models.DateField()
+    open_count = models.PositiveIntegerField(default=0)
+    completed_count = models.PositiveIntegerField(default=0)
+    canceled_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            # uma linha por dia; o índice também é a série do gráfico (project = ? AND day BETWEEN ...)
+            models.UniqueConstraint(fields=['project', 'day'], name='projects_snapshot_unique'),
+        ]
+
+    def __str__(self):
+        return f'{self.project_id} @ {self.day}'
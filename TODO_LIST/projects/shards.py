@@ -0,0 +1,293 @@
+"""Diretório de shards dos projetos, middleware e ferramentas de manutenção (ver core/sharding.py)."""
+import time
+
+from django.apps import apps
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.http import HttpResponse
+
+from core.deletion import FastDeleter, fast_delete
+from core.sharding import is_sharded, is_sharded_setup, pin_shard, shard_aliases, unpin_shard
+from tasks.models import ArchivedTask, Task
+
+from .models import Project, ProjectShard
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+
+def assign_shard(project, alias=None):
+    """Reserva o id de um projeto novo e escolhe o shard dele (rodízio pelo id); None sem particionamento.
+
+    Com `alias`, o projeto vai para esse shard (ex.: a cópia de um projeto fica junto do original).
+    """
+    if not is_sharded_setup():
+        return None
+    aliases = shard_aliases()
+    entry = ProjectShard.objects.create(alias=alias or aliases[0])
+    alias = alias or aliases[entry.pk % len(aliases)]
+    if alias != entry.alias:
+        ProjectShard.objects.filter(pk=entry.pk).update(alias=alias)
+    project.pk = entry.pk
+    return alias
+
+
+def project_shard(project_id):
+    """Alias do shard do projeto (None se ele não estiver no diretório)."""
+    if not is_sharded_setup():
+        return DEFAULT_DB_ALIAS
+    return ProjectShard.objects.filter(pk=project_id).values_list('alias', flat=True).first()
+
+
+def project_for_task(task_id):
+    """Id do projeto da tarefa (ativa ou arquivada), procurando em cada shard pela chave primária."""
+    for alias in shard_aliases():
+        for model in (Task, ArchivedTask):
+            project_id = model.objects.using(alias).filter(pk=task_id).values_list('project_id', flat=True).first()
+            if project_id is not None:
+                return project_id
+    return None
+
+
+class ShardMiddleware:
+    """Fixa, durante a requisição, o shard do projeto (ou da tarefa) indicado na URL.
+
+    Reconhece o kwarg `project_id` e o `pk` das views cujo `model` é Project
+    ou Task. Com o projeto travado por `move_project`, só leituras passam.
+    Deve vir antes do ActivityBufferMiddleware, que grava no fim da requisição.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request._shard_token = None
+        try:
+            return self.get_response(request)
+        finally:
+            if request._shard_token is not None:
+                unpin_shard(request._shard_token)
+
+    def get_project_id(self, view_func, view_kwargs):
+        if 'project_id' in view_kwargs:
+            return int(view_kwargs['project_id'])
+        if 'pk' not in view_kwargs:
+            return None
+        model = getattr(getattr(view_func, 'view_class', None), 'model', None)
+        if model is Project:
+            return int(view_kwargs['pk'])
+        if model is Task:
+            return project_for_task(int(view_kwargs['pk']))
+        return None
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if not is_sharded_setup():
+            return None
+        project_id = self.get_project_id(view_func, view_kwargs)
+        if project_id is None:
+            return None
+        entry = ProjectShard.objects.filter(pk=project_id).values('alias', 'locked').first()
+        if entry is None:
+            return None  # projeto inexistente: a própria view responde 404
+        if entry['locked'] and request.method not in SAFE_METHODS:
+            response = HttpResponse('Projeto em manutenção. Tente novamente em instantes.', status=503)
+            response['Retry-After'] = '30'
+            return response
+        request._shard_token = pin_shard(entry['alias'])
+        return None
+
+
+def sync_directory(batch_size=5000):
+    """Registra no diretório os projetos que já existem em cada shard (ao ligar o particionamento)."""
+    added = 0
+    for alias in shard_aliases():
+        ids = Project.objects.using(alias).order_by('pk').values_list('pk', flat=True)
+        last = 0
+        while True:
+            batch = list(ids.filter(pk__gt=last)[:batch_size])
+            if not batch:
+                break
+            created = ProjectShard.objects.bulk_create(
+                [ProjectShard(pk=pk, alias=alias) for pk in batch], ignore_conflicts=True,
+            )
+            added += len(created)
+            last = batch[-1]
+    return added
+
+
+def delete_user_rows(user_id, progress=None):
+    """Aplica nos shards além do 'default' a cascata da exclusão de um usuário.
+
+    As FKs para users_user não existem lá, então o Collector e o fast_delete
+    do 'default' não alcançam essas linhas. Chamar antes de apagar o usuário.
+    """
+    from users.models import User
+
+    for alias in shard_aliases():
+        if alias != DEFAULT_DB_ALIAS:
+            FastDeleter(alias, progress=progress).delete_related(User, [user_id])
+
+
+def _project_lookup(model):
+    """Filtro que seleciona as linhas de `model` de um projeto (None se não houver caminho)."""
+    if model is Project:
+        return 'pk'
+    relations = [field for field in model._meta.concrete_fields if field.is_relation]
+    for field in relations:
+        if field.related_model is Project:
+            return field.attname
+    for field in relations:
+        if field.related_model is Task:
+            return f'{field.name}__project_id'
+    return None
+
+
+def _copy_order():
+    """Models particionados com linhas por projeto, com os referenciados antes de quem os referencia."""
+    models = [model for model in apps.get_models(include_auto_created=True) if is_sharded(model) and _project_lookup(model)]
+    ordered, done = [], set()
+    while len(ordered) < len(models):
+        size = len(ordered)
+        for model in models:
+            if model in done:
+                continue
+            # FKs sem constraint no banco (ex.: Task.recurrence) não impõem ordem de cópia
+            depends = {
+                field.related_model for field in model._meta.concrete_fields
+                if field.is_relation and field.db_constraint and field.related_model in models and field.related_model is not model
+            }
+            if depends <= done:
+                ordered.append(model)
+                done.add(model)
+        if len(ordered) == size:
+            raise ValueError('Ciclo de FKs entre os models particionados.')
+    return ordered
+
+
+FENCE_EVENTS = ('INSERT', 'UPDATE', 'DELETE')
+
+
+def _fence_condition(model, row, project_id, qn):
+    """Condição SQL sobre NEW/OLD (`row`) que identifica as linhas de `model` do projeto."""
+    lookup = _project_lookup(model)
+    if lookup == 'pk':
+        return f'{row}.{qn(model._meta.pk.column)} = {project_id:d}'
+    if '__' not in lookup:
+        return f'{row}.{qn(model._meta.get_field(lookup).column)} = {project_id:d}'
+    field = model._meta.get_field(lookup.split('__')[0])
+    return f'{row}.{qn(field.column)} IN (SELECT id FROM {qn(Task._meta.db_table)} WHERE project_id = {project_id:d})'
+
+
+def _fence_triggers(project_id, alias):
+    """{(nome, evento): sql} dos triggers que recusam escritas nas linhas do projeto no shard `alias`."""
+    qn = connections[alias].ops.quote_name
+    triggers = {}
+    for model in _copy_order():
+        table = model._meta.db_table
+        conditions = {
+            'INSERT': _fence_condition(model, 'NEW', project_id, qn),
+            'DELETE': _fence_condition(model, 'OLD', project_id, qn),
+        }
+        conditions['UPDATE'] = f'{conditions["DELETE"]} OR {_fence_condition(model, "NEW", project_id, qn)}'
+        for event, condition in conditions.items():
+            name = f'shard_fence_{project_id}_{table}_{event.lower()}'
+            triggers[name, event] = (
+                f'CREATE TRIGGER {qn(name)} BEFORE {event} ON {qn(table)} WHEN {condition}'
+                f" BEGIN SELECT RAISE(ABORT, 'Projeto {project_id} em mudança de shard.'); END"
+            )
+    return triggers
+
+
+def fence_writes(project_id, alias):
+    """Faz o banco `alias` recusar (IntegrityError) qualquer escrita nas linhas do projeto.
+
+    A trava do diretório só é vista pelo ShardMiddleware; os triggers barram
+    também jobs, comandos, sinais e SQL direto, que senão gravariam na origem
+    durante a cópia e se perderiam no fast_delete final. Um job barrado falha
+    e é reagendado pelo worker, e na nova tentativa o diretório já aponta
+    para o destino.
+    """
+    unfence_writes(project_id, alias)
+    with connections[alias].cursor() as cursor:
+        for sql in _fence_triggers(project_id, alias).values():
+            cursor.execute(sql)
+
+
+def unfence_writes(project_id, alias, events=FENCE_EVENTS):
+    qn = connections[alias].ops.quote_name
+    with connections[alias].cursor() as cursor:
+        for name, event in _fence_triggers(project_id, alias):
+            if event in events:
+                cursor.execute(f'DROP TRIGGER IF EXISTS {qn(name)}')
+
+
+def _copy_rows(model, project_id, source, target, batch_size):
+    lookup = _project_lookup(model)
+    fields = [field.attname for field in model._meta.concrete_fields]
+    pk_index = fields.index(model._meta.pk.attname)
+    queryset = model._base_manager.using(source).filter(**{lookup: project_id}).order_by('pk')
+    copied, last = 0, None
+    while True:
+        page = queryset if last is None else queryset.filter(pk__gt=last)
+        rows = list(page.values_list(*fields)[:batch_size])
+        if not rows:
+            return copied
+        model._base_manager.using(target).bulk_create([model(**dict(zip(fields, row))) for row in rows])
+        copied += len(rows)
+        last = rows[-1][pk_index]
+
+
+def move_project(project_id, target, batch_size=1000, grace_seconds=2, progress=None):
+    """Move o projeto e todas as linhas dele para o shard `target`, sem tirá-lo do ar para leitura.
+
+    1. trava o projeto no diretório (o ShardMiddleware passa a recusar
+       escritas com 503), barra no banco de origem as escritas nas linhas
+       dele vindas de qualquer lugar (`fence_writes`) e espera `grace_seconds`
+       pelas requisições em andamento;
+    2. copia as linhas em lotes, uma transação por lote, enquanto as leituras
+       continuam no shard de origem;
+    3. aponta o diretório para o destino e destrava, numa única atualização;
+    4. apaga as linhas da origem com fast_delete; inclusões atrasadas na
+       origem continuam barradas até o fim.
+
+    Os ids copiados continuam na faixa do shard de origem. Como o AUTOINCREMENT
+    do SQLite continua do maior id da tabela, o destino precisa vir depois da
+    origem em PROJECT_SHARDS (faixa mais alta); senão ele passaria a gerar ids
+    na faixa da origem. Rebalancear é, então, acrescentar um shard no fim da
+    lista e mover projetos para ele.
+
+    Se a cópia falhar, o que já foi copiado é apagado do destino e o projeto
+    é destravado na origem. `progress(label, copied)` é chamado após cada model.
+    Retorna o número de linhas copiadas.
+    """
+    source = ProjectShard.objects.get(pk=project_id).alias
+    aliases = shard_aliases()
+    if target not in aliases:
+        raise ValueError(f'Shard desconhecido: {target!r}.')
+    if source == target:
+        return 0
+    if aliases.index(target) < aliases.index(source):
+        raise ValueError(f'{target!r} vem antes de {source!r} em PROJECT_SHARDS; só é possível mover para shards posteriores.')
+
+    ProjectShard.objects.filter(pk=project_id).update(locked=True)
+    fence_writes(project_id, source)
+    time.sleep(grace_seconds)
+    models = _copy_order()
+    copied = 0
+    try:
+        for model in models:
+            copied += _copy_rows(model, project_id, source, target, batch_size)
+            if progress:
+                progress(model._meta.label, copied)
+    except Exception:
+        fast_delete(Project.objects.using(target).filter(pk=project_id), send_signals=False)
+        unfence_writes(project_id, source)
+        ProjectShard.objects.filter(pk=project_id).update(locked=False)
+        raise
+
+    ProjectShard.objects.filter(pk=project_id).update(alias=target, locked=False)
+    try:
+        # a cascata do fast_delete também faz UPDATEs (SET_NULL); só as inclusões continuam barradas
+        unfence_writes(project_id, source, events=('DELETE', 'UPDATE'))
+        fast_delete(Project.objects.using(source).filter(pk=project_id), send_signals=False)
+    finally:
+        unfence_writes(project_id, source)
+    return copied
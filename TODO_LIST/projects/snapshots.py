@@ -0,0 +1,92 @@
+"""Fechamento diário dos projetos e as séries dos gráficos de progresso.
+
+`take_snapshot` grava, para todos os projetos do shard, uma ProjectSnapshot
+com as tarefas abertas, concluídas e canceladas (ativas e arquivadas), num só
+`INSERT ... SELECT ... GROUP BY`. As contagens por (projeto, status) saem só
+dos índices tasks_task_board_idx e tasks_archived_status_idx. Rodar de novo
+no mesmo dia sobrescreve a linha do dia.
+
+`series` lê as linhas de um período e calcula com funções de janela do banco
+o que os gráficos precisam:
+
+- burndown: abertas e escopo (total) por dia;
+- fluxo acumulado: abertas, concluídas e canceladas por dia;
+- vazão: concluídas desde o fechamento anterior (LAG) e a média dos últimos
+  7 fechamentos.
+
+Nada é recalculado a partir do histórico das tarefas: um dia sem fechamento
+fica sem ponto, e a vazão do dia seguinte soma os dois.
+"""
+from datetime import timedelta
+
+from django.db import connections, transaction
+from django.utils import timezone
+
+from core.choices import OPEN_TASK_STATUSES, TaskStatus
+from core.sharding import db_for
+from tasks.models import ArchivedTask, Task
+from .models import Project, ProjectSnapshot
+
+# fechamentos na média móvel da vazão
+THROUGHPUT_WINDOW = 7
+
+
+def take_snapshot(day=None, using=None):
+    """Grava o fechamento de `day` (padrão: hoje) de todos os projetos do shard. Retorna o número de linhas."""
+    using = using or db_for(ProjectSnapshot)
+    connection = connections[using]
+    qn = connection.ops.quote_name
+    day = connection.ops.adapt_datefield_value(day or timezone.localdate())
+    open_marks = ', '.join(['%s'] * len(OPEN_TASK_STATUSES))
+    sql = (
+        f'INSERT INTO {qn(ProjectSnapshot._meta.db_table)} (project_id, day, open_count, completed_count, canceled_count)'
+        f' SELECT p.id, %s,'
+        f' COALESCE(SUM(CASE WHEN c.status IN ({open_marks}) THEN c.n END), 0),'
+        f' COALESCE(SUM(CASE WHEN c.status = %s THEN c.n END), 0),'
+        f' COALESCE(SUM(CASE WHEN c.status = %s THEN c.n END), 0)'
+        f' FROM {qn(Project._meta.db_table)} p LEFT JOIN ('
+        f'  SELECT project_id, status, COUNT(*) AS n FROM {qn(Task._meta.db_table)} GROUP BY project_id, status'
+        f'  UNION ALL'
+        f'  SELECT project_id, status, COUNT(*) FROM {qn(ArchivedTask._meta.db_table)} GROUP BY project_id, status'
+        f' ) c ON c.project_id = p.id'
+        f' WHERE true GROUP BY p.id'  # o WHERE desfaz a ambiguidade do ON CONFLICT depois de um SELECT no SQLite
+        f' ON CONFLICT (project_id, day) DO UPDATE SET open_count = excluded.open_count,'
+        f' completed_count = excluded.completed_count, canceled_count = excluded.canceled_count'
+    )
+    params = [day, *OPEN_TASK_STATUSES, TaskStatus.COMPLETED, TaskStatus.CANCELED]
+    with transaction.atomic(using=using), connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return cursor.rowcount
+
+
+def series(project, start, end):
+    """Séries de `start` a `end` em colunas: {'days': [...], 'open': [...], ...}, prontas para JSON."""
+    using = project._state.db or db_for(ProjectSnapshot)
+    connection = connections[using]
+    qn = connection.ops.quote_name
+    adapt = connection.ops.adapt_datefield_value
+    # lê fechamentos anteriores a `start` para o LAG e a média do primeiro dia
+    lead_in = start - timedelta(days=2 * THROUGHPUT_WINDOW)
+    sql = (
+        f'WITH s AS ('
+        f'  SELECT day, open_count, completed_count, canceled_count,'
+        f'   open_count + completed_count + canceled_count AS scope,'
+        # tarefas reabertas podem deixar a diferença negativa; a vazão não
+        f'   MAX(completed_count - LAG(completed_count) OVER (ORDER BY day), 0) AS done'
+        f'  FROM {qn(ProjectSnapshot._meta.db_table)} WHERE project_id = %s AND day >= %s AND day <= %s'
+        f'), w AS ('
+        f'  SELECT *, AVG(done) OVER (ORDER BY day ROWS BETWEEN {THROUGHPUT_WINDOW - 1} PRECEDING AND CURRENT ROW) AS done_avg FROM s'
+        f') SELECT day, open_count, completed_count, canceled_count, scope, done, done_avg FROM w WHERE day >= %s ORDER BY day'
+    )
+    data = {'days': [], 'open': [], 'completed': [], 'canceled': [], 'scope': [], 'done': [], 'done_avg': []}
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [project.pk, adapt(lead_in), adapt(end), adapt(start)])
+        for day, open_count, completed, canceled, scope, done, done_avg in cursor.fetchall():
+            data['days'].append(str(day))
+            data['open'].append(open_count)
+            data['completed'].append(completed)
+            data['canceled'].append(canceled)
+            data['scope'].append(scope)
+            data['done'].append(done or 0)
+            data['done_avg'].append(round(done_avg, 2) if done_avg is not None else None)
+    return data
@@ -1,3 +1,214 @@
-from django.test import TestCase
+import datetime
 
- #Create your tests here.
+from django.db import IntegrityError, connections, transaction
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from core.choices import TaskStatus
+from jobs.models import Job
+from jobs.worker import run_job
+from tasks import recurrence
+from tasks.models import ArchivedTask, InboxItem, Label, RecurrenceRule, Task, TaskActivity, TaskDependency
+from users.models import User
+
+from . import snapshots
+from .cloning import clone_project
+from .models import Project, ProjectShard, ProjectSnapshot
+from .shards import move_project, sync_directory
+
+
+class ProjectSnapshotTests(TestCase):
+    day = datetime.date(2026, 3, 2)
+
+    def setUp(self):
+        self.user = User.objects.create_user('dono@example.com', 'Dono', 'senha-123', cpf='1')
+        self.project = Project.objects.create(name='Projeto', owner=self.user)
+        self.empty = Project.objects.create(name='Vazio', owner=self.user)
+        for status in (TaskStatus.IN_PROGRESS, TaskStatus.IN_PROGRESS, TaskStatus.COMPLETED):
+            self.add_task(status)
+        ArchivedTask.objects.create(
+            id=10 ** 6, project=self.project, owner=self.user, name='Antiga', description='', start_date=self.day,
+            status=TaskStatus.CANCELED,
+        )
+
+    def add_task(self, status):
+        return Task.objects.create(project=self.project, owner=self.user, name='Tarefa', description='', start_date=self.day, status=status)
+
+    def counts(self, project, day):
+        return ProjectSnapshot.objects.filter(project=project, day=day).values_list('open_count', 'completed_count', 'canceled_count').get()
+
+    def test_snapshot_counts_every_project_including_archived(self):
+        self.assertEqual(snapshots.take_snapshot(self.day), 2)
+        self.assertEqual(self.counts(self.project, self.day), (2, 1, 1))
+        self.assertEqual(self.counts(self.empty, self.day), (0, 0, 0))
+
+        # rodar de novo no mesmo dia sobrescreve a linha
+        Task.objects.filter(project=self.project).update(status=TaskStatus.COMPLETED)
+        snapshots.take_snapshot(self.day)
+        self.assertEqual(self.counts(self.project, self.day), (0, 3, 1))
+
+    def test_series_throughput_from_consecutive_snapshots(self):
+        snapshots.take_snapshot(self.day - datetime.timedelta(days=1))
+        snapshots.take_snapshot(self.day)
+        Task.objects.filter(project=self.project, status=TaskStatus.IN_PROGRESS).update(status=TaskStatus.COMPLETED)
+        self.add_task(TaskStatus.IN_PROGRESS)
+        snapshots.take_snapshot(self.day + datetime.timedelta(days=1))
+
+        data = snapshots.series(self.project, self.day, self.day + datetime.timedelta(days=1))
+        self.assertEqual(data['days'], ['2026-03-02', '2026-03-03'])
+        self.assertEqual(data['open'], [2, 1])
+        self.assertEqual(data['scope'], [4, 5])
+        # o primeiro dia do período usa o fechamento anterior a ele
+        self.assertEqual(data['done'], [0, 2])
+        self.assertEqual(data['done_avg'], [0.0, 1.0])
+
+    @override_settings(RATE_LIMIT_ENABLED=False)
+    def test_progress_view_requires_participant(self):
+        snapshots.take_snapshot(timezone.localdate())
+        url = reverse('project-progress', args=[self.project.pk])
+        self.client.force_login(self.user)
+        response = self.client.get(url, {'days': 7})
+        self.assertEqual(response.json()['open'], [2])
+
+        outsider = User.objects.create_user('fora@example.com', 'Fora', 'senha-123', cpf='2')
+        self.client.force_login(outsider)
+        self.assertEqual(self.client.get(url).status_code, 403)
+
+
+class ProjectCloneTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('dono@example.com', 'Dono', 'senha-123', cpf='1')
+        self.member = User.objects.create_user('membro@example.com', 'Membro', 'senha-123', cpf='2')
+        self.project = Project.objects.create(
+            name='Modelo', owner=self.user, start_date=datetime.date(2026, 1, 1), end_date=datetime.date(2026, 1, 31),
+        )
+        self.project.participants.add(self.member)
+        label = Label.objects.create(project=self.project, name='infra')
+        self.first = self.add_task('Preparar', TaskStatus.COMPLETED, datetime.date(2026, 1, 2), datetime.date(2026, 1, 5))
+        self.second = self.add_task('Publicar', TaskStatus.IN_PROGRESS, datetime.date(2026, 1, 6), None)
+        self.first.labels.add(label)
+        TaskDependency.objects.create(task=self.second, depends_on=self.first)
+
+    def add_task(self, name, status, start_date, end_date):
+        return Task.objects.create(
+            project=self.project, owner=self.user, assigned_to=self.member, name=name, description='',
+            status=status, start_date=start_date, end_date=end_date,
+        )
+
+    def test_clone_copies_tasks_with_shifted_dates(self):
+        clone, copied = clone_project(self.project, self.member, 'Cópia', datetime.date(2026, 3, 1))
+
+        self.assertEqual((clone.owner, clone.end_date), (self.member, datetime.date(2026, 3, 31)))
+        self.assertEqual(set(clone.participant_ids()), {self.user.pk, self.member.pk})
+        self.assertEqual(copied['tarefas'], 2)
+        tasks = list(Task.objects.filter(project=clone).order_by('id'))
+        self.assertEqual(
+            [(task.name, task.status, task.start_date, task.end_date, task.rank) for task in tasks],
+            [
+                ('Preparar', TaskStatus.COMPLETED, datetime.date(2026, 3, 2), datetime.date(2026, 3, 5), self.first.rank),
+                ('Publicar', TaskStatus.IN_PROGRESS, datetime.date(2026, 3, 6), None, self.second.rank),
+            ],
+        )
+        self.assertEqual([label.project_id for label in tasks[0].labels.all()], [clone.pk])
+        self.assertEqual(list(TaskDependency.objects.filter(task=tasks[1]).values_list('depends_on', flat=True)), [tasks[0].pk])
+        self.assertEqual(list(InboxItem.objects.filter(project=clone).values_list('task', flat=True)), [tasks[1].pk])
+        self.assertEqual(TaskActivity.objects.filter(project=clone).count(), 2)
+        # o original não muda
+        self.assertEqual(Task.objects.filter(project=self.project).count(), 2)
+        self.assertEqual(TaskDependency.objects.count(), 2)
+
+    def test_clone_can_reset_status(self):
+        clone, _ = clone_project(self.project, self.user, 'Cópia', reset_status=True)
+        self.assertEqual(set(Task.objects.filter(project=clone).values_list('status', flat=True)), {TaskStatus.IN_PROGRESS})
+        self.assertEqual(InboxItem.objects.filter(project=clone).count(), 2)
+
+    @override_settings(RATE_LIMIT_ENABLED=False)
+    def test_clone_view_runs_large_projects_as_job(self):
+        url = reverse('project-clone', args=[self.project.pk])
+        data = {'name': 'Cópia', 'start_date': '2026-02-01'}
+        self.client.force_login(self.member)
+        response = self.client.post(url, data)
+        clone = Project.objects.get(name='Cópia')
+        self.assertRedirects(response, reverse('project-detail', args=[clone.pk]), fetch_redirect_response=False)
+        self.assertEqual(clone.owner, self.member)
+
+        with self.settings(PROJECT_CLONE_BACKGROUND_THRESHOLD=1):
+            response = self.client.post(url, {**data, 'name': 'Cópia grande', 'reset_status': 'on'})
+        job = Job.objects.get()
+        self.assertRedirects(response, reverse('job-detail', args=[job.pk]), fetch_redirect_response=False)
+        self.assertTrue(run_job(job))
+        clone = Project.objects.get(pk=Job.objects.get().result['project_id'])
+        self.assertEqual(
+            list(Task.objects.filter(project=clone).values_list('status', flat=True)),
+            [TaskStatus.IN_PROGRESS, TaskStatus.IN_PROGRESS],
+        )
+
+
+@override_settings(PROJECT_SHARDS=['default', 'shard_test'])
+class MoveProjectTests(TestCase):
+    databases = {'default', 'shard_test'}
+
+    def setUp(self):
+        self.user = User.objects.create_user('dono@example.com', 'Dono', 'senha-123', cpf='1')
+        self.user.save(using='shard_test', force_insert=True)  # o shard de teste tem as FKs para users_user
+        self.project = Project(name='Projeto', owner=self.user)
+        self.project.save(using='default')
+        sync_directory()
+        self.task = Task.objects.using('default').create(
+            project=self.project, owner=self.user, name='Tarefa', description='', start_date='2026-01-01',
+        )
+        label = Label.objects.using('default').create(project=self.project, name='infra')
+        self.task.labels.add(label)
+        recurrence.save_rule(RecurrenceRule(
+            template=self.task, starts_on=datetime.date(2026, 1, 1), frequency='daily',
+        ), today=datetime.date(2026, 1, 1))
+
+    def fences(self, alias):
+        with connections[alias].cursor() as cursor:
+            cursor.execute("SELECT COUNT(*) FROM sqlite_master WHERE type = 'trigger' AND name LIKE 'shard_fence_%%'")
+            return cursor.fetchone()[0]
+
+    def test_move_copies_everything_and_clears_the_source(self):
+        tasks = Task.objects.using('default').filter(project=self.project).count()
+        move_project(self.project.pk, 'shard_test', grace_seconds=0)
+
+        self.assertEqual(ProjectShard.objects.filter(pk=self.project.pk).values_list('alias', 'locked').get(), ('shard_test', False))
+        self.assertEqual(Task.objects.using('shard_test').filter(project_id=self.project.pk).count(), tasks)
+        self.assertEqual(Task.objects.using('shard_test').get(pk=self.task.pk).labels.get().name, 'infra')
+        self.assertEqual(RecurrenceRule.objects.using('shard_test').get().template_id, self.task.pk)
+        self.assertFalse(Project.objects.using('default').filter(pk=self.project.pk).exists())
+        self.assertFalse(Task.objects.using('default').filter(project_id=self.project.pk).exists())
+        self.assertEqual(self.fences('default'), 0)
+
+    def test_source_refuses_writes_from_outside_requests_during_the_copy(self):
+        other = Project(name='Outro', owner=self.user)
+        other.save(using='default')
+        attempts = []
+
+        def progress(label, copied):
+            if attempts:
+                return
+            # o que um job ou comando faria no meio da cópia, sem passar pelo ShardMiddleware
+            writes = {
+                'insert': lambda: Task.objects.using('default').create(
+                    project_id=self.project.pk, owner=self.user, name='Atrasada', description='', start_date='2026-01-01',
+                ),
+                'update': lambda: Task.objects.using('default').filter(pk=self.task.pk).update(name='Alterada'),
+                'label': lambda: Label.objects.using('default').create(project_id=self.project.pk, name='nova'),
+                'other project': lambda: Task.objects.using('default').create(
+                    project=other, owner=self.user, name='Livre', description='', start_date='2026-01-01',
+                ),
+            }
+            for name, write in writes.items():
+                try:
+                    with transaction.atomic(using='default'):
+                        write()
+                    attempts.append((name, 'ok'))
+                except IntegrityError:
+                    attempts.append((name, 'refused'))
+
+        move_project(self.project.pk, 'shard_test', grace_seconds=0, progress=progress)
+        self.assertEqual(attempts, [('insert', 'refused'), ('update', 'refused'), ('label', 'refused'), ('other project', 'ok')])
+        self.assertEqual(Task.objects.using('shard_test').get(pk=self.task.pk).name, 'Tarefa')
+        self.assertEqual(self.fences('default'), 0)
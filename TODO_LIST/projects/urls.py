@@ -1,7 +1,7 @@
 from django.urls import path
 from .views import (
     ProjectListView, ProjectDetailView,
-    ProjectCreateView, ProjectUpdateView, ProjectDeleteView,
+    ProjectCreateView, ProjectUpdateView, ProjectDeleteView, ProjectProgressView, ProjectCloneView,
     
 )
 
@@ -13,4 +13,6 @@ urlpatterns = [
     path('<int:pk>/', ProjectDetailView.as_view(), name='project-detail'),
     path('<int:pk>/edit/', ProjectUpdateView.as_view(), name='project-edit'),
     path('<int:pk>/delete/', ProjectDeleteView.as_view(),name='project-delete'),
+    path('<int:pk>/clone/', ProjectCloneView.as_view(), name='project-clone'),
+    path('<int:pk>/progress/', ProjectProgressView.as_view(), name='project-progress'),
 ]
@@ -1,9 +1,24 @@
-from django.views.generic import ListView, DetailView, CreateView, UpdateView, DeleteView
-from django.urls import reverse_lazy
+from datetime import timedelta
+
+from django.views.generic import ListView, DetailView, CreateView, UpdateView, DeleteView, FormView, View
+from django.views.generic.detail import SingleObjectMixin
+from django.urls import reverse, reverse_lazy
 from .models import Project
 from tasks.models import Task
-from .forms import ProjectForm
-from django.shortcuts import render
+from tasks.views import IncludeArchivedMixin, TaskFacetMixin
+from .cloning import clone_project
+from .forms import ProjectCloneForm, ProjectForm
+from .snapshots import series
+from django.shortcuts import render, redirect
+from django.http import JsonResponse
+from django.utils import timezone
+from django.conf import settings
+from core.choices import NotificationKind
+from core.deletion import fast_delete
+from core.sharding import sharded_list
+from core.versioning import VersionedUpdateMixin
+from jobs.registry import enqueue
+from notifications.services import notify
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.db import models
 from django.core.exceptions import PermissionDenied
@@ -14,20 +29,25 @@ class ProjectListView(LoginRequiredMixin, ListView):
     context_object_name = 'projects'
 
     def get_queryset(self):
-        return Project.objects.filter(
-            models.Q(owner=self.request.user) | models.Q(participants=self.request.user)
-        ).distinct()
+        # com vários shards, cada um responde pelos seus projetos e as listas são intercaladas
+        return sharded_list(
+            Project.objects.filter(
+                models.Q(owner=self.request.user) | models.Q(participants=self.request.user)
+            ).distinct().order_by('-id'),
+            key=lambda project: project.pk, reverse=True,
+        )
     
     
 
 class ProjectAccessMixin(LoginRequiredMixin):
     def dispatch(self, request, *args, **kwargs):
         project = self.get_object()
-        if request.user != project.owner and request.user not in project.participants.all():
+        if request.user != project.owner and not project.has_participant(request.user):
             raise PermissionDenied("Você não tem permissão para acessar este projeto.")
+        self.object = project  # as views de detalhe/edição releem; a de duplicar usa este
         return super().dispatch(request, *args, **kwargs)
 
-class ProjectDetailView(ProjectAccessMixin, DetailView):
+class ProjectDetailView(ProjectAccessMixin, IncludeArchivedMixin, TaskFacetMixin, DetailView):
     model = Project
     template_name = 'projects/project_detail.html'
     context_object_name = 'project'
@@ -41,11 +61,46 @@ class ProjectDetailView(ProjectAccessMixin, DetailView):
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         # self.object é o projeto que está sendo exibido
-        context['tasks'] = Task.objects.filter(project=self.object)
+        context.update(self.get_facet_context(Task.objects.filter(project=self.object), project=self.object))
+        context['include_archived'] = self.include_archived()
+        context['archived_tasks'] = self.get_archived_tasks(project=self.object)
         return context
 
 
-class ProjectCreateView(LoginRequiredMixin, CreateView):
+class ProjectProgressView(ProjectAccessMixin, SingleObjectMixin, View):
+    """Séries dos gráficos de progresso (?days=N, até 365) lidas dos fechamentos diários, em JSON por colunas."""
+    model = Project
+    default_days = 90
+    max_days = 365
+
+    def get(self, request, *args, **kwargs):
+        self.object = self.get_object()
+        try:
+            days = min(max(int(request.GET.get('days', self.default_days)), 1), self.max_days)
+        except ValueError:
+            days = self.default_days
+        end = timezone.localdate()
+        data = series(self.object, end - timedelta(days=days - 1), end)
+        response = JsonResponse(data, json_dumps_params={'separators': (',', ':')})
+        # os fechamentos mudam uma vez por dia
+        response['Cache-Control'] = 'private, max-age=300'
+        return response
+
+
+class NotifyParticipantsMixin:
+    """Avisa quem foi adicionado ao projeto pelo formulário (uma notificação por pessoa, num só INSERT)."""
+
+    def form_valid(self, form):
+        response = super().form_valid(form)
+        notify(
+            form.added_participants, NotificationKind.PROJECT_JOINED,
+            f'{self.request.user.name} adicionou você ao projeto "{self.object.name}"',
+            reverse('project-detail', args=[self.object.pk]),
+        )
+        return response
+
+
+class ProjectCreateView(LoginRequiredMixin, NotifyParticipantsMixin, CreateView):
     model = Project
     
     template_name = 'projects/project_form.html'
@@ -57,7 +112,7 @@ class ProjectCreateView(LoginRequiredMixin, CreateView):
         form.instance.owner = self.request.user
         return super().form_valid(form)
 
-class ProjectUpdateView(ProjectAccessMixin, UpdateView):
+class ProjectUpdateView(ProjectAccessMixin, NotifyParticipantsMixin, VersionedUpdateMixin, UpdateView):
     model = Project
     form_class = ProjectForm
     template_name = 'projects/project_form.html'
@@ -67,3 +122,34 @@ class ProjectDeleteView(ProjectAccessMixin, DeleteView):
     model = Project
     template_name = 'projects/project_confirm_delete.html'
     success_url = reverse_lazy('project-list')
+
+    def form_valid(self, form):
+        # projetos grandes são apagados pelos workers; a resposta volta na hora com o id do job
+        task_count = Task.objects.filter(project=self.object).count()
+        if task_count > settings.FAST_DELETE_BACKGROUND_THRESHOLD:
+            job = enqueue('projects.delete_project', owner=self.request.user, project_id=self.object.pk)
+            return redirect('job-detail', pk=job.pk)
+        fast_delete(Project.objects.filter(pk=self.object.pk))
+        return redirect(self.get_success_url())
+
+
+class ProjectCloneView(ProjectAccessMixin, SingleObjectMixin, FormView):
+    """Duplica o projeto com participantes e tarefas (ver projects/cloning.py); a cópia é de quem a pediu."""
+    model = Project
+    form_class = ProjectCloneForm
+    template_name = 'projects/project_clone.html'
+
+    def get_initial(self):
+        return {'name': f'Cópia de {self.object.name}', 'start_date': timezone.localdate()}
+
+    def form_valid(self, form):
+        data = form.cleaned_data
+        # projetos grandes são copiados pelos workers; a resposta volta na hora com o id do job
+        if Task.objects.filter(project=self.object).count() > settings.PROJECT_CLONE_BACKGROUND_THRESHOLD:
+            job = enqueue(
+                'projects.clone_project', owner=self.request.user, project_id=self.object.pk,
+                project_name=data['name'], start_date=data['start_date'].isoformat(), reset_status=data['reset_status'],
+            )
+            return redirect('job-detail', pk=job.pk)
+        clone, _ = clone_project(self.object, self.request.user, data['name'], data['start_date'], data['reset_status'])
+        return redirect('project-detail', pk=clone.pk)
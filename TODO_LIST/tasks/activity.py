@@ -0,0 +1,75 @@
+from contextvars import ContextVar
+from datetime import date, datetime
+
+from django.db import models
+
+from core.choices import TaskEvent
+from .models import TaskActivity
+
+# lista de TaskActivity pendentes da requisição atual (None fora de uma requisição)
+_buffer = ContextVar('task_activity_buffer', default=None)
+
+
+def _json_value(value):
+    if isinstance(value, models.Model):
+        return value.pk
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    return value
+
+
+def record(task, event, actor=None, changes=None):
+    """Registra um evento da tarefa.
+
+    Dentro de uma requisição o registro só vai para o banco no fim dela, junto
+    com os demais, num único bulk_create (ActivityBufferMiddleware). Fora de
+    requisições (comandos, jobs) é gravado na hora.
+    """
+    entry = TaskActivity(
+        task_id=task.pk,
+        project_id=task.project_id,
+        actor=actor if actor is not None and actor.is_authenticated else None,
+        event=event,
+        changes={field: [_json_value(old), _json_value(new)] for field, (old, new) in (changes or {}).items()},
+    )
+    pending = _buffer.get()
+    if pending is None:
+        entry.save()
+    else:
+        pending.append(entry)
+
+
+def record_form_changes(task, form, actor=None):
+    """Registra as alterações de um TaskForm, separando status e responsável em eventos próprios."""
+    changes = {field: (form.initial.get(field), form.cleaned_data.get(field)) for field in form.changed_data}
+    if 'status' in changes:
+        record(task, TaskEvent.STATUS_CHANGED, actor, {'status': changes.pop('status')})
+    if 'assigned_to' in changes:
+        record(task, TaskEvent.REASSIGNED, actor, {'assigned_to': changes.pop('assigned_to')})
+    if changes:
+        record(task, TaskEvent.UPDATED, actor, changes)
+
+
+def flush():
+    pending = _buffer.get()
+    if pending:
+        TaskActivity.objects.bulk_create(pending)
+        pending.clear()
+
+
+class ActivityBufferMiddleware:
+    """Acumula os eventos de tarefa da requisição e grava todos de uma vez ao final."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        token = _buffer.set([])
+        try:
+            response = self.get_response(request)
+            # com erro 5xx a alteração provavelmente não foi gravada; descarta o histórico junto
+            if response.status_code < 500:
+                flush()
+        finally:
+            _buffer.reset(token)
+        return response
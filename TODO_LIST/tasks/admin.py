@@ -1,7 +1,38 @@
 from django.contrib import admin
-from .models import Task
+from core.paginator import EstimatedCountPaginator
+from .models import Task, ArchivedTask, RecurrenceRule
 
 class TaskAdmin(admin.ModelAdmin):
-    list_display = ['name', 'project', 'status', 'start_date', 'end_date'] 
+    list_display = ['name', 'project', 'status', 'priority', 'start_date', 'end_date']
+    list_select_related = ['project']
+    list_filter = ['status', 'priority']
+    search_fields = ['^name']
+    autocomplete_fields = ['project', 'assigned_to', 'owner']
+    list_per_page = 50
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False  # evita um segundo COUNT(*) na tabela inteira
 
 admin.site.register(Task, TaskAdmin)
+
+
+@admin.register(ArchivedTask)
+class ArchivedTaskAdmin(admin.ModelAdmin):
+    list_display = ['name', 'project', 'status', 'end_date', 'archived_at']
+    list_select_related = ['project']
+    list_filter = ['status']
+    search_fields = ['^name']
+    raw_id_fields = ['project', 'assigned_to', 'owner']
+    list_per_page = 50
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+
+@admin.register(RecurrenceRule)
+class RecurrenceRuleAdmin(admin.ModelAdmin):
+    list_display = ['template', 'frequency', 'interval', 'starts_on', 'until', 'next_occurrence']
+    list_select_related = ['template']
+    list_filter = ['frequency']
+    raw_id_fields = ['template']
+    list_per_page = 50
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
@@ -4,3 +4,8 @@ from django.apps import AppConfig
 class TasksConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'tasks'
+
+    def ready(self):
+        from . import checks  # noqa: F401 (registra a verificação dos triggers do feed)
+        from .inbox import connect_signals
+        connect_signals()
@@ -0,0 +1,124 @@
+from datetime import timedelta
+
+from django.db import models, transaction
+from django.utils import timezone
+
+from core.choices import TaskStatus
+from core.sharding import connection_for, db_for
+from .graph import would_create_cycle
+from .inbox import sync_inbox
+from .models import Task, ArchivedTask, Label, TaskDependency, TaskLabel
+
+ARCHIVABLE_STATUSES = [TaskStatus.COMPLETED, TaskStatus.CANCELED]
+
+
+def _shared_columns():
+    # colunas que existem nas duas tabelas (todas as de Task); archived_at é só do arquivo
+    archived = {field.column for field in ArchivedTask._meta.concrete_fields}
+    return [field.column for field in Task._meta.concrete_fields if field.column in archived]
+
+
+def _copy_rows(source, target, ids, extra_columns=None):
+    """INSERT ... SELECT das linhas `ids` de uma tabela para a outra, sem passar pelo Python."""
+    connection = connection_for(Task)
+    qn = connection.ops.quote_name
+    extra_columns = extra_columns or {}
+    columns = _shared_columns()
+    insert_columns = columns + list(extra_columns)
+    select_columns = [qn(column) for column in columns] + ['%s'] * len(extra_columns)
+    placeholders = ', '.join(['%s'] * len(ids))
+    sql = (
+        f'INSERT INTO {qn(target)} ({", ".join(qn(c) for c in insert_columns)}) '
+        f'SELECT {", ".join(select_columns)} FROM {qn(source)} WHERE {qn("id")} IN ({placeholders})'
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [*extra_columns.values(), *ids])
+
+
+def _save_links(ids):
+    """Guarda nas linhas arquivadas `ids` as etiquetas e as arestas de dependência da tabela quente."""
+    connection = connection_for(Task)
+    qn = connection.ops.quote_name
+    archived, edges = qn(ArchivedTask._meta.db_table), qn(TaskDependency._meta.db_table)
+    placeholders = ', '.join(['%s'] * len(ids))
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'UPDATE {archived} SET'
+            f' label_ids = (SELECT json_group_array(label_id) FROM {qn(TaskLabel._meta.db_table)} WHERE task_id = {archived}.id),'
+            f' blocker_ids = (SELECT json_group_array(depends_on_id) FROM {edges} WHERE task_id = {archived}.id),'
+            f' dependent_ids = (SELECT json_group_array(task_id) FROM {edges} WHERE depends_on_id = {archived}.id)'
+            f' WHERE id IN ({placeholders})',
+            ids,
+        )
+
+
+def _restore_links(archived):
+    """Recria as etiquetas e as dependências guardadas em `archived` (ainda no arquivo).
+
+    Etiquetas apagadas nesse meio tempo ficam de fora. Arestas com a outra
+    ponta ainda arquivada ficam para quando ela voltar (as duas guardam a
+    aresta); as que fechariam um ciclo com dependências criadas depois do
+    arquivamento são descartadas.
+    """
+    connection = connection_for(Task)
+    qn = connection.ops.quote_name
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'INSERT INTO {qn(TaskLabel._meta.db_table)} (task_id, label_id)'
+            f' SELECT a.id, j.value FROM {qn(ArchivedTask._meta.db_table)} a, json_each(a.label_ids) j'
+            f' WHERE a.id = %s AND j.value IN (SELECT id FROM {qn(Label._meta.db_table)})',
+            [archived.pk],
+        )
+    pk = archived.pk
+    edges = [(pk, other) for other in archived.blocker_ids] + [(other, pk) for other in archived.dependent_ids]
+    hot = set(Task.objects.filter(pk__in={other for edge in edges for other in edge} - {pk}).values_list('pk', flat=True))
+    for task_id, depends_on_id in edges:
+        other = depends_on_id if task_id == pk else task_id
+        # uma a uma: a checagem de ciclo precisa ver as arestas já recriadas
+        if other in hot and not would_create_cycle(task_id, depends_on_id):
+            TaskDependency.objects.bulk_create([TaskDependency(task_id=task_id, depends_on_id=depends_on_id)], ignore_conflicts=True)
+
+
+def archivable_tasks(older_than_days):
+    """Tarefas finalizadas cujo prazo (ou início, se não houver prazo) é anterior ao limite.
+
+    Modelos de tarefas recorrentes ficam: as próximas ocorrências são copiadas delas.
+    """
+    cutoff = timezone.localdate() - timedelta(days=older_than_days)
+    return Task.objects.filter(status__in=ARCHIVABLE_STATUSES, recurrence_rule__isnull=True).filter(
+        models.Q(end_date__lt=cutoff) | models.Q(end_date__isnull=True, start_date__lt=cutoff)
+    )
+
+
+def archive_finished_tasks(older_than_days, batch_size=1000, progress=None):
+    """Move as tarefas finalizadas antigas para tasks_archivedtask, um lote por transação.
+
+    Cada lote é copiado com INSERT ... SELECT e apagado da tabela quente na
+    mesma transação, então o lock de escrita do SQLite fica preso só pelo
+    tempo de um lote. `progress(moved)` é chamado após cada lote.
+    """
+    queryset = archivable_tasks(older_than_days)
+    moved = 0
+    while True:
+        ids = list(queryset.order_by().values_list('id', flat=True)[:batch_size])
+        if not ids:
+            break
+        with transaction.atomic(using=db_for(Task)):
+            _copy_rows(Task._meta.db_table, ArchivedTask._meta.db_table, ids, {'archived_at': timezone.now(), 'label_ids': '[]', 'blocker_ids': '[]', 'dependent_ids': '[]'})
+            _save_links(ids)
+            Task.objects.filter(pk__in=ids).delete()
+        moved += len(ids)
+        if progress:
+            progress(moved)
+    return moved
+
+
+def restore_task(pk):
+    """Traz uma tarefa arquivada de volta para tasks_task, mantendo o id, as etiquetas e as dependências."""
+    with transaction.atomic(using=db_for(Task)):
+        archived = ArchivedTask.objects.get(pk=pk)
+        _copy_rows(ArchivedTask._meta.db_table, Task._meta.db_table, [pk])
+        _restore_links(archived)
+        ArchivedTask.objects.filter(pk=pk).delete()
+        sync_inbox([pk])
+    return Task.objects.get(pk=pk)
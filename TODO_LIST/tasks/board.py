@@ -0,0 +1,124 @@
+"""Quadro Kanban do projeto: uma coluna por TaskStatus, ordenada por `Task.rank`.
+
+As colunas são paginadas por keyset em (rank, id), que é o índice
+tasks_task_board_idx. Mover um cartão calcula uma chave entre os vizinhos
+(core/ranking.py) e grava só a linha dele.
+"""
+from django.db import transaction
+from django.db.models import F, Q
+from django.urls import reverse
+
+from core.choices import TaskStatus
+from core.ranking import rank_after, rank_before, rank_between, spread_ranks
+from core.sharding import db_for
+
+from .inbox import sync_inbox
+from .models import Task
+
+BOARD_PAGE_SIZE = 20
+
+
+def column_queryset(project_id, status):
+    return Task.objects.filter(project_id=project_id, status=status).order_by('rank', 'id')
+
+
+def encode_cursor(task):
+    return f'{task.rank}:{task.pk}'
+
+
+def decode_cursor(cursor):
+    rank, _, pk = (cursor or '').rpartition(':')
+    if not pk.isdigit():
+        return None
+    return rank, int(pk)
+
+
+def after_cursor(queryset, rank, pk):
+    # rank >= ? vira busca por faixa no índice; o OR só desempata as chaves iguais
+    return queryset.filter(Q(rank__gt=rank) | Q(id__gt=pk), rank__gte=rank)
+
+
+def column_page(project_id, status, cursor=None, limit=BOARD_PAGE_SIZE):
+    """Uma página da coluna depois de `cursor`; retorna (tarefas, próximo cursor ou None)."""
+    queryset = column_queryset(project_id, status).prefetch_related('assigned_to')
+    position = decode_cursor(cursor)
+    if position:
+        queryset = after_cursor(queryset, *position)
+    page = list(queryset[:limit + 1])
+    has_more = len(page) > limit
+    page = page[:limit]
+    return page, (encode_cursor(page[-1]) if has_more else None)
+
+
+def serialize_card(task):
+    return {
+        'id': task.pk,
+        'name': task.name,
+        'assigned_to': str(task.assigned_to) if task.assigned_to_id else None,
+        'priority': task.get_priority_display(),
+        'end_date': task.end_date.isoformat() if task.end_date else None,
+        'url': reverse('task-detail', args=[task.pk]),
+        'move_url': reverse('task-move', args=[task.pk]),
+    }
+
+
+def board_columns(project_id, limit=BOARD_PAGE_SIZE):
+    """Primeira página de cada coluna (uma consulta por status)."""
+    columns = []
+    for status in TaskStatus:
+        tasks, cursor = column_page(project_id, status, limit=limit)
+        columns.append({'status': status, 'label': status.label, 'tasks': tasks, 'cursor': cursor})
+    return columns
+
+
+def rebalance_column(project_id, status):
+    """Reescreve as chaves da coluna, igualmente espaçadas, mantendo a ordem atual."""
+    ids = list(column_queryset(project_id, status).values_list('id', flat=True))
+    tasks = [Task(id=pk, rank=rank) for pk, rank in zip(ids, spread_ranks(len(ids)))]
+    Task.objects.bulk_update(tasks, ['rank'], batch_size=1000)
+
+
+def _neighbours(task, status, before_id):
+    """Chaves do cartão de cima (`before_id`, None = topo) e do seguinte na coluna de destino."""
+    column = column_queryset(task.project_id, status).exclude(pk=task.pk)
+    before_rank = None
+    if before_id:
+        before = column.filter(pk=before_id).values_list('rank', 'id').first()
+        if before is None:
+            raise Task.DoesNotExist('O cartão de referência não está nesta coluna.')
+        before_rank = before[0]
+        column = after_cursor(column, *before)
+    after_rank = column.values_list('rank', flat=True).first()
+    return before_rank, after_rank
+
+
+def _rank_for(before_rank, after_rank):
+    if after_rank is None:
+        return rank_after(before_rank)
+    if before_rank is None:
+        return rank_before(after_rank) if after_rank else None
+    if before_rank < after_rank:
+        return rank_between(before_rank, after_rank)
+    return None  # vizinhos com a mesma chave (ex.: criados por bulk_create)
+
+
+def move_task(task, status, before_id=None):
+    """Coloca `task` na coluna `status`, logo abaixo do cartão `before_id` (None = topo).
+
+    Normalmente atualiza só a linha da tarefa; se os vizinhos não deixarem
+    espaço entre as chaves, a coluna é reordenada uma vez antes.
+    """
+    with transaction.atomic(using=db_for(Task)):
+        rank = _rank_for(*_neighbours(task, status, before_id))
+        if rank is None:
+            rebalance_column(task.project_id, status)
+            rank = _rank_for(*_neighbours(task, status, before_id))
+        updates = {'status': status, 'rank': rank}
+        if status != task.status:
+            # mudança de status conta como edição (core/versioning.py); só reordenar não
+            updates['version'] = F('version') + 1
+        Task.objects.filter(pk=task.pk).update(**updates)
+        if status != task.status:
+            sync_inbox([task.pk])
+    task.status, task.rank = status, rank
+    return task
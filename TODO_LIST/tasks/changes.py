@@ -0,0 +1,157 @@
+"""Feed de alterações para sincronização incremental (clientes e integrações).
+
+tasks_changelog guarda a última alteração de cada tarefa, projeto e acesso,
+numerada por `seq`, que só cresce dentro do shard. Triggers do SQLite em
+tasks_task, projects_project e na tabela de participantes gravam a linha na
+mesma transação da alteração, então `.update()`, SQL direto, fast_delete e o
+arquivamento entram no feed sem código nenhum nos chamadores:
+
+- inclusão ou alteração: a linha do objeto vai para o fim (seq novo);
+- exclusão: a linha vira lápide (`deleted`); arquivar uma tarefa também a
+  tira do feed, e restaurá-la a traz de volta;
+- tarefa que muda de projeto: lápide no projeto antigo e linha no novo;
+- alguém sai dos participantes: linha de acesso com `deleted` só para essa
+  pessoa, que deve descartar o projeto e as tarefas dele. Quem entra recebe
+  a linha de acesso sem `deleted` e busca o projeto do zero com
+  `?project=<id>` (as tarefas antigas estão antes do cursor dele).
+
+Os triggers são criados pela migração 0019_changelog. No SQLite, recriar uma
+dessas tabelas (um AlterField, por exemplo) os apaga: a migração que fizer
+isso precisa criá-los de novo, e a verificação tasks.W001 (tasks/checks.py)
+aponta os que faltam.
+
+Como há uma linha por objeto, o feed não cresce com o número de alterações,
+e um cliente que volta depois de muito tempo recebe só o estado final.
+
+O cursor é o último seq lido de cada shard, separados por ponto, na ordem
+de PROJECT_SHARDS. Mudar um projeto de shard gera lápides na origem e
+inclusões no destino, que o cliente pode ler em qualquer ordem: depois de um
+move_project os participantes devem sincronizar o projeto de novo.
+"""
+import heapq
+from itertools import islice
+
+from django.db import connections, transaction
+
+from core.choices import ChangeKind
+from core.sharding import shard_aliases
+from projects.models import Project
+
+from .models import ChangeLog, Task
+
+FEED_PAGE_SIZE = 500
+# acima disso o feed percorre o índice de seq em vez de ler uma faixa por projeto (ver _shard_changes)
+MERGE_MAX_PROJECTS = 50
+
+KIND_NAMES = {ChangeKind.TASK: 'task', ChangeKind.PROJECT: 'project', ChangeKind.ACCESS: 'access'}
+TASK_FIELDS = [
+    'id', 'project_id', 'name', 'description', 'status', 'priority', 'owner_id', 'assigned_to_id',
+    'start_date', 'end_date', 'rank', 'version',
+]
+PROJECT_FIELDS = ['id', 'name', 'description', 'status', 'owner_id', 'start_date', 'end_date', 'version']
+TRIGGERS = [
+    'changelog_task_insert', 'changelog_task_update', 'changelog_task_delete',
+    'changelog_project_insert', 'changelog_project_update', 'changelog_project_delete',
+    'changelog_access_insert', 'changelog_access_delete',
+]
+
+
+def missing_triggers(using):
+    """Triggers do feed que faltam no banco `using` (o SQL deles está na migração 0019_changelog)."""
+    with connections[using].cursor() as cursor:
+        cursor.execute("SELECT name FROM sqlite_master WHERE type = 'trigger' AND name LIKE 'changelog_%'")
+        present = {name for name, in cursor.fetchall()}
+    return [name for name in TRIGGERS if name not in present]
+
+
+def encode_cursor(seqs):
+    return '.'.join(map(str, seqs))
+
+
+def decode_cursor(cursor, size):
+    """Seqs por shard; shards que o cursor não conhece (acrescentados depois) começam do zero."""
+    parts = [part for part in (cursor or '').split('.') if part]
+    if not all(part.isdigit() for part in parts) or len(parts) > size:
+        raise ValueError('Cursor inválido.')
+    return [int(part) for part in parts] + [0] * (size - len(parts))
+
+
+def _scan(alias, projects, user_id, after, limit):
+    """Alterações depois de `after` em ordem de seq, percorrendo o índice de seq e filtrando os projetos."""
+    connection = connections[alias]
+    marks = ', '.join(['%s'] * len(projects))
+    sql = (
+        f'SELECT seq, kind, object_id, project_id, deleted FROM {connection.ops.quote_name(ChangeLog._meta.db_table)}'
+        # `+project_id`: o SQLite não pode trocar o índice de seq pelo de projeto, que o faria ordenar tudo o que falta
+        f' WHERE seq > %s AND ((user_id IS NULL AND +project_id IN ({marks})) OR user_id = %s) ORDER BY seq LIMIT %s'
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [after, *projects, user_id, limit])
+        return cursor.fetchall()
+
+
+def _shard_changes(user, alias, after, limit, project_id=None):
+    """Até `limit` alterações do shard depois de `after`, com os dados atuais dos objetos vivos.
+
+    Com poucos projetos visíveis, cada um é uma faixa já ordenada do índice
+    (project_id, seq), lida com LIMIT, e as faixas são intercaladas aqui. Com
+    muitos, as faixas leriam até `limit` linhas cada; aí o índice de seq é
+    percorrido uma vez, pulando os projetos dos outros. Um único
+    `project_id IN (...)` faria o SQLite ordenar a cada lote todas as
+    alterações restantes.
+    """
+    links = Project.participants.through.objects.using(alias)
+    if project_id is None:
+        projects = list(links.filter(user_id=user.pk).values_list('project_id', flat=True))
+    else:
+        # sem acesso ao projeto, só a linha de acesso do próprio usuário aparece
+        projects = list(links.filter(user_id=user.pk, project_id=project_id).values_list('project_id', flat=True))
+    if len(projects) > MERGE_MAX_PROJECTS:
+        rows = _scan(alias, projects, user.pk, after, limit + 1)
+    else:
+        log = ChangeLog.objects.using(alias).filter(seq__gt=after).order_by('seq').values_list('seq', 'kind', 'object_id', 'project_id', 'deleted')
+        access = log.filter(user_id=user.pk) if project_id is None else log.filter(user_id=user.pk, project_id=project_id)
+        ranges = [log.filter(user_id__isnull=True, project_id=project) for project in projects] + [access]
+        rows = list(islice(heapq.merge(*(queryset[:limit + 1] for queryset in ranges)), limit + 1))
+    more = len(rows) > limit
+    rows = rows[:limit]
+    live = {ChangeKind.TASK: [], ChangeKind.PROJECT: []}
+    for _, kind, object_id, _, deleted in rows:
+        if kind in live and not deleted:
+            live[kind].append(object_id)
+    data = {
+        ChangeKind.TASK: {row['id']: row for row in Task.objects.using(alias).filter(pk__in=live[ChangeKind.TASK]).values(*TASK_FIELDS)},
+        ChangeKind.PROJECT: {row['id']: row for row in Project.objects.using(alias).filter(pk__in=live[ChangeKind.PROJECT]).values(*PROJECT_FIELDS)},
+    }
+    entries = []
+    for _, kind, object_id, row_project_id, deleted in rows:
+        entry = {'type': KIND_NAMES[kind], 'id': object_id, 'project': row_project_id}
+        if kind == ChangeKind.ACCESS:
+            entry['deleted'] = bool(deleted)
+        elif deleted or object_id not in data[kind]:
+            entry['deleted'] = True
+        else:
+            entry['data'] = data[kind][object_id]
+        entries.append(entry)
+    return entries, (rows[-1][0] if rows else after), more
+
+
+def feed(user, cursor=None, limit=FEED_PAGE_SIZE, project_id=None):
+    """Alterações visíveis a `user` depois de `cursor`, em ordem; retorna (alterações, próximo cursor, há mais).
+
+    Cada shard é lido numa transação, para que a linha do feed e os dados do
+    objeto venham do mesmo instante. Levanta ValueError com cursor inválido.
+    """
+    aliases = shard_aliases()
+    seqs = decode_cursor(cursor, len(aliases))
+    entries, more = [], False
+    for index, alias in enumerate(aliases):
+        if len(entries) >= limit:
+            more = True
+            break
+        with transaction.atomic(using=alias):
+            shard_entries, last, shard_more = _shard_changes(user, alias, seqs[index], limit - len(entries), project_id)
+        entries += shard_entries
+        seqs[index] = last
+        more = more or shard_more
+    return entries, encode_cursor(seqs), more
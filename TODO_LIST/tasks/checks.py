@@ -0,0 +1,32 @@
+"""Verificação dos triggers do feed de alterações (tasks/changes.py).
+
+Roda quando a verificação recebe `databases` (migrate, `check --database`,
+os testes): num shard SQLite já migrado, falta de um trigger changelog_*
+deixa o feed desatualizado sem erro nenhum.
+"""
+from django.core.checks import Tags, Warning, register
+from django.db import connections
+
+from core.sharding import shard_aliases
+
+
+@register(Tags.database)
+def check_changelog_triggers(app_configs=None, databases=None, **kwargs):
+    from .changes import missing_triggers
+    from .models import ChangeLog
+
+    warnings = []
+    for alias in databases or ():
+        connection = connections[alias]
+        if alias not in shard_aliases() or connection.vendor != 'sqlite':
+            continue
+        if ChangeLog._meta.db_table not in connection.introspection.table_names():
+            continue  # ainda não migrado
+        missing = missing_triggers(alias)
+        if missing:
+            warnings.append(Warning(
+                f'O banco {alias!r} não tem os triggers {", ".join(missing)}: o feed de alterações para de ser atualizado.',
+                hint='Recrie-os com o SQL da migração tasks/0019_changelog (uma migração que recria a tabela no SQLite os apaga).',
+                id='tasks.W001',
+            ))
+    return warnings
@@ -0,0 +1,139 @@
+"""Filtro facetado das listas de tarefas: etiquetas, status e prioridade.
+
+As contagens de todas as facetas saem de duas consultas agregadas,
+independente de quantos valores existam:
+
+1. status x prioridade, com o filtro de etiquetas: no máximo 3 x 3 linhas;
+   as contagens de cada faceta são somadas no Python a partir delas;
+2. etiquetas, com o filtro completo: um GROUP BY label_id sobre tasks_tasklabel.
+   Na lista de um projeto sem filtro, conta direto pelas faixas do índice
+   (label, task) das etiquetas do projeto, sem passar por tasks_task.
+
+As etiquetas do filtro são combinadas com E (interseção): cada uma vira um
+`id IN (SELECT task_id ... WHERE label_id = ?)`, respondido pelo índice
+(label, task).
+
+Com vários shards (core/sharding.py), uma lista sem projeto faz as mesmas
+consultas em cada shard: as contagens são somadas e a página é intercalada
+por id.
+"""
+from django.db.models import Count
+
+from core.choices import TaskPriority, TaskStatus
+from core.sharding import read_aliases, sharded_list
+
+from .models import Label, TaskLabel
+
+LABEL_FACET_LIMIT = 50
+MAX_SELECTED_LABELS = 10
+PAGE_SIZE = 50
+
+
+class TaskFacets:
+    def __init__(self, queryset, params, project=None, page_size=PAGE_SIZE):
+        self.base = queryset  # com `project`, deve ser exatamente as tarefas do projeto
+        self.project = project
+        self.params = params
+        self.page_size = page_size
+        self.status = params.get('status') if params.get('status') in TaskStatus.values else None
+        self.priority = params.get('priority') if params.get('priority') in TaskPriority.values else None
+        label_ids = {int(value) for value in params.getlist('label') if value.isdigit()}
+        self.label_ids = sorted(label_ids)[:MAX_SELECTED_LABELS]
+        page = params.get('page', '')
+        self.page = max(int(page), 1) if page.isdigit() else 1
+        self.aliases = read_aliases(queryset.model)
+
+    def with_labels(self, queryset):
+        for label_id in self.label_ids:
+            queryset = queryset.filter(id__in=TaskLabel.objects.filter(label_id=label_id).values('task_id'))
+        return queryset
+
+    def filtered(self):
+        queryset = self.with_labels(self.base)
+        if self.status:
+            queryset = queryset.filter(status=self.status)
+        if self.priority:
+            queryset = queryset.filter(priority=self.priority)
+        return queryset
+
+    def url(self, param, value):
+        """Querystring da página atual alternando `param=value` (e voltando para a página 1)."""
+        query = self.params.copy()
+        query.pop('page', None)
+        if param == 'label':
+            selected = [v for v in query.getlist('label') if v != str(value)]
+            if str(value) not in query.getlist('label'):
+                selected.append(str(value))
+            query.setlist('label', selected)
+        elif query.get(param) == value:
+            query.pop(param)
+        else:
+            query[param] = value
+        return '?' + query.urlencode()
+
+    def page_url(self, page):
+        query = self.params.copy()
+        query['page'] = page
+        return '?' + query.urlencode()
+
+    def _choice_facets(self, param, choices, counts, selected):
+        return [
+            {'value': choice.value, 'label': choice.label, 'count': counts.get(choice.value, 0),
+             'selected': choice.value == selected, 'url': self.url(param, choice.value)}
+            for choice in choices
+        ]
+
+    def has_filters(self):
+        return bool(self.status or self.priority or self.label_ids)
+
+    def _label_facets(self):
+        if self.project is not None and not self.has_filters():
+            task_labels = TaskLabel.objects.filter(label__project=self.project)
+        else:
+            task_labels = TaskLabel.objects.filter(task__in=self.filtered().order_by().values('id'))
+        counts = {}
+        for alias in self.aliases:
+            rows = task_labels.using(alias).values('label_id').annotate(count=Count('id')).order_by('-count', 'label_id')
+            for row in rows[:LABEL_FACET_LIMIT]:
+                counts[row['label_id']] = counts.get(row['label_id'], 0) + row['count']
+        counts = dict(sorted(counts.items(), key=lambda item: (-item[1], item[0]))[:LABEL_FACET_LIMIT])
+        # as selecionadas sempre aparecem, mesmo sem resultado, para poderem ser removidas
+        ids = list(counts) + [pk for pk in self.label_ids if pk not in counts]
+        labels = {}
+        for alias in self.aliases:
+            labels.update(Label.objects.using(alias).select_related('project').in_bulk(ids))
+        return [
+            {'value': pk, 'label': labels[pk].name, 'project': labels[pk].project.name, 'count': counts.get(pk, 0),
+             'selected': pk in self.label_ids, 'url': self.url('label', pk)}
+            for pk in ids if pk in labels
+        ]
+
+    def get_context(self):
+        """Contexto do template: página de tarefas, total e as facetas."""
+        pairs = self.with_labels(self.base).order_by().values_list('status', 'priority').annotate(count=Count('id'))
+        status_counts, priority_counts, total = {}, {}, 0
+        for status, priority, count in (row for alias in self.aliases for row in pairs.using(alias)):
+            # a faceta de status ignora o próprio filtro de status (mostra as alternativas), e vice-versa
+            if self.priority in (None, priority):
+                status_counts[status] = status_counts.get(status, 0) + count
+            if self.status in (None, status):
+                priority_counts[priority] = priority_counts.get(priority, 0) + count
+            if self.priority in (None, priority) and self.status in (None, status):
+                total += count
+
+        offset = (self.page - 1) * self.page_size
+        # usuários por prefetch: num shard, users_user fica em outro banco
+        tasks = sharded_list(
+            self.filtered().select_related('project').prefetch_related('labels', 'owner', 'assigned_to').order_by('-id'),
+            key=lambda task: task.pk, reverse=True,
+        )[offset:offset + self.page_size]
+        return {
+            'tasks': tasks,
+            'task_total': total,
+            'status_facets': self._choice_facets('status', TaskStatus, status_counts, self.status),
+            'priority_facets': self._choice_facets('priority', TaskPriority, priority_counts, self.priority),
+            'label_facets': self._label_facets(),
+            'has_filters': self.has_filters(),
+            'previous_page_url': self.page_url(self.page - 1) if self.page > 1 else None,
+            'next_page_url': self.page_url(self.page + 1) if offset + self.page_size < total else None,
+        }
@@ -1,10 +1,49 @@
+from decimal import Decimal
+
 from django import forms
-from .models import Task
+from .models import Task, Label, RecurrenceRule
 from users.models import User
 from projects.models import Project
 from django.utils import timezone
+from django.utils.dates import WEEKDAYS
+from django.urls import reverse
+from django.core.exceptions import ValidationError
+from core.versioning import VersionedFormMixin
+
+
+class ParticipantAutocompleteWidget(forms.Select):
+    """Select que renderiza apenas a opção selecionada.
+
+    As demais opções são buscadas sob demanda no endpoint
+    `participant-autocomplete` (ver task_form.html), então a página não
+    carrega todos os participantes do projeto como <option>.
+    """
+
+    def optgroups(self, name, value, attrs=None):
+        field = self.choices.field
+        selected = [v for v in value if v]
+        options = [self.create_option(name, '', field.empty_label or '', not selected, 0)]
+        if selected:
+            try:
+                users = list(self.choices.queryset.filter(pk__in=selected))
+            except (ValueError, ValidationError):
+                users = []
+            for index, user in enumerate(users, start=1):
+                options.append(self.create_option(
+                    name, field.prepare_value(user), field.label_from_instance(user), True, index,
+                ))
+        return [(None, options, 0)]
+
+
+class TaskForm(VersionedFormMixin, forms.ModelForm):
+
+    labels_text = forms.CharField(
+        required=False,
+        label="Etiquetas",
+        help_text="Digite as etiquetas separadas por vírgula",
+        widget=forms.TextInput(attrs={'placeholder': 'ex: backend, urgente'})
+    )
 
-class TaskForm(forms.ModelForm):
     class Meta:
         model = Task
         fields = ['name', 'description', 'start_date', 'end_date', 'status', 'priority', 'assigned_to']
@@ -12,6 +51,7 @@ class TaskForm(forms.ModelForm):
             'start_date': forms.DateInput(attrs={'type': 'date'}, format='%Y-%m-%d'),
 
             'end_date': forms.DateInput(attrs={'type': 'date'}, format='%Y-%m-%d'),
+            'assigned_to': ParticipantAutocompleteWidget,
         }   
 
         
@@ -23,6 +63,106 @@ class TaskForm(forms.ModelForm):
             self.fields['start_date'].initial = timezone.now().date()  # Usa a data atual (sem a parte de horas)
 
             if project:
-                self.fields['assigned_to'].queryset = project.participants.all()  # Filtra os participantes do projeto
+                self.fields['assigned_to'].queryset = project.participant_users()  # Filtra os participantes do projeto
+                # as opções são buscadas pelo autocomplete; a validação continua sendo um único get() nesse queryset
+                self.fields['assigned_to'].widget.attrs['data-autocomplete-url'] = reverse(
+                    'participant-autocomplete', args=[project.pk]
+                )
             else:
                 self.fields['assigned_to'].queryset = User.objects.none()  # Caso não tenha projeto, nenhum usuário será atribuído
+
+            if self.instance and self.instance.pk:
+                self.fields['labels_text'].initial = self._current['labels_text']
+
+    def clean_labels_text(self):
+        raw = self.cleaned_data.get('labels_text', '')
+        names = {}
+        for name in raw.split(','):
+            name = ' '.join(name.split())
+            if name:
+                names.setdefault(name.lower(), name)  # "Backend" e "backend" são a mesma etiqueta
+        too_long = [name for name in names.values() if len(name) > 50]
+        if too_long:
+            raise forms.ValidationError(f"Etiquetas com mais de 50 caracteres: {', '.join(too_long)}")
+        return list(names.values())
+
+    def current_values(self, instance):
+        values = super().current_values(instance)
+        values['labels_text'] = ', '.join(instance.labels.values_list('name', flat=True))
+        return values
+
+    def save(self, commit=True):
+        instance = super().save(commit)
+        # na edição, só regrava as etiquetas se o usuário mexeu nelas (ver core/versioning.py)
+        if commit and (self.changed_fields is None or 'labels_text' in self.changed_fields):
+            self.save_labels(instance)
+        return instance
+
+    def save_labels(self, task):
+        """Liga a tarefa às etiquetas digitadas, criando no projeto as que ainda não existem."""
+        names = self.cleaned_data.get('labels_text', [])
+        existing = {label.name.lower(): label for label in Label.objects.filter(project_id=task.project_id)}
+        missing = [Label(project_id=task.project_id, name=name) for name in names if name.lower() not in existing]
+        if missing:
+            Label.objects.bulk_create(missing, ignore_conflicts=True)
+            existing.update(
+                (label.name.lower(), label)
+                for label in Label.objects.filter(project_id=task.project_id, name__in=[label.name for label in missing])
+            )
+        task.labels.set([existing[name.lower()] for name in names if name.lower() in existing])
+
+
+class RecurrenceRuleForm(forms.ModelForm):
+    interval = forms.IntegerField(
+        min_value=1, max_value=365, initial=1, label="A cada",
+        help_text="Ex.: 2 com repetição semanal = a cada duas semanas.",
+    )
+    weekdays = forms.TypedMultipleChoiceField(
+        choices=sorted(WEEKDAYS.items()), coerce=int, required=False,
+        widget=forms.CheckboxSelectMultiple, label="Dias da semana",
+        help_text="Só para a repetição semanal; sem nenhum marcado, repete no dia da semana do início.",
+    )
+
+    class Meta:
+        model = RecurrenceRule
+        fields = ['frequency', 'interval', 'until']
+        labels = {'frequency': 'Repetição', 'until': 'Até'}
+        help_texts = {'until': 'Deixe em branco para não terminar.'}
+        widgets = {
+            'until': forms.DateInput(attrs={'type': 'date'}, format='%Y-%m-%d'),
+        }
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        if self.instance.pk:
+            self.fields['weekdays'].initial = self.instance.weekday_list
+
+    def clean_until(self):
+        until = self.cleaned_data.get('until')
+        if until and until < self.instance.starts_on:
+            raise ValidationError(f"A repetição começa em {self.instance.starts_on:%d/%m/%Y}.")
+        return until
+
+    def save(self, commit=True):
+        self.instance.weekdays = sum(1 << day for day in self.cleaned_data.get('weekdays', []))
+        return super().save(commit)
+
+
+class TimeEntryForm(forms.Form):
+    """Lançamento manual de horas (ou correção de um lançamento) numa tarefa."""
+    day = forms.DateField(label="Dia", widget=forms.DateInput(attrs={'type': 'date'}, format='%Y-%m-%d'))
+    hours = forms.DecimalField(
+        label="Horas", min_value=Decimal('0.01'), max_value=24, decimal_places=2,
+        widget=forms.NumberInput(attrs={'step': '0.25'}),
+    )
+    note = forms.CharField(label="Observação", max_length=255, required=False)
+
+    def __init__(self, *args, entry=None, **kwargs):
+        if entry is not None:
+            kwargs.setdefault('initial', {'day': entry.day, 'hours': round(Decimal(entry.seconds) / 3600, 2), 'note': entry.note})
+        super().__init__(*args, **kwargs)
+        self.fields['day'].initial = timezone.localdate
+
+    @property
+    def seconds(self):
+        return int(self.cleaned_data['hours'] * 3600)
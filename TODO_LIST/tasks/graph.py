@@ -0,0 +1,133 @@
+"""Consultas no grafo de dependências entre tarefas (TaskDependency).
+
+As travessias (bloqueadores, dependentes, ciclo, caminho crítico) são CTEs
+recursivas executadas no banco: nenhuma percorre o ORM nó a nó. As CTEs usam
+UNION (e não UNION ALL), então cada tarefa entra uma vez só, mesmo com vários
+caminhos até ela.
+"""
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models.expressions import RawSQL
+
+from core.sharding import connection_for, db_for
+
+from .models import Task, TaskDependency
+
+
+def _tables():
+    qn = connection_for(Task).ops.quote_name
+    return qn(TaskDependency._meta.db_table), qn(Task._meta.db_table)
+
+
+def blockers_sql():
+    """Ids de todas as tarefas de que %s depende, direta ou indiretamente."""
+    edges, _ = _tables()
+    return (
+        f'WITH RECURSIVE up(id) AS ('
+        f' SELECT depends_on_id FROM {edges} WHERE task_id = %s'
+        f' UNION SELECT e.depends_on_id FROM {edges} e JOIN up ON e.task_id = up.id'
+        f') SELECT id FROM up'
+    )
+
+
+def downstream_sql():
+    """Ids de todas as tarefas que dependem de %s, direta ou indiretamente."""
+    edges, _ = _tables()
+    return (
+        f'WITH RECURSIVE down(id) AS ('
+        f' SELECT task_id FROM {edges} WHERE depends_on_id = %s'
+        f' UNION SELECT e.task_id FROM {edges} e JOIN down ON e.depends_on_id = down.id'
+        f') SELECT id FROM down'
+    )
+
+
+def blockers(task):
+    return Task.objects.filter(id__in=RawSQL(blockers_sql(), [task.pk]))
+
+
+def downstream(task):
+    return Task.objects.filter(id__in=RawSQL(downstream_sql(), [task.pk]))
+
+
+def would_create_cycle(task_id, depends_on_id):
+    """True se `task` passar a depender de `depends_on` fechar um ciclo."""
+    if task_id == depends_on_id:
+        return True
+    with connection_for(Task).cursor() as cursor:
+        cursor.execute(f'SELECT 1 FROM ({blockers_sql()}) WHERE id = %s LIMIT 1', [depends_on_id, task_id])
+        return cursor.fetchone() is not None
+
+
+def add_dependency(task, depends_on):
+    """Cria a aresta task -> depends_on, recusando outro projeto, duplicata ou ciclo."""
+    if task.project_id != depends_on.project_id:
+        raise ValidationError('As duas tarefas precisam ser do mesmo projeto.')
+    with transaction.atomic(using=db_for(TaskDependency)):
+        if would_create_cycle(task.pk, depends_on.pk):
+            raise ValidationError('Essa dependência criaria um ciclo.')
+        dependency, created = TaskDependency.objects.get_or_create(task=task, depends_on=depends_on)
+    if not created:
+        raise ValidationError('Essa dependência já existe.')
+    return dependency
+
+
+def topological_levels(project_id):
+    """[(task_id, nível)] do projeto em ordem topológica.
+
+    O nível é o tamanho do caminho mais longo desde uma tarefa sem
+    bloqueadores (nível 0), então toda tarefa vem depois das que a bloqueiam.
+    Aqui não há CTE: para calcular o caminho mais longo ela teria de gerar um
+    par (tarefa, profundidade) por comprimento de caminho distinto, o que
+    explode em grafos densos. As arestas do projeto vêm numa consulta só e a
+    ordenação (algoritmo de Kahn) é linear no tamanho do grafo.
+    """
+    edges, tasks = _tables()
+    with connection_for(Task).cursor() as cursor:
+        cursor.execute(f'SELECT id FROM {tasks} WHERE project_id = %s', [project_id])
+        ids = [row[0] for row in cursor.fetchall()]
+        cursor.execute(
+            f'SELECT e.task_id, e.depends_on_id FROM {edges} e JOIN {tasks} t ON t.id = e.task_id WHERE t.project_id = %s',
+            [project_id],
+        )
+        pairs = cursor.fetchall()
+
+    pending = dict.fromkeys(ids, 0)
+    dependents = {}
+    for task_id, depends_on_id in pairs:
+        pending[task_id] += 1
+        dependents.setdefault(depends_on_id, []).append(task_id)
+
+    level = dict.fromkeys(ids, 0)
+    ready = [task_id for task_id, count in pending.items() if count == 0]
+    for task_id in ready:  # a lista cresce durante o laço
+        for dependent in dependents.get(task_id, ()):
+            level[dependent] = max(level[dependent], level[task_id] + 1)
+            pending[dependent] -= 1
+            if pending[dependent] == 0:
+                ready.append(dependent)
+    return sorted(level.items(), key=lambda item: (item[1], item[0]))
+
+
+def critical_path(project_id):
+    """Cadeia que determina o fim do projeto, do começo para o fim.
+
+    Parte da tarefa com o maior end_date e volta sempre pelo bloqueador que
+    termina por último (o que "segura" o início da seguinte). Atrasar qualquer
+    tarefa da cadeia atrasa o fim do projeto.
+    """
+    edges, tasks = _tables()
+    sql = (
+        f'WITH RECURSIVE path(id, step) AS ('
+        f' SELECT id, 0 FROM (SELECT id FROM {tasks} WHERE project_id = %s AND end_date IS NOT NULL'
+        f'  ORDER BY end_date DESC, id DESC LIMIT 1)'
+        f' UNION ALL SELECT ('
+        f'  SELECT e.depends_on_id FROM {edges} e JOIN {tasks} t ON t.id = e.depends_on_id'
+        f'  WHERE e.task_id = path.id ORDER BY t.end_date IS NULL, t.end_date DESC, t.id DESC LIMIT 1'
+        f' ), step + 1 FROM path WHERE path.id IS NOT NULL'
+        f') SELECT id FROM path WHERE id IS NOT NULL ORDER BY step DESC'
+    )
+    with connection_for(Task).cursor() as cursor:
+        cursor.execute(sql, [project_id])
+        ids = [row[0] for row in cursor.fetchall()]
+    by_id = Task.objects.in_bulk(ids)
+    return [by_id[pk] for pk in ids]
@@ -0,0 +1,289 @@
+"""Tradução das requisições do AG Grid (server-side row model) para consultas em Task.
+
+A requisição segue o contrato do SSRM: startRow/endRow, sortModel,
+filterModel, rowGroupCols e groupKeys. Só as colunas de COLUMNS podem ser
+ordenadas, filtradas ou agrupadas; qualquer outro colId é rejeitado.
+
+O total de linhas nunca é contado: busca-se uma linha além do bloco e, se ela
+não vier, o bloco é o último (lastRow conhecido); senão lastRow = -1 e o grid
+continua pedindo blocos conforme a rolagem.
+
+O bloco é lido só de tasks_task, sem JOIN: assim o SQLite percorre a chave
+primária (ou o índice da ordenação) e para no fim do bloco. Os nomes de
+projeto e responsável vêm depois, com um IN pelos ids do bloco. Na ordem
+padrão (id), o grid pode mandar `afterId` (último id do bloco anterior) para
+paginar por keyset em vez de OFFSET.
+
+Qualquer requisição malformada (JSON inválido, tipos fora do contrato) vira
+GridRequestError, que a view devolve como 400.
+"""
+import datetime
+import json
+
+from django.contrib.auth import get_user_model
+from django.db.models import Count, Q
+
+from core.choices import TaskPriority, TaskStatus
+from projects.models import Project
+
+from .models import Task
+
+MAX_BLOCK_SIZE = 500
+
+# colId do grid -> campo no ORM; `group` = campo usado como chave do grupo
+COLUMNS = {
+    'id': {'field': 'id', 'type': 'number'},
+    'name': {'field': 'name', 'type': 'text'},
+    'project': {'field': 'project__name', 'type': 'text', 'group': 'project_id'},
+    'status': {'field': 'status', 'type': 'text', 'choices': TaskStatus, 'group': 'status'},
+    'priority': {'field': 'priority', 'type': 'text', 'choices': TaskPriority, 'group': 'priority'},
+    'assigned_to': {'field': 'assigned_to__name', 'type': 'text'},
+    'start_date': {'field': 'start_date', 'type': 'date'},
+    'end_date': {'field': 'end_date', 'type': 'date'},
+}
+
+# colunas lidas com values(): nenhuma instância de Task é criada
+ROW_FIELDS = ['id', 'name', 'project_id', 'status', 'priority', 'assigned_to_id', 'start_date', 'end_date']
+
+
+TEXT_LOOKUPS = {
+    'equals': 'iexact',
+    'notEqual': 'iexact',
+    'contains': 'icontains',
+    'notContains': 'icontains',
+    'startsWith': 'istartswith',
+    'endsWith': 'iendswith',
+}
+NEGATED = {'notEqual', 'notContains'}
+COMPARISON_LOOKUPS = {
+    'equals': 'exact',
+    'notEqual': 'exact',
+    'lessThan': 'lt',
+    'lessThanOrEqual': 'lte',
+    'greaterThan': 'gt',
+    'greaterThanOrEqual': 'gte',
+}
+
+
+class GridRequestError(ValueError):
+    pass
+
+
+def parse_request(body):
+    """Corpo da requisição do grid -> dict de parâmetros."""
+    try:
+        params = json.loads(body or '{}')
+    except ValueError:  # JSONDecodeError e UnicodeDecodeError
+        raise GridRequestError('Corpo da requisição não é um JSON válido.')
+    return _expect(params, dict, 'requisição')
+
+
+def _expect(value, kind, name):
+    """`value` se for do tipo `kind` (None vira vazio); senão GridRequestError."""
+    if value is None:
+        return kind()
+    if not isinstance(value, kind):
+        raise GridRequestError(f'{name} deve ser {"um objeto" if kind is dict else "uma lista"}.')
+    return value
+
+
+def _int(value, name):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        raise GridRequestError(f'{name} inválido: {value!r}.')
+
+
+def accessible_tasks(user):
+    """Tarefas dos projetos em que o usuário é dono ou participante."""
+    projects = Project.objects.filter(Q(owner=user) | Q(participants=user)).values('pk')
+    return Task.objects.filter(project_id__in=projects)
+
+
+def get_column(col_id):
+    try:
+        return COLUMNS[col_id]
+    except (KeyError, TypeError):  # TypeError: colId que não é texto (lista, objeto)
+        raise GridRequestError(f'Coluna desconhecida: {col_id!r}.')
+
+
+def _choice_value(column, value):
+    # filtros de texto em colunas com choices aceitam o código ou o rótulo exibido
+    for choice in column['choices']:
+        if value.lower() in (choice.value.lower(), choice.label.lower()):
+            return choice.value
+    return value
+
+
+def _parse_value(column, value):
+    if column['type'] == 'number':
+        return _int(value, 'Número')
+    if column['type'] == 'date':
+        try:
+            return datetime.date.fromisoformat(str(value)[:10])
+        except ValueError:
+            raise GridRequestError(f'Data inválida: {value!r}.')
+    value = str(value)
+    return _choice_value(column, value) if 'choices' in column else value
+
+
+def _parse_group_key(column, key):
+    if column['group'] == 'project_id':
+        return _int(key, 'Chave de grupo')
+    return _parse_value(column, key)
+
+
+def condition_q(column, condition):
+    """Q de uma condição simples do filterModel (text, number ou date)."""
+    field = column['field']
+    kind = _expect(condition, dict, 'Condição do filtro').get('type')
+    if kind == 'blank':
+        q = Q(**{f'{field}__isnull': True})
+        return q | Q(**{field: ''}) if column['type'] == 'text' else q
+    if kind == 'notBlank':
+        return ~condition_q(column, {'type': 'blank'})
+
+    if column['type'] == 'date':
+        value, value_to = condition.get('dateFrom'), condition.get('dateTo')
+    else:
+        value, value_to = condition.get('filter'), condition.get('filterTo')
+
+    if kind == 'inRange':
+        return Q(**{f'{field}__gte': _parse_value(column, value), f'{field}__lte': _parse_value(column, value_to)})
+    lookups = TEXT_LOOKUPS if column['type'] == 'text' else COMPARISON_LOOKUPS
+    if kind not in lookups:
+        raise GridRequestError(f'Tipo de filtro não suportado: {kind!r}.')
+    lookup = lookups[kind]
+    if 'choices' in column and lookup == 'iexact':
+        lookup = 'exact'  # códigos exatos usam o índice da coluna
+    q = Q(**{f'{field}__{lookup}': _parse_value(column, value)})
+    return ~q if kind in NEGATED else q
+
+
+def filter_q(filter_model):
+    q = Q()
+    for col_id, model in _expect(filter_model, dict, 'filterModel').items():
+        column = get_column(col_id)
+        model = _expect(model, dict, f'Filtro de {col_id!r}')
+        # filtro combinado: {"operator": "AND"|"OR", "conditions": [...]} (ou condition1/condition2)
+        conditions = _expect(model.get('conditions'), list, 'conditions') or [
+            c for c in (model.get('condition1'), model.get('condition2')) if c
+        ]
+        if conditions:
+            combined = Q()
+            for condition in conditions:
+                part = condition_q(column, condition)
+                combined = combined | part if model.get('operator') == 'OR' and combined else combined & part
+            q &= combined
+        else:
+            q &= condition_q(column, model)
+    return q
+
+
+def order_by(sort_model):
+    ordering = []
+    for sort in _expect(sort_model, list, 'sortModel'):
+        sort = _expect(sort, dict, 'Item do sortModel')
+        field = get_column(sort.get('colId'))['field']
+        ordering.append(f'-{field}' if sort.get('sort') == 'desc' else field)
+    # desempate estável; sem sortModel fica só -id, que percorre a chave primária
+    if not any(field.lstrip('-') == 'id' for field in ordering):
+        ordering.append('-id')
+    return ordering
+
+
+def _block(params):
+    start = max(_int(params.get('startRow') or 0, 'startRow'), 0)
+    end = _int(params.get('endRow') or start + 100, 'endRow')
+    if end <= start:
+        raise GridRequestError('endRow deve ser maior que startRow.')
+    return start, min(end, start + MAX_BLOCK_SIZE)
+
+
+def _fetch_block(queryset, start, end, offset=None):
+    """Linhas [start, end) do resultado; `offset` substitui start no SQL quando o keyset já avançou."""
+    offset = start if offset is None else offset
+    size = end - start
+    rows = list(queryset[offset:offset + size + 1])
+    if len(rows) > size:
+        return rows[:size], -1
+    return rows, start + len(rows)
+
+
+def _group_label(col_id, value, row):
+    column = COLUMNS[col_id]
+    if col_id == 'project':
+        return row['project__name']
+    if 'choices' in column:
+        return column['choices'](value).label if value in column['choices'].values else value
+    return value
+
+
+def serialize_rows(rows):
+    projects = dict(Project.objects.filter(pk__in={row['project_id'] for row in rows}).values_list('pk', 'name'))
+    users = dict(
+        get_user_model().objects.filter(pk__in={row['assigned_to_id'] for row in rows if row['assigned_to_id']})
+        .values_list('pk', 'name')
+    )
+    return [
+        {
+            'id': row['id'],
+            'name': row['name'],
+            'project': projects.get(row['project_id']),
+            'project_id': row['project_id'],
+            'status': TaskStatus(row['status']).label if row['status'] in TaskStatus.values else row['status'],
+            'priority': TaskPriority(row['priority']).label if row['priority'] in TaskPriority.values else row['priority'],
+            'assigned_to': users.get(row['assigned_to_id']),
+            'start_date': row['start_date'].isoformat() if row['start_date'] else None,
+            'end_date': row['end_date'].isoformat() if row['end_date'] else None,
+        }
+        for row in rows
+    ]
+
+
+def get_rows(user, params):
+    """Responde a uma requisição do grid: {'rows': [...], 'lastRow': n ou -1}."""
+    start, end = _block(params)
+    queryset = accessible_tasks(user).filter(filter_q(params.get('filterModel')))
+    ordering = order_by(params.get('sortModel'))
+
+    group_cols = []
+    for col in _expect(params.get('rowGroupCols'), list, 'rowGroupCols'):
+        col = _expect(col, dict, 'Item de rowGroupCols')
+        col_id = col.get('id') or col.get('field')
+        if 'group' not in get_column(col_id):
+            raise GridRequestError(f'A coluna {col_id!r} não pode ser agrupada.')
+        group_cols.append(col_id)
+    group_keys = _expect(params.get('groupKeys'), list, 'groupKeys')
+    if len(group_keys) > len(group_cols):
+        raise GridRequestError('Há mais groupKeys do que colunas agrupadas.')
+    for col_id, key in zip(group_cols, group_keys):
+        column = COLUMNS[col_id]
+        queryset = queryset.filter(**{column['group']: _parse_group_key(column, key)})
+
+    if len(group_keys) < len(group_cols):
+        # nível de grupo: uma linha por valor, com a quantidade de tarefas
+        col_id = group_cols[len(group_keys)]
+        column = COLUMNS[col_id]
+        key_field = column['group']
+        fields = ['project__name', key_field] if col_id == 'project' else [key_field]
+        desc = f'-{column["field"]}' in ordering
+        groups = queryset.order_by().values(*fields).annotate(childCount=Count('id'))
+        groups = groups.order_by(*(f'-{field}' if desc else field for field in fields))
+        rows, last_row = _fetch_block(groups, start, end)
+        return {
+            'rows': [
+                {'group': True, 'key': row[key_field], col_id: _group_label(col_id, row[key_field], row), 'childCount': row['childCount']}
+                for row in rows
+            ],
+            'lastRow': last_row,
+        }
+
+    offset = None
+    after_id = params.get('afterId')
+    if after_id is not None and ordering in (['id'], ['-id']):
+        queryset = queryset.filter(**{'id__gt' if ordering == ['id'] else 'id__lt': _int(after_id, 'afterId')})
+        offset = 0
+    rows, last_row = _fetch_block(queryset.order_by(*ordering).values(*ROW_FIELDS), start, end, offset)
+    return {'rows': serialize_rows(rows), 'lastRow': last_row}
+
@@ -0,0 +1,117 @@
+"""Caixa de entrada ("Meu trabalho"): read model das tarefas em aberto de cada usuário.
+
+tasks_inboxitem tem uma linha por tarefa em aberto com responsável, com o nome
+do projeto e as chaves de ordenação copiados. A página do usuário é uma faixa
+do índice (user, due, priority_order, task), sem JOIN nem ordenação.
+
+Manutenção:
+
+- `Task.save()` (post_save) sincroniza a linha da tarefa; a renomeação de um
+  projeto (post_save de Project) atualiza o nome nas linhas dele;
+- quem altera tarefas com `.update()` ou SQL direto chama `sync_inbox(ids)`
+  (ex.: board.move_task, archive.restore_task), ou `sync_project_inbox` para
+  todas as tarefas de um projeto (ex.: projects.cloning);
+- exclusões não precisam de nada: a FK para Task é CASCADE, inclusive no
+  fast_delete e no arquivamento;
+- `rebuild_inbox` (comando `rebuild_inbox`) reconstrói tudo a partir de tasks_task.
+"""
+from django.db import connections, transaction
+from django.db.models.signals import post_save
+
+from core.choices import OPEN_TASK_STATUSES, TASK_PRIORITY_ORDER, TaskPriority
+from core.sharding import db_for
+from projects.models import Project
+
+from .models import InboxItem, Task
+
+# campos de Task copiados para a caixa de entrada; salvar só outros campos não sincroniza
+SYNCED_FIELDS = {'name', 'status', 'priority', 'end_date', 'assigned_to', 'assigned_to_id', 'project', 'project_id'}
+
+
+def _insert_select(where, params, using):
+    """INSERT ... SELECT das tarefas em aberto com responsável que atendem `where` (sobre `t`)."""
+    connection = connections[using]
+    qn = connection.ops.quote_name
+    priority_order = ' '.join('WHEN %s THEN %s' for _ in TASK_PRIORITY_ORDER)
+    statuses = ', '.join(['%s'] * len(OPEN_TASK_STATUSES))
+    sql = (
+        f'INSERT INTO {qn(InboxItem._meta.db_table)}'
+        f' (task_id, user_id, project_id, project_name, task_name, status, priority_order, due)'
+        f' SELECT t.id, t.assigned_to_id, t.project_id, p.name, t.name, t.status,'
+        f' CASE t.priority {priority_order} ELSE %s END, COALESCE(t.end_date, %s)'
+        f' FROM {qn(Task._meta.db_table)} t JOIN {qn(Project._meta.db_table)} p ON p.id = t.project_id'
+        # `+t.status`: o filtro de status não pode usar tasks_task_status_end_idx; quem restringe é o `where`
+        # (ids ou faixa de ids). Com um único status aberto o SQLite preferia o índice e lia todas as tarefas abertas.
+        f' WHERE t.assigned_to_id IS NOT NULL AND +t.status IN ({statuses}) AND {where}'
+    )
+    order_params = [value for pair in TASK_PRIORITY_ORDER.items() for value in pair]
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [
+            *order_params, TASK_PRIORITY_ORDER[TaskPriority.LOW], InboxItem.NO_DUE_DATE,
+            *OPEN_TASK_STATUSES, *params,
+        ])
+        return cursor.rowcount
+
+
+def sync_inbox(task_ids, using=None):
+    """Refaz as linhas da caixa de entrada das tarefas `task_ids` (no shard `using`)."""
+    task_ids = list(task_ids)
+    if not task_ids:
+        return
+    using = using or db_for(Task)
+    with transaction.atomic(using=using):
+        InboxItem.objects.using(using).filter(task_id__in=task_ids)._raw_delete(using)
+        _insert_select(f't.id IN ({", ".join(["%s"] * len(task_ids))})', task_ids, using)
+
+
+def sync_project_inbox(project_id, using=None):
+    """Refaz as linhas da caixa de entrada de todas as tarefas do projeto, sem ler os ids."""
+    using = using or db_for(Task)
+    with transaction.atomic(using=using):
+        InboxItem.objects.using(using).filter(project_id=project_id)._raw_delete(using)
+        return _insert_select('t.project_id = %s', [project_id], using)
+
+
+def rebuild_inbox(batch_size=50_000, progress=None, using=None):
+    """Reconstrói a caixa de entrada inteira, `batch_size` tarefas por transação.
+
+    Os lotes são faixas consecutivas de ids (os ids de um shard não são
+    contíguos quando há projetos vindos de outros shards). Cada faixa é apagada
+    e preenchida na mesma transação, então a caixa de entrada continua completa
+    durante a reconstrução. `progress(last_id, total)` é chamado após cada
+    faixa. Retorna o número de linhas.
+    """
+    using = using or db_for(Task)
+    ids = Task.objects.using(using).order_by('id').values_list('id', flat=True)
+    start, total = 0, 0
+    while True:
+        end = next(iter(ids.filter(id__gte=start)[batch_size:batch_size + 1]), None)
+        where, params = ('t.id >= %s', [start]) if end is None else ('t.id >= %s AND t.id < %s', [start, end])
+        with transaction.atomic(using=using):
+            rows = InboxItem.objects.using(using).filter(task_id__gte=start)
+            (rows if end is None else rows.filter(task_id__lt=end))._raw_delete(using)
+            total += _insert_select(where, params, using)
+        if progress:
+            progress(end or start, total)
+        if end is None:
+            return total
+        start = end
+
+
+def _task_saved(sender, instance, created, update_fields=None, raw=False, **kwargs):
+    if raw or (update_fields is not None and not SYNCED_FIELDS.intersection(update_fields)):
+        return
+    if created and (instance.assigned_to_id is None or instance.status not in OPEN_TASK_STATUSES):
+        return  # nada a inserir nem a apagar
+    sync_inbox([instance.pk], using=instance._state.db)
+
+
+def _project_saved(sender, instance, created, update_fields=None, raw=False, **kwargs):
+    if raw or created or (update_fields is not None and 'name' not in update_fields):
+        return
+    InboxItem.objects.using(instance._state.db).filter(project=instance).exclude(project_name=instance.name).update(project_name=instance.name)
+
+
+def connect_signals():
+    post_save.connect(_task_saved, sender=Task, dispatch_uid='tasks.inbox.task_saved')
+    post_save.connect(_project_saved, sender=Project, dispatch_uid='tasks.inbox.project_saved')
@@ -0,0 +1,36 @@
+from core.sharding import pin, shard_aliases
+from jobs.registry import job
+from .reminders import scan_due_tasks
+from .archive import archive_finished_tasks
+from .recurrence import materialize_due
+
+
+@job('tasks.scan_due_tasks')
+def scan_due_tasks_job(job, due_soon_days=None, batch_size=2000):
+    return scan_due_tasks(due_soon_days=due_soon_days, batch_size=batch_size)
+
+
+@job('tasks.archive_tasks')
+def archive_tasks_job(job, older_than_days, batch_size=1000):
+    moved = 0
+    for alias in shard_aliases():
+        with pin(alias):
+            moved += archive_finished_tasks(
+                older_than_days, batch_size,
+                progress=lambda count: job.set_progress(0, f'{moved + count} tarefa(s) arquivadas'),
+            )
+    return {'archived': moved}
+
+
+@job('tasks.materialize_recurrences')
+def materialize_recurrences_job(job, horizon_days=None, batch_size=500):
+    totals = {'rules': 0, 'created': 0}
+    for alias in shard_aliases():
+        with pin(alias):
+            stats = materialize_due(
+                horizon_days=horizon_days, batch_size=batch_size,
+                progress=lambda rules, created: job.set_progress(0, f'{totals["rules"] + rules} regra(s) lidas'),
+            )
+        totals['rules'] += stats['rules']
+        totals['created'] += stats['created']
+    return totals
@@ -0,0 +1,33 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core.sharding import pin, shard_aliases
+from tasks.archive import archivable_tasks, archive_finished_tasks
+
+
+class Command(BaseCommand):
+    help = 'Move tarefas concluídas/canceladas antigas para a tabela de arquivo.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--older-than', type=int, default=getattr(settings, 'TASK_ARCHIVE_AFTER_DAYS', 90), metavar='DIAS',
+            help='Arquiva tarefas cujo prazo terminou há mais de N dias (padrão: TASK_ARCHIVE_AFTER_DAYS).',
+        )
+        parser.add_argument('--batch-size', type=int, default=1000, help='Tarefas movidas por transação.')
+        parser.add_argument('--dry-run', action='store_true', help='Só conta quantas tarefas seriam arquivadas.')
+
+    def handle(self, *args, **options):
+        if options['dry_run']:
+            total = sum(archivable_tasks(options['older_than']).using(alias).count() for alias in shard_aliases())
+            self.stdout.write(f'{total} tarefa(s) seriam arquivadas.')
+            return
+
+        def progress(moved):
+            if options['verbosity'] > 1:
+                self.stdout.write(f'  {moved} tarefa(s) arquivadas...')
+
+        moved = 0
+        for alias in shard_aliases():
+            with pin(alias):
+                moved += archive_finished_tasks(options['older_than'], options['batch_size'], progress)
+        self.stdout.write(self.style.SUCCESS(f'{moved} tarefa(s) arquivadas.'))
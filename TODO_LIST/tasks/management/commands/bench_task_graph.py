@@ -0,0 +1,79 @@
+import random
+import time
+import uuid
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from core.deletion import fast_delete
+from projects.models import Project
+from tasks import graph
+from tasks.models import Task, TaskDependency
+from users.models import User
+
+
+class Command(BaseCommand):
+    help = (
+        'Benchmark: gera um projeto descartável com um grafo de dependências aleatório (DAG) '
+        'e mede as consultas de tasks/graph.py. Use num banco de testes.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--nodes', type=int, default=50_000)
+        parser.add_argument('--max-deps', type=int, default=3, help='Máximo de bloqueadores por tarefa.')
+        parser.add_argument('--window', type=int, default=200, help='Cada tarefa depende só das N anteriores.')
+        parser.add_argument('--seed', type=int, default=42)
+
+    def make_graph(self, owner, nodes, max_deps, window, rng):
+        project = Project.objects.create(name=f'bench {uuid.uuid4().hex[:8]}', owner=owner)
+        today = timezone.localdate()
+        for start in range(0, nodes, 5000):
+            Task.objects.bulk_create(
+                Task(
+                    project=project, owner=owner, name=f'Tarefa {i}', description='',
+                    start_date=today + timedelta(days=i // 50),
+                    end_date=today + timedelta(days=i // 50 + rng.randint(1, 10)),
+                )
+                for i in range(start, min(nodes, start + 5000))
+            )
+        ids = list(Task.objects.filter(project=project).order_by('id').values_list('id', flat=True))
+        edges = []
+        for position in range(1, len(ids)):
+            candidates = ids[max(0, position - window):position]
+            for depends_on in rng.sample(candidates, min(len(candidates), rng.randint(1, max_deps))):
+                edges.append(TaskDependency(task_id=ids[position], depends_on_id=depends_on))
+        TaskDependency.objects.bulk_create(edges, batch_size=5000)
+        return project, ids, len(edges)
+
+    def timed(self, label, fn):
+        started = time.perf_counter()
+        result = fn()
+        elapsed = (time.perf_counter() - started) * 1000
+        return result, f'{label}: {elapsed:.1f}ms'
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        suffix = uuid.uuid4().hex[:12]
+        owner = User.objects.create_user(f'bench-{suffix}@example.com', 'Benchmark', None, cpf=suffix[:11])
+        try:
+            self.stdout.write(f'Gerando grafo com {options["nodes"]} tarefas...')
+            project, ids, edge_count = self.make_graph(owner, options['nodes'], options['max_deps'], options['window'], rng)
+            self.stdout.write(f'{len(ids)} tarefas, {edge_count} dependências')
+            first, middle, last = Task.objects.get(pk=ids[0]), Task.objects.get(pk=ids[len(ids) // 2]), Task.objects.get(pk=ids[-1])
+
+            checks = [
+                ('bloqueadores da última', lambda: graph.blockers(last).count()),
+                ('bloqueadores da do meio', lambda: graph.blockers(middle).count()),
+                ('dependentes da primeira', lambda: graph.downstream(first).count()),
+                ('dependentes da do meio', lambda: graph.downstream(middle).count()),
+                ('ciclo (primeira depende da última)', lambda: graph.would_create_cycle(first.pk, last.pk)),
+                ('ciclo (última depende da primeira)', lambda: graph.would_create_cycle(last.pk, first.pk)),
+                ('ordem topológica', lambda: len(graph.topological_levels(project.pk))),
+                ('caminho crítico', lambda: len(graph.critical_path(project.pk))),
+            ]
+            for label, fn in checks:
+                result, line = self.timed(label, fn)
+                self.stdout.write(self.style.SUCCESS(f'{line} -> {result}'))
+        finally:
+            fast_delete(User.objects.filter(pk=owner.pk))
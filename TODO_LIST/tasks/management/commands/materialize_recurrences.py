@@ -0,0 +1,53 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from core.sharding import pin, shard_aliases
+from jobs.registry import enqueue
+from tasks.recurrence import horizon, materialize_due
+from tasks.models import RecurrenceRule
+
+
+class Command(BaseCommand):
+    help = (
+        'Cria as tarefas das ocorrências recorrentes que entraram no horizonte (TASK_RECURRENCE_HORIZON_DAYS). '
+        'Pode ser chamado pelo cron, rodar em loop (--loop) ou ser enfileirado para os workers (--enqueue).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--horizon-days', type=int, default=None, help='Dias à frente a materializar (padrão: TASK_RECURRENCE_HORIZON_DAYS).')
+        parser.add_argument('--batch-size', type=int, default=500, help='Regras processadas por transação.')
+        parser.add_argument('--dry-run', action='store_true', help='Só conta as regras com ocorrências a criar.')
+        parser.add_argument('--loop', type=int, default=0, metavar='SEGUNDOS', help='Repete a cada N segundos.')
+        parser.add_argument('--enqueue', action='store_true', help='Coloca a materialização na fila de jobs em vez de rodar agora.')
+
+    def handle(self, *args, **options):
+        if options['enqueue']:
+            job = enqueue('tasks.materialize_recurrences', horizon_days=options['horizon_days'], batch_size=options['batch_size'])
+            self.stdout.write(self.style.SUCCESS(f'Materialização enfileirada (job #{job.pk}).'))
+            return
+
+        if options['dry_run']:
+            through = horizon(horizon_days=options['horizon_days'])
+            total = sum(RecurrenceRule.objects.using(alias).filter(next_occurrence__lte=through).count() for alias in shard_aliases())
+            self.stdout.write(f'{total} regra(s) com ocorrências até {through:%d/%m/%Y} a criar.')
+            return
+
+        def progress(rules, created):
+            if options['verbosity'] > 1:
+                self.stdout.write(f'  {rules} regra(s), {created} tarefa(s) criadas...')
+
+        while True:
+            started = time.perf_counter()
+            rules = created = 0
+            for alias in shard_aliases():
+                with pin(alias):
+                    stats = materialize_due(horizon_days=options['horizon_days'], batch_size=options['batch_size'], progress=progress)
+                rules += stats['rules']
+                created += stats['created']
+            self.stdout.write(self.style.SUCCESS(
+                f'{rules} regra(s) lidas, {created} tarefa(s) criadas em {time.perf_counter() - started:.2f}s.'
+            ))
+            if not options['loop']:
+                break
+            time.sleep(options['loop'])
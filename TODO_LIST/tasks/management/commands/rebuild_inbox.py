@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from core.sharding import shard_aliases
+from tasks.inbox import rebuild_inbox
+
+
+class Command(BaseCommand):
+    help = 'Reconstrói a caixa de entrada (tasks_inboxitem) a partir das tarefas em aberto.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=50_000, help='Tarefas por transação.')
+
+    def handle(self, *args, **options):
+        def progress(last_id, total):
+            if options['verbosity'] > 1:
+                self.stdout.write(f'  até a tarefa #{last_id}: {total} linha(s)...')
+
+        total = sum(rebuild_inbox(options['batch_size'], progress, using=alias) for alias in shard_aliases())
+        self.stdout.write(self.style.SUCCESS(f'Caixa de entrada reconstruída: {total} tarefa(s) em aberto.'))
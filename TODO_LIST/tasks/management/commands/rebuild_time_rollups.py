@@ -0,0 +1,59 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import OperationalError, connections
+
+from core.sharding import shard_aliases
+from tasks.models import DailyRollup, TimeEntry
+from tasks.timetracking import rebuild_project
+
+# tentativas por projeto quando o SQLite recusa a transação por outra thread estar gravando
+LOCKED_ATTEMPTS = 6
+
+
+def _rebuild(alias, project_id):
+    """Recalcula um projeto; a transação inteira é refeita se o banco estiver travado."""
+    try:
+        for attempt in range(1, LOCKED_ATTEMPTS + 1):
+            try:
+                return rebuild_project(project_id, alias)
+            except OperationalError as exc:
+                if 'locked' not in str(exc) or attempt == LOCKED_ATTEMPTS:
+                    raise
+                time.sleep(0.05 * 2 ** attempt)
+    finally:
+        connections[alias].close()  # conexão desta thread
+
+
+class Command(BaseCommand):
+    help = (
+        'Recalcula os totais diários de horas a partir dos lançamentos, um projeto por transação, em paralelo. '
+        'Num mesmo arquivo SQLite as gravações ainda se revezam; o que roda em paralelo são as agregações e os shards. '
+        'Um projeto recusado com "database is locked" é refeito com espera crescente.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=4, help='Threads (cada uma com a sua conexão).')
+        parser.add_argument('--project', type=int, action='append', dest='projects', metavar='ID', help='Só este projeto (pode repetir).')
+
+    def handle(self, *args, **options):
+        work = []
+        for alias in shard_aliases():
+            project_ids = options['projects']
+            if not project_ids:
+                # projetos com lançamentos ou com totais (que podem ter sobrado de lançamentos apagados)
+                project_ids = set(TimeEntry.objects.using(alias).values_list('project_id', flat=True).distinct())
+                project_ids |= set(DailyRollup.objects.using(alias).values_list('project_id', flat=True).distinct())
+            work += [(alias, project_id) for project_id in sorted(project_ids)]
+
+        started = time.perf_counter()
+        rows = 0
+        with ThreadPoolExecutor(max_workers=max(options['workers'], 1)) as pool:
+            for count, ((alias, project_id), project_rows) in enumerate(zip(work, pool.map(lambda item: _rebuild(*item), work)), start=1):
+                rows += project_rows
+                if options['verbosity'] > 1:
+                    self.stdout.write(f'  projeto #{project_id} ({alias}): {project_rows} linha(s) [{count}/{len(work)}]')
+        self.stdout.write(self.style.SUCCESS(
+            f'{len(work)} projeto(s), {rows} linha(s) de totais em {time.perf_counter() - started:.2f}s.'
+        ))
@@ -0,0 +1,41 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from jobs.registry import enqueue
+from tasks.reminders import scan_due_tasks
+
+
+class Command(BaseCommand):
+    help = (
+        'Procura tarefas abertas atrasadas ou com prazo próximo e envia um resumo por responsável. '
+        'Pode ser chamado pelo cron, rodar em loop (--loop) ou ser enfileirado para os workers (--enqueue).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--due-soon-days', type=int, default=None, help='Dias à frente considerados "prazo próximo" (padrão: TASK_DUE_SOON_DAYS).')
+        parser.add_argument('--batch-size', type=int, default=2000, help='Tarefas lidas por lote.')
+        parser.add_argument('--dry-run', action='store_true', help='Só varre e mostra as contagens, sem enviar nada.')
+        parser.add_argument('--loop', type=int, default=0, metavar='SEGUNDOS', help='Repete a varredura a cada N segundos; cada tarefa é lembrada no máximo uma vez por dia e responsável.')
+        parser.add_argument('--enqueue', action='store_true', help='Coloca a varredura na fila de jobs em vez de rodar agora.')
+
+    def handle(self, *args, **options):
+        if options['enqueue']:
+            job = enqueue('tasks.scan_due_tasks', due_soon_days=options['due_soon_days'], batch_size=options['batch_size'])
+            self.stdout.write(self.style.SUCCESS(f'Varredura enfileirada (job #{job.pk}).'))
+            return
+
+        while True:
+            stats = scan_due_tasks(
+                due_soon_days=options['due_soon_days'],
+                batch_size=options['batch_size'],
+                dry_run=options['dry_run'],
+            )
+            self.stdout.write(
+                f"{stats['scanned']} tarefa(s) lidas em {stats['scan_seconds']}s: "
+                f"{stats['overdue']} atrasada(s), {stats['due_soon']} com prazo próximo, "
+                f"{stats['assignees']} responsável(is), {stats['digests_sent']} resumo(s) enviados."
+            )
+            if not options['loop']:
+                break
+            time.sleep(options['loop'])
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.5 on 2026-10-19 12:55
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0008_alter_project_status'),
+        ('tasks', '0009_archivedtask'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TaskActivity',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('event', models.PositiveSmallIntegerField(choices=[(1, 'Criada'), (2, 'Editada'), (3, 'Status alterado'), (4, 'Responsável alterado'), (5, 'Excluída')])),
+                ('changes', models.JSONField(blank=True, default=dict)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('actor', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('project', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='task_activities', to='projects.project')),
+                ('task', models.ForeignKey(db_constraint=False, db_index=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='activities', to='tasks.task')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['task', '-id'], name='tasks_activity_task_idx'), models.Index(fields=['project', '-id'], name='tasks_activity_project_idx')],
+            },
+        ),
+    ]
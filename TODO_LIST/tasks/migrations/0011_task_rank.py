@@ -0,0 +1,50 @@
+# Generated by Django 5.2.5 on 2026-10-19 12:59
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count
+
+from core.ranking import spread_ranks
+
+
+def assign_initial_ranks(apps, schema_editor):
+    # ordem inicial de cada coluna (projeto, status) = ordem de criação.
+    # UPDATE por id em executemany: o CASE do bulk_update fica quadrático no SQLite com milhões de linhas
+    Task = apps.get_model('tasks', 'Task')
+    columns = Task.objects.order_by().values_list('project_id', 'status').annotate(total=Count('id'))
+    sql = 'UPDATE %s SET %s = %%s WHERE %s = %%s' % (
+        schema_editor.quote_name(Task._meta.db_table),
+        schema_editor.quote_name('rank'),
+        schema_editor.quote_name('id'),
+    )
+    with schema_editor.connection.cursor() as cursor:
+        for project_id, status, total in list(columns):
+            ids = Task.objects.filter(project_id=project_id, status=status).order_by('id').values_list('id', flat=True)
+            cursor.executemany(sql, list(zip(spread_ranks(total), ids)))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0008_alter_project_status'),
+        ('tasks', '0010_taskactivity'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='archivedtask',
+            name='rank',
+            field=models.CharField(blank=True, default='', editable=False, max_length=64),
+        ),
+        migrations.AddField(
+            model_name='task',
+            name='rank',
+            field=models.CharField(blank=True, default='', editable=False, max_length=64),
+        ),
+        migrations.RunPython(assign_initial_ranks, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['project', 'status', 'rank', 'id'], name='tasks_task_board_idx'),
+        ),
+    ]
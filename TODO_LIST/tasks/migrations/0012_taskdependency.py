@@ -0,0 +1,26 @@
+# Generated by Django 5.2.5 on 2026-10-19 13:17
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0011_task_rank'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TaskDependency',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('depends_on', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='dependents', to='tasks.task')),
+                ('task', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='dependencies', to='tasks.task')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['depends_on', 'task'], name='tasks_dependency_reverse_idx')],
+                'constraints': [models.UniqueConstraint(fields=('task', 'depends_on'), name='tasks_dependency_unique'), models.CheckConstraint(condition=models.Q(('task', models.F('depends_on')), _negated=True), name='tasks_dependency_not_self')],
+            },
+        ),
+    ]
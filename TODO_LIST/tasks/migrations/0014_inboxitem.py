@@ -0,0 +1,40 @@
+# Generated by Django 5.2.5 on 2026-10-19 13:25
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def fill_inbox(apps, schema_editor):
+    # mesmo INSERT ... SELECT do comando rebuild_inbox, por faixas de id
+    from tasks.inbox import rebuild_inbox
+    rebuild_inbox(using=schema_editor.connection.alias)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0008_alter_project_status'),
+        ('tasks', '0013_labels'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='InboxItem',
+            fields=[
+                ('task', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='inbox_item', serialize=False, to='tasks.task')),
+                ('project_name', models.CharField(max_length=255)),
+                ('task_name', models.CharField(max_length=255)),
+                ('status', models.CharField(choices=[('in_progress', 'Em andamento'), ('completed', 'Concluído'), ('canceled', 'Cancelado')], max_length=20)),
+                ('priority_order', models.PositiveSmallIntegerField()),
+                ('due', models.DateField()),
+                ('project', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='projects.project')),
+                ('user', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='inbox_items', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['user', 'due', 'priority_order', 'task'], name='tasks_inbox_user_idx')],
+            },
+        ),
+        migrations.RunPython(fill_inbox, migrations.RunPython.noop),
+    ]
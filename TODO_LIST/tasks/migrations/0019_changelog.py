@@ -0,0 +1,76 @@
+# Generated by Django 5.2.5 on 2026-10-19 14:25
+
+from django.db import migrations, models
+
+
+# Cópia congelada do SQL de tasks/changes.py na época desta migração: editar aquele módulo
+# não muda o que ela faz. Uma migração que recrie tasks_task, projects_project ou a tabela de
+# participantes no SQLite (AlterField etc.) apaga estes triggers e deve recriá-los (ver tasks/checks.py).
+
+def _upsert(kind, object_id, project_id, deleted, user_id='NULL', when='true'):
+    target = '(kind, object_id, project_id) WHERE user_id IS NULL' if user_id == 'NULL' else '(user_id, project_id) WHERE user_id IS NOT NULL'
+    return (
+        'INSERT INTO "tasks_changelog" (seq, kind, object_id, project_id, user_id, deleted)'
+        ' SELECT (SELECT COALESCE(MAX(seq), 0) + 1 FROM "tasks_changelog"),'
+        f' {kind}, {object_id}, {project_id}, {user_id}, {deleted} WHERE {when}'
+        f' ON CONFLICT {target} DO UPDATE SET seq = excluded.seq, deleted = excluded.deleted;'
+    )
+
+
+# nome: (tabela, evento, corpo); kind 1 = tarefa, 2 = projeto, 3 = acesso
+TRIGGERS = {
+    'task_insert': ('tasks_task', 'INSERT', _upsert(1, 'NEW.id', 'NEW.project_id', 0)),
+    'task_update': ('tasks_task', 'UPDATE', (
+        _upsert(1, 'NEW.id', 'NEW.project_id', 0)
+        + _upsert(1, 'OLD.id', 'OLD.project_id', 1, when='OLD.project_id <> NEW.project_id')
+    )),
+    'task_delete': ('tasks_task', 'DELETE', _upsert(1, 'OLD.id', 'OLD.project_id', 1)),
+    'project_insert': ('projects_project', 'INSERT', _upsert(2, 'NEW.id', 'NEW.id', 0)),
+    'project_update': ('projects_project', 'UPDATE', _upsert(2, 'NEW.id', 'NEW.id', 0)),
+    'project_delete': ('projects_project', 'DELETE', _upsert(2, 'OLD.id', 'OLD.id', 1)),
+    'access_insert': ('projects_project_participants', 'INSERT', _upsert(3, 'NEW.project_id', 'NEW.project_id', 0, 'NEW.user_id')),
+    'access_delete': ('projects_project_participants', 'DELETE', _upsert(3, 'OLD.project_id', 'OLD.project_id', 1, 'OLD.user_id')),
+}
+
+# uma linha para cada projeto, tarefa e participante que já existe
+BACKFILL = (
+    'INSERT INTO "tasks_changelog" (seq, kind, object_id, project_id, user_id, deleted)'
+    ' SELECT ROW_NUMBER() OVER (ORDER BY kind DESC, object_id, user_id), kind, object_id, project_id, user_id, false FROM ('
+    '  SELECT 2 AS kind, id AS object_id, id AS project_id, NULL AS user_id FROM "projects_project"'
+    '  UNION ALL SELECT 1, id, project_id, NULL FROM "tasks_task"'
+    '  UNION ALL SELECT 3, project_id, project_id, user_id FROM "projects_project_participants"'
+    ' ) rows'
+)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0018_archivedtask_status_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ChangeLog',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('seq', models.BigIntegerField()),
+                ('kind', models.PositiveSmallIntegerField(choices=[(1, 'Tarefa'), (2, 'Projeto'), (3, 'Acesso ao projeto')])),
+                ('object_id', models.BigIntegerField()),
+                ('project_id', models.BigIntegerField()),
+                ('user_id', models.BigIntegerField(blank=True, null=True)),
+                ('deleted', models.BooleanField(default=False)),
+            ],
+            options={
+                'indexes': [models.Index(condition=models.Q(('user_id__isnull', True)), fields=['project_id', 'seq'], name='tasks_changelog_project_idx'), models.Index(condition=models.Q(('user_id__isnull', False)), fields=['user_id', 'seq'], name='tasks_changelog_user_idx')],
+                'constraints': [models.UniqueConstraint(fields=('seq',), name='tasks_changelog_seq_unique'), models.UniqueConstraint(condition=models.Q(('user_id__isnull', True)), fields=('kind', 'object_id', 'project_id'), name='tasks_changelog_object_unique'), models.UniqueConstraint(condition=models.Q(('user_id__isnull', False)), fields=('user_id', 'project_id'), name='tasks_changelog_access_unique')],
+            },
+        ),
+        migrations.RunSQL(
+            [BACKFILL] + [
+                f'CREATE TRIGGER "changelog_{name}" AFTER {event} ON "{table}" BEGIN {body} END'
+                for name, (table, event, body) in TRIGGERS.items()
+            ],
+            [f'DROP TRIGGER IF EXISTS "changelog_{name}"' for name in TRIGGERS],
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.5 on 2026-10-19 14:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0019_changelog'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='archivedtask',
+            name='label_ids',
+            field=models.JSONField(blank=True, default=list, editable=False),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.5 on 2026-10-19 14:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0020_archivedtask_label_ids'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='archivedtask',
+            name='blocker_ids',
+            field=models.JSONField(blank=True, default=list, editable=False),
+        ),
+        migrations.AddField(
+            model_name='archivedtask',
+            name='dependent_ids',
+            field=models.JSONField(blank=True, default=list, editable=False),
+        ),
+    ]
@@ -1,9 +1,14 @@
 from django.db import models
 from projects.models import Project
 from django.conf import settings
-from core.choices import TaskStatus, TaskPriority
+from django.utils import timezone
+import datetime
 
-class Task(models.Model):
+from core.choices import TaskStatus, TaskPriority, TaskEvent, TASK_PRIORITY_ORDER, RecurrenceFrequency, ChangeKind
+from core.ranking import rank_after
+from core.versioning import VersionedModel
+
+class Task(VersionedModel):
     project = models.ForeignKey(Project, on_delete=models.CASCADE)
     assigned_to = models.ForeignKey(settings.AUTH_USER_MODEL, 
     on_delete=models.CASCADE, null=True, blank=True)
@@ -13,8 +18,352 @@ class Task(models.Model):
     start_date = models.DateField()
     end_date = models.DateField(null=True, blank=True)
 
-    priority = models.CharField(choices=TaskPriority, default=TaskPriority.LOW)
+    priority = models.CharField(choices=TaskPriority, default=TaskPriority.LOW, db_index=True)
     status = models.CharField(max_length=20, choices=TaskStatus, default=TaskStatus.IN_PROGRESS)
+    # posição da tarefa na coluna do quadro (core/ranking.py)
+    rank = models.CharField(max_length=64, blank=True, default='', editable=False)
+    labels = models.ManyToManyField('Label', through='TaskLabel', blank=True, related_name='tasks')
+    # ocorrência de uma tarefa recorrente (tasks/recurrence.py); a tarefa modelo é a ocorrência de `starts_on`.
+    # sem constraint: RecurrenceRule já aponta para Task, e as duas tabelas são copiadas juntas entre shards
+    recurrence = models.ForeignKey(
+        'RecurrenceRule', on_delete=models.SET_NULL, db_constraint=False, db_index=False,
+        null=True, blank=True, editable=False, related_name='occurrences',
+    )
+    occurrence_date = models.DateField(null=True, blank=True, editable=False)
+
+    class Meta:
+        constraints = [
+            # uma linha por data de cada regra; o índice também atende "ocorrências da regra entre as datas X e Y"
+            models.UniqueConstraint(
+                fields=['recurrence', 'occurrence_date'], condition=models.Q(recurrence__isnull=False),
+                name='tasks_task_occurrence_unique',
+            ),
+        ]
+        indexes = [
+            # varredura de prazos (reminders.py): status = ? AND end_date <= ?, em ordem de end_date.
+            # também atende os filtros só por status, por ser o prefixo do índice.
+            models.Index(fields=['status', 'end_date'], name='tasks_task_status_end_idx'),
+            # colunas do quadro: project = ? AND status = ? ORDER BY rank, id (ver tasks/board.py)
+            models.Index(fields=['project', 'status', 'rank', 'id'], name='tasks_task_board_idx'),
+            # contagens das facetas (tasks/facets.py): GROUP BY status, priority só no índice
+            models.Index(fields=['project', 'status', 'priority'], name='tasks_task_facet_idx'),
+        ]
 
     def __str__(self):
         return self.name
+
+    def save(self, *args, **kwargs):
+        if self._state.adding and not self.rank:
+            # tarefa nova entra no fim da coluna
+            last = (
+                Task.objects.filter(project_id=self.project_id, status=self.status)
+                .order_by('-rank').values_list('rank', flat=True).first()
+            )
+            self.rank = rank_after(last)
+        super().save(*args, **kwargs)
+
+
+class ArchivedTask(models.Model):
+    """Tarefa concluída/cancelada movida para fora de tasks_task (ver tasks/archive.py).
+
+    Guarda as mesmas colunas de Task com o mesmo id, para que a tarefa possa
+    voltar para a tabela quente sem mudar de URL.
+    """
+    id = models.BigIntegerField(primary_key=True)
+    project = models.ForeignKey(Project, on_delete=models.CASCADE, related_name='archived_tasks')
+    assigned_to = models.ForeignKey(settings.AUTH_USER_MODEL, 
+    on_delete=models.CASCADE, null=True, blank=True, related_name='archived_assigned_tasks')
+    owner = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='archived_tasks')
+    name = models.CharField(max_length=255)
+    description = models.TextField()
+    start_date = models.DateField()
+    end_date = models.DateField(null=True, blank=True)
+
+    priority = models.CharField(choices=TaskPriority, default=TaskPriority.LOW)
+    status = models.CharField(max_length=20, choices=TaskStatus, default=TaskStatus.COMPLETED)
+    rank = models.CharField(max_length=64, blank=True, default='', editable=False)
+    version = models.PositiveIntegerField(default=1, editable=False)
+    recurrence = models.ForeignKey(
+        'RecurrenceRule', on_delete=models.SET_NULL, db_constraint=False, db_index=False,
+        null=True, blank=True, editable=False, related_name='+',
+    )
+    occurrence_date = models.DateField(null=True, blank=True, editable=False)
+
+    archived_at = models.DateTimeField(default=timezone.now)
+    # ligações que o DELETE da tabela quente apaga em cascata; voltam com restore_task
+    label_ids = models.JSONField(default=list, blank=True, editable=False)
+    # arestas de TaskDependency nos dois sentidos (tarefas de que esta depende / que dependem desta)
+    blocker_ids = models.JSONField(default=list, blank=True, editable=False)
+    dependent_ids = models.JSONField(default=list, blank=True, editable=False)
+
+    class Meta:
+        indexes = [
+            # contagem por status do fechamento diário (projects/snapshots.py) só no índice
+            models.Index(fields=['project', 'status'], name='tasks_archived_status_idx'),
+        ]
+
+    def __str__(self):
+        return self.name
+
+
+class RecurrenceRule(models.Model):
+    """Regra de repetição de uma tarefa modelo (ver tasks/recurrence.py).
+
+    As ocorrências são calculadas a partir da regra; só viram linhas de Task
+    quando entram no horizonte (TASK_RECURRENCE_HORIZON_DAYS) ou quando alguém
+    abre uma delas. `next_occurrence` é a primeira data que o job ainda não
+    gerou, então ele só lê as regras com alguma ocorrência dentro do horizonte.
+    """
+    # série sem mais ocorrências: fica fora da faixa varrida pelo job
+    EXHAUSTED = datetime.date.max
+
+    template = models.OneToOneField(Task, on_delete=models.CASCADE, related_name='recurrence_rule')
+    frequency = models.CharField(max_length=10, choices=RecurrenceFrequency, default=RecurrenceFrequency.WEEKLY)
+    interval = models.PositiveSmallIntegerField(default=1)
+    # dias da semana das regras semanais: bit 0 = segunda ... bit 6 = domingo (0 = o dia de `starts_on`)
+    weekdays = models.PositiveSmallIntegerField(default=0)
+    starts_on = models.DateField()
+    until = models.DateField(null=True, blank=True)
+    next_occurrence = models.DateField()
+
+    class Meta:
+        indexes = [
+            # o job lê as regras com next_occurrence <= horizonte como uma faixa deste índice
+            models.Index(fields=['next_occurrence'], name='tasks_recurrence_due_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.get_frequency_display()} — {self.template_id}'
+
+    @property
+    def weekday_list(self):
+        return [day for day in range(7) if self.weekdays & (1 << day)]
+
+
+class InboxItem(models.Model):
+    """Linha da caixa de entrada: uma por tarefa em aberto com responsável (ver tasks/inbox.py).
+
+    Cópia desnormalizada de Task (e do nome do projeto), mantida a cada
+    alteração da tarefa. `due` é o prazo, ou NO_DUE_DATE quando não há, para
+    que as tarefas sem prazo fiquem no fim sem precisar de ordenação extra.
+    """
+    NO_DUE_DATE = datetime.date.max
+
+    task = models.OneToOneField(Task, on_delete=models.CASCADE, primary_key=True, related_name='inbox_item')
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, db_index=False, related_name='inbox_items')
+    project = models.ForeignKey(Project, on_delete=models.CASCADE, related_name='+')
+    project_name = models.CharField(max_length=255)
+    task_name = models.CharField(max_length=255)
+    status = models.CharField(max_length=20, choices=TaskStatus)
+    priority_order = models.PositiveSmallIntegerField()
+    due = models.DateField()
+
+    class Meta:
+        indexes = [
+            # a página da caixa de entrada é uma faixa deste índice, já na ordem de exibição
+            models.Index(fields=['user', 'due', 'priority_order', 'task'], name='tasks_inbox_user_idx'),
+        ]
+
+    def __str__(self):
+        return self.task_name
+
+    @property
+    def end_date(self):
+        return None if self.due == self.NO_DUE_DATE else self.due
+
+    @property
+    def priority(self):
+        return next(priority for priority, order in TASK_PRIORITY_ORDER.items() if order == self.priority_order)
+
+    def get_priority_display(self):
+        return self.priority.label
+
+
+class TaskReminder(models.Model):
+    """Último resumo de prazos que listou a tarefa (ver tasks/reminders.py).
+
+    A varredura pula as tarefas já lembradas ao mesmo responsável no dia, então
+    rodar de novo (cron repetido, --loop) só envia o que venceu ou mudou de
+    responsável desde a última vez.
+    """
+    task = models.OneToOneField(Task, on_delete=models.CASCADE, primary_key=True, related_name='reminder')
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, db_index=False, related_name='+')
+    sent_on = models.DateField()
+
+    def __str__(self):
+        return f'{self.task_id} → {self.user_id} {self.sent_on}'
+
+
+class Label(models.Model):
+    """Etiqueta livre, própria de cada projeto (ver tasks/facets.py)."""
+    project = models.ForeignKey(Project, on_delete=models.CASCADE, db_index=False, related_name='labels')
+    name = models.CharField(max_length=50)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['project', 'name'], name='tasks_label_unique'),
+        ]
+
+    def __str__(self):
+        return self.name
+
+
+class TaskLabel(models.Model):
+    task = models.ForeignKey(Task, on_delete=models.CASCADE, db_index=False, related_name='task_labels')
+    label = models.ForeignKey(Label, on_delete=models.CASCADE, db_index=False, related_name='task_labels')
+
+    class Meta:
+        constraints = [
+            # etiquetas de uma tarefa (task_id = ?)
+            models.UniqueConstraint(fields=['task', 'label'], name='tasks_tasklabel_unique'),
+        ]
+        indexes = [
+            # tarefas de uma etiqueta, já ordenadas por task_id: cada etiqueta do filtro
+            # é uma faixa deste índice e a interseção não precisa ler tasks_task
+            models.Index(fields=['label', 'task'], name='tasks_tasklabel_label_idx'),
+        ]
+
+
+class TaskDependency(models.Model):
+    """Aresta do grafo de dependências: `task` só começa depois de `depends_on` (ver tasks/graph.py)."""
+    task = models.ForeignKey(Task, on_delete=models.CASCADE, db_index=False, related_name='dependencies')
+    depends_on = models.ForeignKey(Task, on_delete=models.CASCADE, db_index=False, related_name='dependents')
+
+    class Meta:
+        constraints = [
+            # o índice da constraint atende a busca dos bloqueadores (task_id = ?)
+            models.UniqueConstraint(fields=['task', 'depends_on'], name='tasks_dependency_unique'),
+            models.CheckConstraint(condition=~models.Q(task=models.F('depends_on')), name='tasks_dependency_not_self'),
+        ]
+        indexes = [
+            # e este, a dos dependentes (depends_on_id = ?)
+            models.Index(fields=['depends_on', 'task'], name='tasks_dependency_reverse_idx'),
+        ]
+
+    def __str__(self):
+        return f'#{self.task_id} depende de #{self.depends_on_id}'
+
+
+class TaskActivity(models.Model):
+    """Histórico append-only das alterações de uma tarefa (ver tasks/activity.py)."""
+    # sem constraint: o histórico continua valendo com a tarefa arquivada ou excluída
+    task = models.ForeignKey(Task, on_delete=models.DO_NOTHING, db_constraint=False, db_index=False, related_name='activities')
+    project = models.ForeignKey(Project, on_delete=models.CASCADE, db_index=False, related_name='task_activities')
+    actor = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    event = models.PositiveSmallIntegerField(choices=TaskEvent)
+    changes = models.JSONField(default=dict, blank=True)  # {"campo": [antes, depois]}
+    created_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            # as timelines paginam por (task|project, id desc): a página sai de uma faixa do índice
+            models.Index(fields=['task', '-id'], name='tasks_activity_task_idx'),
+            models.Index(fields=['project', '-id'], name='tasks_activity_project_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.get_event_display()} #{self.task_id}'
+
+
+class TimeEntry(models.Model):
+    """Tempo lançado numa tarefa: cronômetro ou lançamento manual (ver tasks/timetracking.py).
+
+    Enquanto o cronômetro corre, `seconds` fica vazio e o tempo ainda não
+    entra nos totais. O tempo conta todo no dia do início.
+    """
+    # sem constraint, como o histórico: o tempo lançado continua valendo com a tarefa arquivada ou excluída
+    task = models.ForeignKey(Task, on_delete=models.DO_NOTHING, db_constraint=False, db_index=False, related_name='time_entries')
+    project = models.ForeignKey(Project, on_delete=models.CASCADE, db_index=False, related_name='time_entries')
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, db_index=False, related_name='time_entries')
+    day = models.DateField()
+    started_at = models.DateTimeField(null=True, blank=True)
+    ended_at = models.DateTimeField(null=True, blank=True)
+    seconds = models.PositiveIntegerField(null=True, blank=True)
+    note = models.CharField(max_length=255, blank=True)
+    created_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        constraints = [
+            # um cronômetro correndo por usuário; o índice também é a busca "meu cronômetro"
+            models.UniqueConstraint(fields=['user'], condition=models.Q(seconds__isnull=True), name='tasks_timeentry_running_unique'),
+        ]
+        indexes = [
+            models.Index(fields=['task', '-id'], name='tasks_timeentry_task_idx'),
+            # reconstrução dos totais de um projeto: GROUP BY user, day numa faixa do índice
+            models.Index(fields=['project', 'user', 'day'], name='tasks_timeentry_rollup_idx'),
+        ]
+
+    def __str__(self):
+        return f'#{self.task_id} {self.day}'
+
+    @property
+    def running(self):
+        return self.seconds is None
+
+    @property
+    def hours(self):
+        return None if self.seconds is None else self.seconds / 3600
+
+
+class DailyRollup(models.Model):
+    """Segundos lançados por (projeto, usuário, dia), somados a cada lançamento (ver tasks/timetracking.py).
+
+    Os relatórios de horas leem só esta tabela: uma semana de um projeto são
+    no máximo 7 linhas por participante.
+    """
+    project = models.ForeignKey(Project, on_delete=models.CASCADE, db_index=False, related_name='+')
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, db_index=False, related_name='+')
+    day = models.DateField()
+    seconds = models.BigIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            # alvo do upsert; também atende o relatório do projeto (project = ? AND day BETWEEN ...)
+            models.UniqueConstraint(fields=['project', 'user', 'day'], name='tasks_rollup_unique'),
+        ]
+        indexes = [
+            # relatório do usuário (user = ? AND day BETWEEN ...)
+            models.Index(fields=['user', 'day'], name='tasks_rollup_user_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.project_id}/{self.user_id} {self.day}'
+
+
+class ChangeLog(models.Model):
+    """Última alteração de cada tarefa, projeto e acesso, em ordem de `seq` (ver tasks/changes.py).
+
+    Mantida por triggers do banco (migração 0019), então pega também
+    `.update()`, SQL direto, fast_delete e o arquivamento. Uma linha por
+    objeto: cada alteração só avança o `seq` dela.
+    """
+    seq = models.BigIntegerField()
+    kind = models.PositiveSmallIntegerField(choices=ChangeKind)
+    object_id = models.BigIntegerField()
+    # sem FK: as exclusões continuam no feed depois que a tarefa ou o projeto some
+    project_id = models.BigIntegerField()
+    # só nas linhas de acesso: quem entrou ou saiu dos participantes
+    user_id = models.BigIntegerField(null=True, blank=True)
+    deleted = models.BooleanField(default=False)
+
+    class Meta:
+        constraints = [
+            # o feed é uma faixa deste índice; MAX(seq) + 1 dos triggers também sai dele
+            models.UniqueConstraint(fields=['seq'], name='tasks_changelog_seq_unique'),
+            models.UniqueConstraint(
+                fields=['kind', 'object_id', 'project_id'], condition=models.Q(user_id__isnull=True),
+                name='tasks_changelog_object_unique',
+            ),
+            models.UniqueConstraint(
+                fields=['user_id', 'project_id'], condition=models.Q(user_id__isnull=False),
+                name='tasks_changelog_access_unique',
+            ),
+        ]
+        indexes = [
+            # alterações de um projeto depois do cursor, já em ordem de seq (ver changes._shard_changes)
+            models.Index(fields=['project_id', 'seq'], condition=models.Q(user_id__isnull=True), name='tasks_changelog_project_idx'),
+            models.Index(fields=['user_id', 'seq'], condition=models.Q(user_id__isnull=False), name='tasks_changelog_user_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.seq}: {self.get_kind_display()} #{self.object_id}'
@@ -0,0 +1,278 @@
+"""Tarefas recorrentes com ocorrências geradas sob demanda.
+
+Uma RecurrenceRule fica presa a uma tarefa modelo, que é também a primeira
+ocorrência (a de `starts_on`). As datas das demais ocorrências são calculadas
+pela regra (`occurrences`) para qualquer janela, sem linhas no banco; só viram
+Task quando:
+
+- entram no horizonte de TASK_RECURRENCE_HORIZON_DAYS dias: o job
+  `tasks.materialize_recurrences` (comando `materialize_recurrences`) lê só as
+  regras com `next_occurrence` dentro do horizonte, em lotes, e cria as
+  tarefas de cada lote com um bulk_create, numa transação curta;
+- alguém abre uma ocorrência futura (`materialize_occurrence`).
+
+A ocorrência copia da modelo, no momento em que é criada, nome, descrição,
+prioridade, responsável, etiquetas e a duração (end_date - start_date).
+`Task.occurrence_date` tem índice único por regra, então gerar a mesma data
+duas vezes não duplica a tarefa. Datas anteriores a `next_occurrence` nunca
+são geradas de novo: excluir uma ocorrência já criada pelo job a tira da série.
+"""
+import calendar
+import datetime
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import OuterRef, Subquery
+from django.utils import timezone
+
+from core.choices import RecurrenceFrequency, TaskEvent, TaskStatus
+from core.ranking import rank_after
+from core.sharding import db_for
+from projects.models import Project
+from .inbox import sync_inbox
+from .models import RecurrenceRule, Task, TaskActivity, TaskLabel
+
+# tentativas de gravar um lote quando outra gravação cria a mesma ocorrência no meio
+MAX_ATTEMPTS = 3
+
+
+def horizon(today=None, horizon_days=None):
+    """Última data que o job deixa materializada."""
+    if horizon_days is None:
+        horizon_days = getattr(settings, 'TASK_RECURRENCE_HORIZON_DAYS', 14)
+    return (today or timezone.localdate()) + timedelta(days=horizon_days)
+
+
+def occurrences(rule, start, end):
+    """Datas das ocorrências de `rule` entre `start` e `end` (inclusive), em ordem.
+
+    O primeiro período da janela é calculado direto, sem percorrer a série
+    desde `starts_on`.
+    """
+    start = max(start, rule.starts_on)
+    if rule.until and rule.until < end:
+        end = rule.until
+    if start > end:
+        return
+    step = max(rule.interval, 1)
+
+    if rule.frequency == RecurrenceFrequency.DAILY:
+        day = rule.starts_on + timedelta(days=-(-(start - rule.starts_on).days // step) * step)
+        while day <= end:
+            yield day
+            day += timedelta(days=step)
+
+    elif rule.frequency == RecurrenceFrequency.WEEKLY:
+        weekdays = rule.weekday_list or [rule.starts_on.weekday()]
+        first_monday = rule.starts_on - timedelta(days=rule.starts_on.weekday())
+        week = (start - first_monday).days // 7 // step * step
+        while True:
+            monday = first_monday + timedelta(weeks=week)
+            if monday > end:
+                return
+            for weekday in weekdays:
+                day = monday + timedelta(days=weekday)
+                if start <= day <= end:
+                    yield day
+            week += step
+
+    else:
+        base = rule.starts_on.year * 12 + rule.starts_on.month - 1
+        month = (start.year * 12 + start.month - 1 - base) // step * step
+        while True:
+            year, index = divmod(base + month, 12)
+            # dia 31 cai no último dia dos meses mais curtos
+            day = datetime.date(year, index + 1, min(rule.starts_on.day, calendar.monthrange(year, index + 1)[1]))
+            if day > end:
+                return
+            if day >= start:
+                yield day
+            month += step
+
+
+def is_occurrence(rule, day):
+    return next(occurrences(rule, day, day), None) == day
+
+
+def agenda(rules, start, end, using=None):
+    """Ocorrências de `rules` na janela, como [(data, regra, tarefa ou None)] ordenado por data.
+
+    As já materializadas vêm de uma consulta no índice único (recurrence,
+    occurrence_date); as demais ficam com tarefa None.
+    """
+    rules = {rule.pk: rule for rule in rules}
+    if not rules:
+        return []
+    using = using or db_for(Task)
+    tasks = {
+        (task.recurrence_id, task.occurrence_date): task
+        for task in Task.objects.using(using).filter(
+            recurrence_id__in=rules, occurrence_date__gte=start, occurrence_date__lte=end,
+        )
+    }
+    items = [
+        (day, rule, tasks.pop((rule.pk, day), None))
+        for rule in rules.values() for day in occurrences(rule, start, end)
+    ]
+    # ocorrências criadas antes de uma mudança na regra continuam na agenda
+    items += [(day, rules[rule_id], task) for (rule_id, day), task in tasks.items()]
+    items.sort(key=lambda item: (item[0], item[1].pk))
+    return items
+
+
+def reset_cursor(rule, today=None):
+    """Ponto de partida do job depois de criar ou mudar a regra: não gera datas já passadas.
+
+    A ocorrência de `starts_on` é a própria tarefa modelo.
+    """
+    start = max(rule.starts_on + timedelta(days=1), today or timezone.localdate())
+    rule.next_occurrence = next(occurrences(rule, start, RecurrenceRule.EXHAUSTED), RecurrenceRule.EXHAUSTED)
+
+
+def _due_dates(rule, through):
+    """Datas de `next_occurrence` até `through` e a próxima depois delas (o novo cursor)."""
+    days = []
+    for day in occurrences(rule, rule.next_occurrence, RecurrenceRule.EXHAUSTED):
+        if day > through:
+            return days, day
+        days.append(day)
+    return days, RecurrenceRule.EXHAUSTED
+
+
+def save_rule(rule, today=None):
+    """Grava a regra nova ou alterada, liga a tarefa modelo a ela e já materializa o horizonte."""
+    using = rule.template._state.db or db_for(Task)
+    reset_cursor(rule, today)
+    with transaction.atomic(using=using):
+        rule.save(using=using)
+        Task.objects.using(using).filter(pk=rule.template_id).update(recurrence=rule, occurrence_date=rule.starts_on)
+    materialize_rules([rule], horizon(today), using)
+    return rule
+
+
+def _new_task(rule, day):
+    template = rule.template
+    task = Task(
+        project_id=template.project_id,
+        owner_id=template.owner_id,
+        assigned_to_id=template.assigned_to_id,
+        name=template.name,
+        description=template.description,
+        priority=template.priority,
+        status=TaskStatus.IN_PROGRESS,
+        start_date=day,
+        end_date=day + (template.end_date - template.start_date) if template.end_date else None,
+        recurrence_id=rule.pk,
+        occurrence_date=day,
+    )
+    task._template_id = template.pk  # de onde copiar as etiquetas
+    return task
+
+
+def _insert(tasks, using):
+    """Cria as ocorrências no fim da coluna "em andamento" de cada projeto, com etiquetas, histórico e caixa de entrada."""
+    # última chave da coluna de cada projeto numa consulta só (cada subconsulta é uma busca no índice do quadro)
+    last_rank = dict(
+        Project.objects.using(using).filter(pk__in={task.project_id for task in tasks}).annotate(last_rank=Subquery(
+            Task.objects.filter(project_id=OuterRef('pk'), status=TaskStatus.IN_PROGRESS).order_by('-rank').values('rank')[:1]
+        )).values_list('pk', 'last_rank')
+    )
+    for task in tasks:
+        task.rank = last_rank[task.project_id] = rank_after(last_rank.get(task.project_id))
+    Task.objects.using(using).bulk_create(tasks, batch_size=500)
+
+    templates = {}
+    for task in tasks:
+        templates.setdefault(task._template_id, []).append(task.pk)
+    TaskLabel.objects.using(using).bulk_create([
+        TaskLabel(task_id=task_id, label_id=label_id)
+        for template_id, label_id in TaskLabel.objects.using(using).filter(task_id__in=templates).values_list('task_id', 'label_id')
+        for task_id in templates[template_id]
+    ], batch_size=500)
+    TaskActivity.objects.using(using).bulk_create([
+        TaskActivity(task_id=task.pk, project_id=task.project_id, event=TaskEvent.CREATED) for task in tasks
+    ], batch_size=500)
+    sync_inbox([task.pk for task in tasks], using=using)
+
+
+def materialize_rules(rules, through, using=None):
+    """Cria as ocorrências de `rules` de `next_occurrence` até `through` e avança o cursor.
+
+    Tudo numa transação; as datas que já têm tarefa (abertas antes por alguém)
+    são puladas. Retorna o número de tarefas criadas.
+    """
+    rules = [rule for rule in rules if rule.next_occurrence <= through]
+    if not rules:
+        return 0
+    using = using or db_for(Task)
+    due = {rule.pk: _due_dates(rule, through) for rule in rules}
+    for attempt in range(MAX_ATTEMPTS):
+        existing = set(
+            Task.objects.using(using).filter(
+                recurrence_id__in=due,
+                occurrence_date__gte=min(rule.next_occurrence for rule in rules), occurrence_date__lte=through,
+            ).values_list('recurrence_id', 'occurrence_date')
+        )
+        tasks = [
+            _new_task(rule, day)
+            for rule in rules for day in due[rule.pk][0] if (rule.pk, day) not in existing
+        ]
+        try:
+            with transaction.atomic(using=using):
+                if tasks:
+                    _insert(tasks, using)
+                updated = [RecurrenceRule(pk=rule.pk, next_occurrence=due[rule.pk][1]) for rule in rules]
+                RecurrenceRule.objects.using(using).bulk_update(updated, ['next_occurrence'])
+            break
+        except IntegrityError:
+            # uma ocorrência do lote foi aberta por alguém entre a leitura e o INSERT
+            if attempt == MAX_ATTEMPTS - 1:
+                raise
+    for rule in rules:
+        rule.next_occurrence = due[rule.pk][1]
+    return len(tasks)
+
+
+def materialize_due(today=None, horizon_days=None, batch_size=500, using=None, progress=None):
+    """Materializa o horizonte de todas as regras atrasadas do shard, `batch_size` regras por transação.
+
+    Cada lote é uma faixa do índice de `next_occurrence`; as regras do lote
+    saem da faixa ao avançar o cursor, então a consulta seguinte já pega as
+    próximas. Regras sem ocorrência no horizonte nem são lidas.
+    `progress(rules, created)` é chamado após cada lote. Retorna {'rules': lidas, 'created': tarefas criadas}.
+    """
+    using = using or db_for(Task)
+    through = horizon(today, horizon_days)
+    pending = RecurrenceRule.objects.using(using).filter(next_occurrence__lte=through).select_related('template')
+    stats = {'rules': 0, 'created': 0}
+    while True:
+        rules = list(pending.order_by()[:batch_size])
+        if not rules:
+            return stats
+        stats['created'] += materialize_rules(rules, through, using)
+        stats['rules'] += len(rules)
+        if progress:
+            progress(stats['rules'], stats['created'])
+        if len(rules) < batch_size:
+            return stats
+
+
+def materialize_occurrence(rule, day):
+    """Tarefa da ocorrência `day` de `rule`, criando-a se ainda não existir (ex.: alguém a abriu na agenda)."""
+    using = rule._state.db or db_for(Task)
+    if day == rule.starts_on:
+        return rule.template
+    task = Task.objects.using(using).filter(recurrence=rule, occurrence_date=day).first()
+    if task is not None:
+        return task
+    if not is_occurrence(rule, day):
+        raise ValueError(f'{day:%d/%m/%Y} não é uma ocorrência desta regra.')
+    task = _new_task(rule, day)
+    try:
+        with transaction.atomic(using=using):
+            _insert([task], using)
+    except IntegrityError:
+        # criada ao mesmo tempo pelo job ou por outra requisição
+        return Task.objects.using(using).get(recurrence=rule, occurrence_date=day)
+    return task
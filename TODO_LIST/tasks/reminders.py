@@ -0,0 +1,199 @@
+import logging
+import time
+from contextlib import ExitStack
+from datetime import timedelta
+from smtplib import SMTPException
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import models, transaction
+from django.utils import timezone
+
+from core.choices import OPEN_TASK_STATUSES
+from core.sharding import read_aliases
+from users.models import User
+from .models import Task, TaskReminder
+
+logger = logging.getLogger(__name__)
+
+# quantas tarefas listar por resumo; o resto entra só na contagem
+DIGEST_MAX_ITEMS = 20
+
+
+def iter_due_tasks(limit_date, today, batch_size=2000):
+    """Percorre, em lotes por keyset, as tarefas abertas com end_date <= limit_date
+    ainda não lembradas hoje ao responsável atual. Gera (alias, lote).
+
+    A ordem (end_date, id) é a do índice tasks_task_status_end_idx, então cada
+    lote é uma busca por faixa no índice a partir do último (end_date, id)
+    visto, sem OFFSET e sem carregar a tabela inteira; a marca de TaskReminder
+    é conferida pela chave primária. Cada shard é varrido por sua vez.
+    """
+    for alias in read_aliases(Task):
+        for batch in _iter_due_tasks(alias, limit_date, today, batch_size):
+            yield alias, batch
+
+
+def _iter_due_tasks(alias, limit_date, today, batch_size):
+    reminded = TaskReminder.objects.filter(task=models.OuterRef('pk'), user=models.OuterRef('assigned_to'), sent_on=today)
+    for status in OPEN_TASK_STATUSES:
+        base = Task.objects.using(alias).filter(status=status, end_date__lte=limit_date, assigned_to__isnull=False).exclude(
+            models.Exists(reminded)
+        )
+        last_date, last_id = None, None
+        while True:
+            queryset = base
+            if last_date is not None:
+                queryset = queryset.filter(end_date__gte=last_date).filter(
+                    models.Q(end_date__gt=last_date) | models.Q(id__gt=last_id)
+                )
+            batch = list(
+                queryset.order_by('end_date', 'id')
+                .values('id', 'name', 'end_date', 'assigned_to_id', 'project__name')[:batch_size]
+            )
+            if not batch:
+                break
+            yield batch
+            last_date, last_id = batch[-1]['end_date'], batch[-1]['id']
+            if len(batch) < batch_size:
+                break
+
+
+class Digest:
+    def __init__(self):
+        self.overdue = []
+        self.due_soon = []
+        self.overdue_count = 0
+        self.due_soon_count = 0
+        # (alias, id) de todas as tarefas contadas, para marcá-las depois do envio
+        self.task_ids = []
+
+    def add(self, alias, task, overdue):
+        self.task_ids.append((alias, task['id']))
+        items = self.overdue if overdue else self.due_soon
+        if overdue:
+            self.overdue_count += 1
+        else:
+            self.due_soon_count += 1
+        if len(items) < DIGEST_MAX_ITEMS:
+            items.append(task)
+
+
+def build_digests(today, due_soon_days, batch_size=2000):
+    """Agrupa as tarefas vencidas/a vencer por responsável. Retorna ({user_id: Digest}, tarefas lidas)."""
+    limit_date = today + timedelta(days=due_soon_days)
+    digests = {}
+    scanned = 0
+    for alias, batch in iter_due_tasks(limit_date, today, batch_size):
+        scanned += len(batch)
+        for task in batch:
+            digest = digests.get(task['assigned_to_id'])
+            if digest is None:
+                digest = digests[task['assigned_to_id']] = Digest()
+            digest.add(alias, task, overdue=task['end_date'] < today)
+    return digests, scanned
+
+
+def _format_items(title, items, total):
+    lines = [f'{title} ({total}):']
+    for task in items:
+        lines.append(f"  - {task['name']} [{task['project__name']}] — prazo {task['end_date']:%d/%m/%Y}")
+    if total > len(items):
+        lines.append(f'  ... e mais {total - len(items)} tarefa(s).')
+    return lines
+
+
+def render_digest(user, digest):
+    lines = [f'Olá, {user["name"]}!', '']
+    if digest.overdue_count:
+        lines += _format_items('Tarefas atrasadas', digest.overdue, digest.overdue_count) + ['']
+    if digest.due_soon_count:
+        lines += _format_items('Tarefas com prazo próximo', digest.due_soon, digest.due_soon_count) + ['']
+    return '\n'.join(lines)
+
+
+def mark_reminded(user_id, digest, today):
+    """Grava em TaskReminder que as tarefas do resumo de `user_id` foram lembradas hoje."""
+    by_alias = {}
+    for alias, task_id in digest.task_ids:
+        by_alias.setdefault(alias, []).append(TaskReminder(task_id=task_id, user_id=user_id, sent_on=today))
+    for alias, reminders in by_alias.items():
+        TaskReminder.objects.using(alias).bulk_create(
+            reminders, batch_size=500, update_conflicts=True, unique_fields=['task'], update_fields=['user', 'sent_on'],
+        )
+
+
+def send_digest(connection, user, digest, today):
+    """Entrega o resumo de um responsável e o marca em TaskReminder na mesma transação.
+
+    A marca só é gravada depois que o servidor de e-mail aceitou a mensagem;
+    se a entrega falhar, nada fica marcado e as tarefas voltam na próxima
+    varredura. Retorna se o resumo foi entregue.
+    """
+    message = EmailMessage(
+        subject='DevTasker: resumo de prazos das suas tarefas',
+        body=render_digest(user, digest),
+        to=[user['email']],
+        connection=connection,
+    )
+    with ExitStack() as stack:
+        # as marcas podem ir para mais de um shard: todas ou nenhuma
+        for alias in sorted({alias for alias, _ in digest.task_ids}):
+            stack.enter_context(transaction.atomic(using=alias))
+        try:
+            delivered = connection.send_messages([message])
+        except (SMTPException, OSError):
+            logger.exception('Falha ao enviar o resumo de prazos para o usuário %s.', user['id'])
+            return False
+        if not delivered:
+            return False
+        mark_reminded(user['id'], digest, today)
+    return True
+
+
+def send_digests(digests, today, chunk_size=500):
+    """Envia um e-mail por responsável, reaproveitando uma única conexão SMTP.
+
+    Os responsáveis são lidos em lotes de `chunk_size`; uma entrega que falha
+    não impede as seguintes.
+    """
+    sent = 0
+    user_ids = list(digests)
+    connection = get_connection()
+    connection.open()
+    try:
+        for start in range(0, len(user_ids), chunk_size):
+            chunk = user_ids[start:start + chunk_size]
+            for user in User.objects.filter(pk__in=chunk, is_active=True).values('id', 'name', 'email'):
+                sent += send_digest(connection, user, digests[user['id']], today)
+    finally:
+        connection.close()
+    return sent
+
+
+def scan_due_tasks(today=None, due_soon_days=None, batch_size=2000, dry_run=False):
+    """Varre os prazos e envia os resumos. Retorna estatísticas da execução.
+
+    Cada tarefa entra no resumo no máximo uma vez por dia e responsável;
+    `dry_run` não envia nem marca nada.
+    """
+    today = today or timezone.localdate()
+    if due_soon_days is None:
+        due_soon_days = getattr(settings, 'TASK_DUE_SOON_DAYS', 2)
+
+    started = time.perf_counter()
+    digests, scanned = build_digests(today, due_soon_days, batch_size)
+    scan_seconds = time.perf_counter() - started
+
+    sent = 0 if dry_run else send_digests(digests, today)
+    stats = {
+        'scanned': scanned,
+        'assignees': len(digests),
+        'overdue': sum(d.overdue_count for d in digests.values()),
+        'due_soon': sum(d.due_soon_count for d in digests.values()),
+        'digests_sent': sent,
+        'scan_seconds': round(scan_seconds, 3),
+        'total_seconds': round(time.perf_counter() - started, 3),
+    }
+    logger.info('Varredura de prazos: %s', stats)
+    return stats
@@ -1,3 +1,915 @@
-from django.test import TestCase
+import datetime
+import json
+import threading
+from smtplib import SMTPException
+from unittest import mock
 
-# Create your tests here.
+from django.core import mail
+from django.core.exceptions import ValidationError
+from django.db import OperationalError, close_old_connections, connection
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from core.choices import RecurrenceFrequency, TaskEvent, TaskPriority, TaskStatus
+from core.versioning import EditConflict
+from projects.models import Project
+from users.models import User
+
+from . import activity, board, changes, graph, inbox, recurrence, timetracking
+from .archive import archivable_tasks, archive_finished_tasks, restore_task
+from .checks import check_changelog_triggers
+from .forms import TaskForm
+from .management.commands import rebuild_time_rollups
+from .models import ArchivedTask, DailyRollup, InboxItem, Label, RecurrenceRule, Task, TaskActivity, TaskDependency, TaskReminder, TimeEntry
+from .reminders import scan_due_tasks
+from .views import ActivityTimelineMixin
+
+
+def make_task(owner, name='Tarefa', **fields):
+    project = Project.objects.create(name='Projeto', owner=owner)
+    return Task.objects.create(
+        project=project, owner=owner, name=name, description='Descrição', start_date='2026-01-01', **fields,
+    )
+
+
+def edit_data(task, **changes):
+    """POST do formulário de edição como o navegador enviaria: valores atuais + valores de partida escondidos."""
+    form = TaskForm(instance=task, project=task.project)
+    data = {}
+    for name, field in form.fields.items():
+        value = field.prepare_value(form[name].value())
+        value = '' if value is None else str(value)
+        data[name] = data[form[name].html_initial_name] = value
+    data.update(changes)
+    return data
+
+
+class ArchiveTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('dono@example.com', 'Dono', 'senha-123', cpf='1')
+        self.task = make_task(self.user, status=TaskStatus.COMPLETED, end_date=datetime.date(2020, 1, 1))
+        self.project = self.task.project
+
+    def test_only_old_finished_tasks_are_archived_in_batches(self):
+        old, recent = datetime.date(2020, 1, 1), timezone.localdate()
+        canceled = self.add_task('Cancelada', status=TaskStatus.CANCELED, end_date=None, start_date=old)
+        self.add_task('Aberta', end_date=old)
+        self.add_task('Recente', status=TaskStatus.COMPLETED, end_date=recent)
+        batches = []
+
+        self.assertEqual(archive_finished_tasks(90, batch_size=1, progress=batches.append), 2)
+        self.assertEqual(batches, [1, 2])
+        self.assertEqual(set(Task.objects.values_list('name', flat=True)), {'Aberta', 'Recente'})
+        archived = ArchivedTask.objects.get(pk=canceled.pk)  # mantém o id
+        self.assertEqual((archived.name, archived.status, archived.project_id), ('Cancelada', TaskStatus.CANCELED, self.project.pk))
+        self.assertIsNotNone(archived.archived_at)
+        self.assertFalse(archivable_tasks(90).exists())
+
+    def test_lists_show_archived_tasks_only_on_request(self):
+        Task.objects.filter(pk=self.task.pk).update(assigned_to=self.user)
+        archive_finished_tasks(90)
+        self.client.force_login(self.user)
+        self.assertIsNone(self.client.get(reverse('task-list')).context['archived_tasks'])
+        response = self.client.get(reverse('task-list'), {'archived': '1'})
+        self.assertEqual([task.pk for task in response.context['archived_tasks']], [self.task.pk])
+
+    def test_labels_survive_archive_and_restore(self):
+        kept = Label.objects.create(project=self.project, name='infra')
+        removed = Label.objects.create(project=self.project, name='antiga')
+        self.task.labels.add(kept, removed)
+
+        self.assertEqual(archive_finished_tasks(90), 1)
+        self.assertFalse(Task.objects.filter(pk=self.task.pk).exists())
+        removed.delete()  # apagada enquanto a tarefa estava no arquivo
+
+        task = restore_task(self.task.pk)
+        self.assertEqual(list(task.labels.values_list('name', flat=True)), ['infra'])
+
+    def add_task(self, name, start_date='2026-01-01', **fields):
+        return Task.objects.create(project=self.project, owner=self.user, name=name, description='', start_date=start_date, **fields)
+
+    def edges(self):
+        return set(TaskDependency.objects.values_list('task', 'depends_on'))
+
+    def test_dependencies_survive_archive_and_restore(self):
+        blocker = self.add_task('Bloqueadora', status=TaskStatus.COMPLETED, end_date=datetime.date(2020, 1, 1))
+        dependent = self.add_task('Dependente')
+        TaskDependency.objects.create(task=self.task, depends_on=blocker)
+        TaskDependency.objects.create(task=dependent, depends_on=self.task)
+        archive_finished_tasks(90)  # arquiva self.task e blocker
+        self.assertEqual(self.edges(), set())
+
+        # com a outra ponta ainda arquivada, só a aresta do dependente volta
+        restore_task(self.task.pk)
+        self.assertEqual(self.edges(), {(dependent.pk, self.task.pk)})
+        restore_task(blocker.pk)
+        self.assertEqual(self.edges(), {(dependent.pk, self.task.pk), (self.task.pk, blocker.pk)})
+
+    def test_restore_skips_edges_that_would_close_a_cycle(self):
+        dependent = self.add_task('Dependente')
+        blocker = self.add_task('Bloqueadora')
+        TaskDependency.objects.create(task=dependent, depends_on=self.task)
+        TaskDependency.objects.create(task=self.task, depends_on=blocker)
+        archive_finished_tasks(90)
+        TaskDependency.objects.create(task=blocker, depends_on=dependent)  # válida com a tarefa no arquivo
+
+        # os bloqueadores voltam primeiro; a aresta do dependente fecharia dependent -> task -> blocker -> dependent
+        restore_task(self.task.pk)
+        self.assertEqual(self.edges(), {(blocker.pk, dependent.pk), (self.task.pk, blocker.pk)})
+
+
+class ParticipantAutocompleteTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('dono@example.com', 'Dono', 'senha-123', cpf='1')
+        self.project = Project.objects.create(name='Projeto', owner=self.user)
+        self.ana = User.objects.create_user('ana@example.com', 'Ana Souza', 'senha-123', cpf='2')
+        self.andre = User.objects.create_user('andre@example.com', 'André', 'senha-123', cpf='3')
+        self.outsider = User.objects.create_user('anabela@example.com', 'Anabela', 'senha-123', cpf='4')
+        self.project.participants.add(self.user, self.ana, self.andre)
+        self.client.force_login(self.user)
+
+    def search(self, term):
+        return self.client.get(reverse('participant-autocomplete', args=[self.project.pk]), {'q': term})
+
+    def test_prefix_search_only_returns_participants(self):
+        response = self.search('AN')
+        self.assertEqual([user['name'] for user in response.json()['results']], ['Ana Souza', 'André'])
+        self.assertEqual(response['Cache-Control'], 'private, max-age=60')
+        self.assertEqual([user['id'] for user in self.search('dono@').json()['results']], [self.user.pk])
+
+    def test_outsider_is_denied(self):
+        self.client.force_login(self.outsider)
+        self.assertEqual(self.search('a').status_code, 403)
+
+    def test_form_renders_only_the_selected_option_and_rejects_outsiders(self):
+        task = make_task(self.user, assigned_to=self.ana)
+        task.project = self.project
+        html = TaskForm(instance=task, project=self.project).as_p()
+        self.assertIn('ana@example.com', html)
+        self.assertNotIn('andre@example.com', html)
+        self.assertIn(reverse('participant-autocomplete', args=[self.project.pk]), html)
+
+        form = TaskForm(edit_data(task, assigned_to=self.outsider.pk), instance=task, project=self.project)
+        self.assertFalse(form.is_valid())
+        self.assertIn('assigned_to', form.errors)
+
+
+class ActivityLogTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('dono@example.com', 'Dono', 'senha-123', cpf='1')
+        self.task = make_task(self.user)
+        self.task.project.participants.add(self.user)
+        self.client.force_login(self.user)
+
+    def events(self):
+        return list(TaskActivity.objects.filter(task_id=self.task.pk).order_by('id').values_list('event', flat=True))
+
+    def test_outside_requests_entries_are_saved_immediately(self):
+        activity.record(self.task, TaskEvent.UPDATED, changes={'end_date': (None, datetime.date(2026, 3, 1))})
+        entry = TaskActivity.objects.get(task_id=self.task.pk)
+        self.assertEqual((entry.project_id, entry.actor, entry.changes), (self.task.project_id, None, {'end_date': [None, '2026-03-01']}))
+
+    def test_form_edit_records_status_and_field_changes_in_one_insert(self):
+        data = edit_data(self.task, name='Nome novo', status=TaskStatus.COMPLETED)
+        with CaptureQueriesContext(connection) as queries:
+            self.client.post(reverse('task-update', args=[self.task.pk]), data)
+        self.assertEqual(self.events(), [TaskEvent.STATUS_CHANGED, TaskEvent.UPDATED])
+        self.assertEqual(sum('INSERT INTO "tasks_taskactivity"' in query['sql'] for query in queries), 1)
+        self.assertEqual(TaskActivity.objects.filter(actor=self.user).count(), 2)
+
+    def test_server_errors_discard_the_buffer(self):
+        def failing_view(request):
+            activity.record(self.task, TaskEvent.UPDATED, changes={'name': ('a', 'b')})
+            return HttpResponse(status=500)
+
+        activity.ActivityBufferMiddleware(failing_view)(RequestFactory().get('/'))
+        self.assertEqual(self.events(), [])
+
+    def test_timeline_pages_by_keyset(self):
+        for _ in range(3):
+            activity.record(self.task, TaskEvent.UPDATED)
+        with mock.patch.object(ActivityTimelineMixin, 'page_size', 2):
+            response = self.client.get(reverse('task-activity', args=[self.task.pk]))
+            ids = [entry.pk for entry in response.context['activities']]
+            response = self.client.get(reverse('project-activity', args=[self.task.project_id]), {'before': response.context['next_before']})
+        self.assertEqual(len(ids), 2)
+        self.assertEqual(len(response.context['activities']), 1)
+        self.assertIsNone(response.context['next_before'])
+        self.assertLess(response.context['activities'][0].pk, ids[-1])
+
+
+class BoardTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('dono@example.com', 'Dono', 'senha-123', cpf='1')
+        self.first = make_task(self.user, name='T0')
+        self.project = self.first.project
+        self.tasks = [self.first] + [
+            Task.objects.create(project=self.project, owner=self.user, name=f'T{n}', description='', start_date='2026-01-01')
+            for n in range(1, 5)
+        ]
+        self.client.force_login(self.user)
+
+    def column(self, status=TaskStatus.IN_PROGRESS):
+        return list(board.column_queryset(self.project.pk, status).values_list('name', flat=True))
+
+    def test_new_tasks_go_to_the_end_and_columns_page_by_cursor(self):
+        self.assertEqual(self.column(), ['T0', 'T1', 'T2', 'T3', 'T4'])
+        page, cursor = board.column_page(self.project.pk, TaskStatus.IN_PROGRESS, limit=3)
+        self.assertEqual([task.name for task in page], ['T0', 'T1', 'T2'])
+        data = self.client.get(
+            reverse('board-column', args=[self.project.pk, TaskStatus.IN_PROGRESS]), {'cursor': cursor},
+        ).json()
+        self.assertEqual(([card['name'] for card in data['results']], data['next']), (['T3', 'T4'], None))
+
+    def test_move_within_and_across_columns(self):
+        url = reverse('task-move', args=[self.tasks[4].pk])
+        self.assertEqual(self.client.post(url, {'before': self.tasks[1].pk}).status_code, 200)
+        self.assertEqual(self.column(), ['T0', 'T1', 'T4', 'T2', 'T3'])
+        self.assertEqual(Task.objects.get(pk=self.tasks[4].pk).version, 1)  # só reordenar não é edição
+
+        self.client.post(reverse('task-move', args=[self.tasks[0].pk]), {'status': TaskStatus.COMPLETED, 'before': ''})
+        self.assertEqual(self.column(TaskStatus.COMPLETED), ['T0'])
+        moved = Task.objects.get(pk=self.tasks[0].pk)
+        self.assertEqual(moved.version, 2)
+        self.assertTrue(TaskActivity.objects.filter(task_id=moved.pk, event=TaskEvent.STATUS_CHANGED).exists())
+
+    def test_equal_ranks_are_rebalanced_once(self):
+        Task.objects.filter(project=self.project).update(rank='')  # como depois de um bulk_create
+        board.move_task(self.tasks[3], TaskStatus.IN_PROGRESS, before_id=None)
+        column = self.column()
+        self.assertEqual(column[0], 'T3')
+        ranks = list(board.column_queryset(self.project.pk, TaskStatus.IN_PROGRESS).values_list('rank', flat=True))
+        self.assertEqual(ranks, sorted(set(ranks)))
+
+    def test_invalid_moves_are_rejected(self):
+        url = reverse('task-move', args=[self.tasks[0].pk])
+        self.assertEqual(self.client.post(url, {'status': 'nenhum'}).status_code, 400)
+        other = make_task(self.user, name='Outro projeto')
+        self.assertEqual(self.client.post(url, {'before': other.pk}).status_code, 400)
+
+
+class DependencyGraphTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('dono@example.com', 'Dono', 'senha-123', cpf='1')
+        first = make_task(self.user, name='A', end_date=datetime.date(2026, 1, 10))
+        self.project = first.project
+        self.a = first
+        self.b = self.add_task('B', datetime.date(2026, 1, 20))
+        self.c = self.add_task('C', datetime.date(2026, 1, 15))
+        self.d = self.add_task('D', datetime.date(2026, 2, 1))
+        # A -> B -> D e A -> C -> D (D depende de B e C; B e C dependem de A)
+        for task, depends_on in ((self.b, self.a), (self.c, self.a), (self.d, self.b), (self.d, self.c)):
+            graph.add_dependency(task, depends_on)
+
+    def add_task(self, name, end_date):
+        return Task.objects.create(
+            project=self.project, owner=self.user, name=name, description='', start_date='2026-01-01', end_date=end_date,
+        )
+
+    def test_transitive_blockers_and_downstream(self):
+        self.assertEqual(set(graph.blockers(self.d)), {self.a, self.b, self.c})
+        self.assertEqual(set(graph.downstream(self.a)), {self.b, self.c, self.d})
+        self.assertEqual(list(graph.blockers(self.a)), [])
+
+    def test_cycles_duplicates_and_other_projects_are_refused(self):
+        for task, depends_on in ((self.a, self.d), (self.a, self.a), (self.d, self.b)):
+            with self.subTest(task=task.name, depends_on=depends_on.name), self.assertRaises(ValidationError):
+                graph.add_dependency(task, depends_on)
+        with self.assertRaises(ValidationError):
+            graph.add_dependency(self.a, make_task(self.user, name='Outro projeto'))
+        self.assertEqual(TaskDependency.objects.count(), 4)
+
+    def test_levels_and_critical_path(self):
+        levels = dict(graph.topological_levels(self.project.pk))
+        self.assertEqual(levels, {self.a.pk: 0, self.b.pk: 1, self.c.pk: 1, self.d.pk: 2})
+        # D é o último prazo; B (20/01) termina depois de C (15/01) e segura o início de D
+        self.assertEqual(graph.critical_path(self.project.pk), [self.a, self.b, self.d])
+
+    def test_dependency_views(self):
+        self.client.force_login(self.user)
+        self.client.post(reverse('task-dependency-remove', args=[self.d.pk, self.b.pk]))
+        self.client.post(reverse('task-dependency-add', args=[self.c.pk]), {'depends_on': f'#{self.b.pk}'})
+        self.assertEqual(set(graph.blockers(self.c)), {self.a, self.b})
+        self.assertFalse(TaskDependency.objects.filter(task=self.d, depends_on=self.b).exists())
+        response = self.client.get(reverse('project-critical-path', args=[self.project.pk]))
+        self.assertEqual(response.context['path'], [self.a, self.b, self.c, self.d])
+
+
+class LabelFacetTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('dono@example.com', 'Dono', 'senha-123', cpf='1')
+        first = make_task(self.user, name='T0')
+        self.project = first.project
+        self.infra = Label.objects.create(project=self.project, name='infra')
+        self.bug = Label.objects.create(project=self.project, name='bug')
+        # T0: infra+bug (alta); T1: infra (concluída); T2: bug; T3: nenhuma
+        tasks = [first] + [
+            Task.objects.create(project=self.project, owner=self.user, name=f'T{n}', description='Descrição', start_date='2026-01-01')
+            for n in range(1, 4)
+        ]
+        Task.objects.filter(pk=first.pk).update(priority=TaskPriority.HIGH)
+        Task.objects.filter(pk=tasks[1].pk).update(status=TaskStatus.COMPLETED)
+        tasks[0].labels.add(self.infra, self.bug)
+        tasks[1].labels.add(self.infra)
+        tasks[2].labels.add(self.bug)
+        self.client.force_login(self.user)
+
+    def facets(self, query=''):
+        return self.client.get(reverse('task-list-by-project', args=[self.project.pk]) + query).context
+
+    def test_counts_without_filters(self):
+        context = self.facets()
+        self.assertEqual(context['task_total'], 4)
+        self.assertEqual({facet['label']: facet['count'] for facet in context['label_facets']}, {'infra': 2, 'bug': 2})
+        self.assertEqual({facet['value']: facet['count'] for facet in context['status_facets']}[TaskStatus.COMPLETED], 1)
+
+    def test_labels_are_intersected_and_facets_ignore_their_own_filter(self):
+        context = self.facets(f'?label={self.infra.pk}&label={self.bug.pk}')
+        self.assertEqual([task.name for task in context['tasks']], ['T0'])
+        context = self.facets(f'?label={self.infra.pk}&status={TaskStatus.COMPLETED}')
+        self.assertEqual([task.name for task in context['tasks']], ['T1'])
+        statuses = {facet['value']: facet['count'] for facet in context['status_facets']}
+        self.assertEqual((statuses[TaskStatus.IN_PROGRESS], statuses[TaskStatus.COMPLETED]), (1, 1))
+        self.assertEqual({facet['label']: facet['count'] for facet in context['label_facets']}, {'infra': 1})
+        self.assertTrue(context['has_filters'])
+
+    def test_form_reuses_labels_case_insensitively(self):
+        task = Task.objects.get(name='T3')
+        form = TaskForm(edit_data(task, labels_text='Infra, novo ,  novo, NOVO'), instance=task, project=self.project)
+        self.assertTrue(form.is_valid(), form.errors)
+        form.save()
+        self.assertEqual(sorted(task.labels.values_list('name', flat=True)), ['infra', 'novo'])
+        self.assertEqual(Label.objects.filter(project=self.project).count(), 3)
+
+        form = TaskForm(edit_data(task, labels_text='x' * 51), instance=task, project=self.project)
+        self.assertIn('labels_text', form.errors)
+
+
+class InboxTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('dono@example.com', 'Dono', 'senha-123', cpf='1')
+        self.task = make_task(self.user, name='Sem prazo', assigned_to=self.user)
+        self.project = self.task.project
+        self.late = self.add_task('Atrasada', end_date=datetime.date(2026, 1, 5))
+        self.urgent = self.add_task('Urgente', end_date=datetime.date(2026, 1, 10), priority=TaskPriority.HIGH)
+        self.later = self.add_task('Depois', end_date=datetime.date(2026, 1, 10))
+        self.client.force_login(self.user)
+
+    def add_task(self, name, **fields):
+        return Task.objects.create(
+            project=self.project, owner=self.user, assigned_to=self.user, name=name, description='', start_date='2026-01-01', **fields,
+        )
+
+    def page(self):
+        return [item.task_name for item in self.client.get(reverse('task-inbox')).context['items']]
+
+    def test_page_is_ordered_by_due_date_then_priority(self):
+        self.assertEqual(self.page(), ['Atrasada', 'Urgente', 'Depois', 'Sem prazo'])
+
+    def test_saves_and_project_renames_keep_the_inbox_in_sync(self):
+        self.late.status = TaskStatus.COMPLETED
+        self.late.save()
+        self.later.assigned_to = None
+        self.later.save()
+        self.project.name = 'Renomeado'
+        self.project.save()
+        self.urgent.delete()
+        self.assertEqual(self.page(), ['Sem prazo'])
+        self.assertEqual(InboxItem.objects.get().project_name, 'Renomeado')
+
+    def test_rebuild_in_batches_matches_incremental_sync(self):
+        Task.objects.filter(pk=self.later.pk).update(priority=TaskPriority.HIGH)  # .update() não dispara o sinal
+        inbox.sync_inbox([self.later.pk])
+        expected = list(InboxItem.objects.order_by('task_id').values())
+        InboxItem.objects.all().delete()
+        batches = []
+        self.assertEqual(inbox.rebuild_inbox(batch_size=2, progress=lambda last, total: batches.append(total)), 4)
+        self.assertEqual(batches[-1], 4)
+        self.assertGreater(len(batches), 1)
+        self.assertEqual(list(InboxItem.objects.order_by('task_id').values()), expected)
+
+
+class DueReminderTests(TestCase):
+    today = datetime.date(2026, 3, 10)
+
+    def setUp(self):
+        self.user = User.objects.create_user('dono@example.com', 'Dono', 'senha-123', cpf='1')
+        self.other = User.objects.create_user('outro@example.com', 'Outro', 'senha-123', cpf='2')
+        self.late = make_task(self.user, assigned_to=self.user, name='Atrasada', end_date=datetime.date(2026, 3, 1))
+        self.soon = Task.objects.create(
+            project=self.late.project, owner=self.user, assigned_to=self.user, name='Próxima', description='',
+            start_date='2026-01-01', end_date=datetime.date(2026, 3, 11),
+        )
+
+    def scan(self, **kwargs):
+        return scan_due_tasks(today=self.today, due_soon_days=2, **kwargs)
+
+    def test_digest_lists_overdue_and_due_soon(self):
+        stats = self.scan()
+        self.assertEqual((stats['overdue'], stats['due_soon'], stats['digests_sent']), (1, 1, 1))
+        self.assertEqual(mail.outbox[0].to, ['dono@example.com'])
+        self.assertIn('Tarefas atrasadas (1):', mail.outbox[0].body)
+        self.assertIn('Próxima', mail.outbox[0].body)
+
+    def test_repeated_scan_only_sends_what_was_not_reminded_today(self):
+        self.scan()
+        self.assertEqual(self.scan()['digests_sent'], 0)
+        self.soon.assigned_to = self.other
+        self.soon.save()
+
+        stats = self.scan()
+        self.assertEqual((stats['scanned'], stats['digests_sent']), (1, 1))
+        self.assertEqual(mail.outbox[-1].to, ['outro@example.com'])
+        # no dia seguinte o resumo volta a listar tudo
+        self.today += datetime.timedelta(days=1)
+        self.assertEqual(self.scan()['scanned'], 2)
+
+    def test_dry_run_does_not_mark(self):
+        self.assertEqual(self.scan(dry_run=True)['scanned'], 2)
+        self.assertFalse(TaskReminder.objects.exists())
+        self.assertEqual(mail.outbox, [])
+
+    def test_failed_delivery_is_not_marked(self):
+        self.soon.assigned_to = self.other
+        self.soon.save()
+        send_messages = mail.get_connection().__class__.send_messages
+
+        def refuse_owner(backend, messages):
+            if messages[0].to == ['dono@example.com']:
+                raise SMTPException('recusado')
+            return send_messages(backend, messages)
+
+        with mock.patch('django.core.mail.backends.locmem.EmailBackend.send_messages', refuse_owner), self.assertLogs('tasks.reminders', 'ERROR'):
+            self.assertEqual(self.scan()['digests_sent'], 1)
+        self.assertEqual(list(TaskReminder.objects.values_list('task_id', flat=True)), [self.soon.pk])
+        # a tarefa não entregue volta na próxima varredura
+        stats = self.scan()
+        self.assertEqual((stats['scanned'], stats['digests_sent']), (1, 1))
+        self.assertEqual(mail.outbox[-1].to, ['dono@example.com'])
+
+
+class TaskGridTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('dono@example.com', 'Dono', 'senha-123', cpf='1')
+        self.task = make_task(self.user, name='Alfa', status=TaskStatus.COMPLETED)
+        for name in ('Beta', 'Gama'):
+            Task.objects.create(project=self.task.project, owner=self.user, name=name, description='', start_date='2026-01-01')
+        make_task(User.objects.create_user('outro@example.com', 'Outro', 'senha-123', cpf='2'), name='Alheia')
+        self.client.force_login(self.user)
+
+    def rows(self, params):
+        return self.client.post(reverse('task-grid-rows'), json.dumps(params), content_type='application/json')
+
+    def test_block_with_filter_and_sort(self):
+        data = self.rows({'startRow': 0, 'endRow': 2, 'sortModel': [{'colId': 'name', 'sort': 'desc'}]}).json()
+        self.assertEqual(([row['name'] for row in data['rows']], data['lastRow']), (['Gama', 'Beta'], -1))
+        data = self.rows({'filterModel': {'status': {'type': 'equals', 'filter': 'concluído'}}}).json()
+        self.assertEqual(([row['name'] for row in data['rows']], data['lastRow']), (['Alfa'], 1))
+
+    def test_group_rows_count_children(self):
+        data = self.rows({'rowGroupCols': [{'id': 'status'}]}).json()
+        self.assertEqual({row['key']: row['childCount'] for row in data['rows']}, {
+            TaskStatus.COMPLETED: 1, TaskStatus.IN_PROGRESS: 2,
+        })
+
+    def test_malformed_requests_are_400(self):
+        for body in ('{', '[]', {'startRow': 'x'}, {'sortModel': {}}, {'sortModel': ['name']}, {'filterModel': {'name': 'a'}},
+                     {'filterModel': {'foo': {}}}, {'rowGroupCols': [{'id': ['status']}]}, {'afterId': 'x'}):
+            with self.subTest(body=body):
+                response = self.client.post(
+                    reverse('task-grid-rows'), body if isinstance(body, str) else json.dumps(body), content_type='application/json',
+                )
+                self.assertEqual(response.status_code, 400)
+                self.assertIn('error', response.json())
+
+
+class VersionedSaveTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('dono@example.com', 'Dono', 'senha-123', cpf='1')
+        self.task = make_task(self.user)
+
+    def test_save_bumps_version(self):
+        self.task.name = 'Outro nome'
+        self.task.save()
+        self.assertEqual(self.task.version, 2)
+        self.assertEqual(Task.objects.get(pk=self.task.pk).version, 2)
+
+    def test_stale_save_raises_and_keeps_row(self):
+        stale = Task.objects.get(pk=self.task.pk)
+        self.task.name = 'Primeiro'
+        self.task.save(update_fields=['name'])
+
+        stale.name = 'Segundo'
+        with self.assertRaises(EditConflict):
+            stale.save(update_fields=['name'])
+        self.assertEqual(stale.version, 1)
+        self.assertEqual(Task.objects.get(pk=self.task.pk).name, 'Primeiro')
+
+    def test_update_fields_writes_only_those_columns(self):
+        self.task.status = TaskStatus.COMPLETED
+        with CaptureQueriesContext(connection) as queries:
+            self.task.save(update_fields=['status'])
+        update = next(query['sql'] for query in queries.captured_queries if query['sql'].startswith('UPDATE'))
+        self.assertIn('"status"', update)
+        self.assertIn('"version"', update)
+        self.assertNotIn('"description"', update)
+        self.assertNotIn('"name"', update)
+
+
+@override_settings(RATE_LIMIT_ENABLED=False)
+class TaskEditConflictTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('dono@example.com', 'Dono', 'senha-123', cpf='1')
+        self.task = make_task(self.user)
+        self.url = reverse('task-update', args=[self.task.pk])
+        self.client.force_login(self.user)
+
+    def test_edits_to_different_fields_are_merged(self):
+        first = edit_data(self.task, name='Nome novo')
+        second = edit_data(self.task, status=TaskStatus.CANCELED)
+
+        self.assertEqual(self.client.post(self.url, first).status_code, 302)
+        self.assertEqual(self.client.post(self.url, second).status_code, 302)
+
+        task = Task.objects.get(pk=self.task.pk)
+        self.assertEqual((task.name, task.status, task.version), ('Nome novo', TaskStatus.CANCELED, 3))
+
+    def test_same_field_conflict_returns_409(self):
+        first = edit_data(self.task, name='Nome A')
+        second = edit_data(self.task, name='Nome B')
+        self.client.post(self.url, first)
+
+        response = self.client.post(self.url, second)
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual([item['name'] for item in response.context['conflict']], ['name'])
+        self.assertEqual(Task.objects.get(pk=self.task.pk).name, 'Nome A')
+
+        # o formulário devolvido já está sobre a versão atual: reenviar mantém o valor do usuário
+        form = response.context['form']
+        rebased = {key: value for key, value in form.data.items()}
+        self.assertEqual(self.client.post(self.url, rebased).status_code, 302)
+        self.assertEqual(Task.objects.get(pk=self.task.pk).name, 'Nome B')
+
+    def test_conflict_as_json(self):
+        self.client.post(self.url, edit_data(self.task, description='A'))
+        response = self.client.post(self.url, edit_data(self.task, description='B'), HTTP_ACCEPT='application/json')
+        self.assertEqual(response.status_code, 409)
+        body = response.json()
+        self.assertEqual(body['version'], 2)
+        self.assertEqual(body['fields']['description'], {'label': 'Description', 'mine': 'B', 'current': 'A'})
+
+    def test_status_change_keeps_concurrent_edit(self):
+        stale = edit_data(self.task)
+        Task.objects.filter(pk=self.task.pk).update(description='editada por outra pessoa')
+        self.client.post(reverse('task-complete', args=[self.task.pk]))
+
+        task = Task.objects.get(pk=self.task.pk)
+        self.assertEqual((task.status, task.description), (TaskStatus.COMPLETED, 'editada por outra pessoa'))
+        self.assertEqual(self.client.post(self.url, stale).status_code, 302)  # nada mudado por este usuário
+        self.assertEqual(Task.objects.get(pk=self.task.pk).status, TaskStatus.COMPLETED)
+
+
+class ConcurrentEditStressTests(TransactionTestCase):
+    """Várias threads fazendo ler-alterar-gravar na mesma tarefa: nenhuma escrita pode se perder."""
+    threads = 8
+    edits_per_thread = 25
+
+    def test_no_lost_updates(self):
+        user = User.objects.create_user('dono@example.com', 'Dono', 'senha-123', cpf='1')
+        task = make_task(user)
+        conflicts = []
+        errors = []
+
+        def worker(number):
+            try:
+                for edit in range(self.edits_per_thread):
+                    while True:
+                        try:
+                            current = Task.objects.get(pk=task.pk)
+                            current.description += f'[{number}:{edit}]'
+                            current.save(update_fields=['description'])
+                            break
+                        except EditConflict:
+                            conflicts.append(number)
+                        except OperationalError:
+                            pass  # banco de teste em memória compartilhada: "table is locked" em vez de esperar
+            except Exception as error:  # pragma: no cover - aparece na asserção abaixo
+                errors.append(error)
+            finally:
+                close_old_connections()
+                connection.close()
+
+        workers = [threading.Thread(target=worker, args=(number,)) for number in range(self.threads)]
+        for thread in workers:
+            thread.start()
+        for thread in workers:
+            thread.join()
+
+        self.assertEqual(errors, [])
+        task.refresh_from_db()
+        expected = {f'[{number}:{edit}]' for number in range(self.threads) for edit in range(self.edits_per_thread)}
+        self.assertEqual({token for token in expected if token in task.description}, expected)
+        self.assertEqual(task.version, 1 + self.threads * self.edits_per_thread)
+
+
+class RecurrenceOccurrencesTests(TestCase):
+    """Datas calculadas pela regra, sem banco."""
+
+    def rule(self, frequency, starts_on, **fields):
+        return RecurrenceRule(frequency=frequency, starts_on=starts_on, **fields)
+
+    def dates(self, rule, start, end):
+        return [day.isoformat() for day in recurrence.occurrences(rule, start, end)]
+
+    def test_daily_interval_starts_mid_window(self):
+        rule = self.rule(RecurrenceFrequency.DAILY, datetime.date(2026, 1, 1), interval=3)
+        self.assertEqual(
+            self.dates(rule, datetime.date(2026, 1, 5), datetime.date(2026, 1, 14)),
+            ['2026-01-07', '2026-01-10', '2026-01-13'],
+        )
+
+    def test_weekly_on_chosen_weekdays_every_other_week(self):
+        # 2026-01-05 é uma segunda; segundas e quartas, semana sim semana não
+        rule = self.rule(RecurrenceFrequency.WEEKLY, datetime.date(2026, 1, 5), interval=2, weekdays=0b101)
+        self.assertEqual(
+            self.dates(rule, datetime.date(2026, 1, 1), datetime.date(2026, 1, 31)),
+            ['2026-01-05', '2026-01-07', '2026-01-19', '2026-01-21'],
+        )
+
+    def test_monthly_clamps_to_month_end_and_stops_at_until(self):
+        rule = self.rule(RecurrenceFrequency.MONTHLY, datetime.date(2026, 1, 31), until=datetime.date(2026, 4, 15))
+        self.assertEqual(
+            self.dates(rule, datetime.date(2025, 1, 1), datetime.date(2027, 1, 1)),
+            ['2026-01-31', '2026-02-28', '2026-03-31'],
+        )
+
+
+@override_settings(RATE_LIMIT_ENABLED=False, TASK_RECURRENCE_HORIZON_DAYS=7)
+class RecurrenceMaterializationTests(TestCase):
+    today = datetime.date(2026, 3, 2)
+
+    def setUp(self):
+        self.user = User.objects.create_user('dono@example.com', 'Dono', 'senha-123', cpf='1')
+        self.template = make_task(self.user, assigned_to=self.user)
+        Task.objects.filter(pk=self.template.pk).update(start_date=self.today, end_date=self.today + datetime.timedelta(days=1))
+        self.template.refresh_from_db()
+        label = Label.objects.create(project=self.template.project, name='rotina')
+        self.template.labels.add(label)
+        self.rule = recurrence.save_rule(
+            RecurrenceRule(template=self.template, frequency=RecurrenceFrequency.DAILY, starts_on=self.today), today=self.today,
+        )
+
+    def occurrences(self):
+        return Task.objects.filter(recurrence=self.rule).exclude(pk=self.template.pk).order_by('occurrence_date')
+
+    def test_save_rule_materializes_horizon_as_copies_of_template(self):
+        tasks = list(self.occurrences())
+        self.assertEqual([task.occurrence_date for task in tasks], [self.today + datetime.timedelta(days=n) for n in range(1, 8)])
+        first = tasks[0]
+        self.assertEqual((first.name, first.start_date, first.end_date), (self.template.name, first.occurrence_date, first.occurrence_date + datetime.timedelta(days=1)))
+        self.assertEqual(list(first.labels.values_list('name', flat=True)), ['rotina'])
+        self.assertTrue(InboxItem.objects.filter(task=first).exists())
+        self.assertEqual(self.rule.next_occurrence, self.today + datetime.timedelta(days=8))
+
+    def test_job_advances_cursor_without_duplicates(self):
+        tomorrow = self.today + datetime.timedelta(days=1)
+        self.assertEqual(recurrence.materialize_due(today=self.today), {'rules': 0, 'created': 0})
+        self.assertEqual(recurrence.materialize_due(today=tomorrow), {'rules': 1, 'created': 1})
+        self.assertEqual(self.occurrences().count(), 8)
+
+    def test_open_future_occurrence_then_job_skips_it(self):
+        day = self.today + datetime.timedelta(days=9)
+        self.client.force_login(self.user)
+        response = self.client.post(reverse('task-occurrence', args=[self.template.pk, day.isoformat()]))
+        task = Task.objects.get(recurrence=self.rule, occurrence_date=day)
+        self.assertRedirects(response, reverse('task-detail', args=[task.pk]), fetch_redirect_response=False)
+
+        stats = recurrence.materialize_due(today=self.today + datetime.timedelta(days=3))
+        self.assertEqual(stats['created'], 2)  # dias 8 e 10; o 9 já existia
+        self.assertEqual(Task.objects.filter(recurrence=self.rule, occurrence_date=day).count(), 1)
+
+    def test_until_exhausts_rule(self):
+        RecurrenceRule.objects.filter(pk=self.rule.pk).update(until=self.today + datetime.timedelta(days=10))
+        self.rule.refresh_from_db()
+        recurrence.materialize_rules([self.rule], self.today + datetime.timedelta(days=20))
+        self.assertEqual(self.rule.next_occurrence, RecurrenceRule.EXHAUSTED)
+        self.assertEqual(self.occurrences().last().occurrence_date, self.today + datetime.timedelta(days=10))
+
+    def test_template_is_never_archived(self):
+        Task.objects.filter(pk=self.template.pk).update(status=TaskStatus.COMPLETED, end_date=datetime.date(2020, 1, 1))
+        self.assertFalse(archivable_tasks(90).filter(pk=self.template.pk).exists())
+
+
+@override_settings(RATE_LIMIT_ENABLED=False)
+class TimeTrackingTests(TestCase):
+    day = datetime.date(2026, 3, 2)  # segunda-feira
+
+    def setUp(self):
+        self.user = User.objects.create_user('dono@example.com', 'Dono', 'senha-123', cpf='1')
+        self.task = make_task(self.user)
+
+    def rollups(self):
+        return dict(DailyRollup.objects.filter(project=self.task.project).values_list('day', 'seconds'))
+
+    def test_timer_stop_adds_elapsed_time_to_rollup(self):
+        started = timezone.make_aware(datetime.datetime(2026, 3, 2, 9, 0))
+        entry = timetracking.start_timer(self.task, self.user, now=started)
+        self.assertTrue(entry.running)
+        # iniciar outro cronômetro para o que estava correndo
+        timetracking.start_timer(self.task, self.user, now=started + datetime.timedelta(minutes=30))
+        timetracking.stop_timer(self.user, now=started + datetime.timedelta(minutes=45))
+        self.assertIsNone(timetracking.stop_timer(self.user))
+        self.assertEqual(self.rollups(), {self.day: 45 * 60})
+
+    def test_entry_changes_apply_deltas(self):
+        entry = timetracking.add_entry(self.task, self.user, self.day, 3600)
+        timetracking.add_entry(self.task, self.user, self.day, 1800)
+        next_day = self.day + datetime.timedelta(days=1)
+        timetracking.update_entry(entry, next_day, 7200)
+        self.assertEqual(self.rollups(), {self.day: 1800, next_day: 7200})
+
+        stale = TimeEntry.objects.get(pk=entry.pk)
+        timetracking.update_entry(entry, next_day, 600)
+        with self.assertRaises(EditConflict):
+            timetracking.update_entry(stale, self.day, 60)
+        timetracking.delete_entry(entry)
+        self.assertEqual(self.rollups(), {self.day: 1800, next_day: 0})
+
+    def test_weekly_report_and_rebuild_match(self):
+        for offset, seconds in ((0, 3600), (6, 1800), (7, 900)):
+            timetracking.add_entry(self.task, self.user, self.day + datetime.timedelta(days=offset), seconds)
+        report = timetracking.hours_report(self.day, self.day + datetime.timedelta(days=13), 'week', user=self.user)
+        project_id = self.task.project_id
+        self.assertEqual(report, {(self.day, project_id): 5400, (self.day + datetime.timedelta(weeks=1), project_id): 900})
+
+        before = self.rollups()
+        DailyRollup.objects.all().delete()
+        self.assertEqual(timetracking.rebuild_project(project_id, 'default'), 3)
+        self.assertEqual(self.rollups(), before)
+
+    def test_manual_entry_view_and_reports(self):
+        self.client.force_login(self.user)
+        response = self.client.post(reverse('time-entry-add', args=[self.task.pk]), {
+            'day': timezone.localdate().isoformat(), 'hours': '1.5', 'note': 'revisão',
+        })
+        self.assertRedirects(response, reverse('task-detail', args=[self.task.pk]), fetch_redirect_response=False)
+        self.assertEqual(TimeEntry.objects.get().seconds, 5400)
+
+        response = self.client.get(reverse('time-report'))
+        self.assertEqual(response.context['grand_total'], 1.5)
+        self.assertEqual([row['label'] for row in response.context['rows']], ['Projeto'])
+        response = self.client.get(reverse('project-time-report', args=[self.task.project_id]), {'period': 'month'})
+        self.assertEqual([row['label'] for row in response.context['rows']], ['Dono'])
+
+
+    def test_rebuild_command_retries_a_locked_project(self):
+        timetracking.add_entry(self.task, self.user, self.day, 3600)
+        DailyRollup.objects.all().delete()
+        rebuild = timetracking.rebuild_project
+        calls = []
+
+        def locked_once(project_id, using):
+            calls.append(project_id)
+            if len(calls) == 1:
+                raise OperationalError('database is locked')
+            return rebuild(project_id, using)
+
+        with mock.patch.object(rebuild_time_rollups, 'rebuild_project', locked_once), \
+                mock.patch.object(rebuild_time_rollups.time, 'sleep'), mock.patch.object(rebuild_time_rollups, 'connections'):
+            # direto, sem a thread do comando: a transação do TestCase travaria a conexão dela
+            self.assertEqual(rebuild_time_rollups._rebuild('default', self.task.project_id), 1)
+        self.assertEqual(calls, [self.task.project_id] * 2)
+        self.assertEqual(self.rollups(), {self.day: 3600})
+
+
+class ChangeFeedTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('dono@example.com', 'Dono', 'senha-123', cpf='1')
+        self.member = User.objects.create_user('membro@example.com', 'Membro', 'senha-123', cpf='2')
+        self.task = make_task(self.user)
+        self.project = self.task.project
+        self.project.participants.add(self.member)
+
+    def read_all(self, user, cursor=None, **kwargs):
+        entries, cursor, more = changes.feed(user, cursor, **kwargs)
+        while more:
+            page, cursor, more = changes.feed(user, cursor, **kwargs)
+            entries += page
+        return entries, cursor
+
+    def test_only_changes_after_cursor_in_bounded_batches(self):
+        Task.objects.bulk_create([Task(project=self.project, owner=self.user, name=f'T{n}', description='', start_date='2026-01-01') for n in range(5)])
+        entries, cursor = self.read_all(self.user, limit=2)
+        self.assertEqual(len([entry for entry in entries if entry['type'] == 'task']), 6)
+
+        # .update() não passa por signals, mas entra no feed
+        Task.objects.filter(pk=self.task.pk).update(name='Renomeada')
+        entries, cursor = self.read_all(self.user, cursor)
+        self.assertEqual([(entry['type'], entry['id'], entry['data']['name']) for entry in entries], [('task', self.task.pk, 'Renomeada')])
+        self.assertEqual(changes.feed(self.user, cursor)[0], [])
+
+    def test_scan_and_merge_return_the_same_changes(self):
+        Task.objects.create(project=make_task(self.user).project, owner=self.user, name='Outro projeto', description='', start_date='2026-01-01')
+        self.project.participants.remove(self.member)
+        merged, merged_cursor = self.read_all(self.user, limit=2)
+        with mock.patch.object(changes, 'MERGE_MAX_PROJECTS', 0):
+            scanned, scanned_cursor = self.read_all(self.user, limit=2)
+        self.assertEqual((scanned, scanned_cursor), (merged, merged_cursor))
+
+    def test_deleted_and_archived_tasks_become_tombstones(self):
+        _, cursor = self.read_all(self.user)
+        other = Task.objects.create(project=self.project, owner=self.user, name='Outra', description='', start_date='2026-01-01')
+        other_id = other.pk
+        other.delete()
+        Task.objects.filter(pk=self.task.pk).update(status=TaskStatus.COMPLETED, end_date=datetime.date(2020, 1, 1))
+        archive_finished_tasks(90)
+
+        entries, _ = self.read_all(self.user, cursor)
+        self.assertEqual(
+            sorted((entry['id'], entry.get('deleted')) for entry in entries),
+            [(self.task.pk, True), (other_id, True)],
+        )
+
+    def test_leaving_participants_revokes_only_for_that_user(self):
+        _, owner_cursor = self.read_all(self.user)
+        _, member_cursor = self.read_all(self.member)
+        self.project.participants.remove(self.member)
+        Task.objects.filter(pk=self.task.pk).update(name='Depois da saída')
+
+        entries, _ = self.read_all(self.member, member_cursor)
+        self.assertEqual(entries, [{'type': 'access', 'id': self.project.pk, 'project': self.project.pk, 'deleted': True}])
+        entries, _ = self.read_all(self.user, owner_cursor)
+        self.assertEqual([entry['type'] for entry in entries], ['task'])
+
+    @override_settings(RATE_LIMIT_ENABLED=False)
+    def test_feed_view_rejects_bad_cursor(self):
+        self.client.force_login(self.member)
+        response = self.client.get(reverse('task-changes'), {'project': self.project.pk, 'limit': 10})
+        self.assertEqual({entry['type'] for entry in response.json()['changes']}, {'access', 'project', 'task'})
+        self.assertEqual(self.client.get(reverse('task-changes'), {'cursor': 'abc'}).status_code, 400)
+
+    def test_missing_triggers_are_reported(self):
+        self.assertEqual(check_changelog_triggers(databases=['default']), [])
+        with connection.cursor() as cursor:
+            cursor.execute('DROP TRIGGER "changelog_task_update"')  # o que um AlterField faria no SQLite
+        warnings = check_changelog_triggers(databases=['default'])
+        self.assertEqual([warning.id for warning in warnings], ['tasks.W001'])
+        self.assertIn('changelog_task_update', warnings[0].msg)
+
+
+@override_settings(RATE_LIMIT_ENABLED=False)
+class InlineStatusUpdateTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('dono@example.com', 'Dono', 'senha-123', cpf='1')
+        self.task = make_task(self.user)
+        self.client.force_login(self.user)
+
+    def post_inline(self, name, client=None, **extra):
+        return (client or self.client).post(
+            reverse(name, args=[self.task.pk]), HTTP_X_REQUESTED_WITH='XMLHttpRequest', **extra,
+        )
+
+    def test_inline_post_returns_only_the_card(self):
+        # tarefa, sessão, usuário; UPDATE versionado e caixa de entrada (com 2 savepoints);
+        # etiquetas, responsável e projeto do cartão; histórico
+        with self.assertNumQueries(14):
+            response = self.post_inline('task-complete')
+        self.assertEqual(response.status_code, 200)
+        self.assertTemplateUsed(response, 'tasks/_task_card.html')
+        self.assertNotContains(response, '<html')
+        self.assertContains(response, f'data-task-card="{self.task.pk}"')
+        self.assertNotContains(response, reverse('task-complete', args=[self.task.pk]))
+        self.assertEqual(Task.objects.get(pk=self.task.pk).status, TaskStatus.COMPLETED)
+
+    def test_post_without_javascript_still_redirects(self):
+        response = self.client.post(reverse('task-cancel', args=[self.task.pk]))
+        self.assertRedirects(response, reverse('task-list'), fetch_redirect_response=False)
+        self.assertEqual(Task.objects.get(pk=self.task.pk).status, TaskStatus.CANCELED)
+
+    def test_inline_reopen_restores_archived_task(self):
+        Task.objects.filter(pk=self.task.pk).update(status=TaskStatus.COMPLETED, end_date=datetime.date(2020, 1, 1))
+        archive_finished_tasks(90)
+        response = self.post_inline('task-reopen')
+        self.assertContains(response, f'data-task-card="{self.task.pk}"')
+        self.assertEqual(Task.objects.get(pk=self.task.pk).status, TaskStatus.IN_PROGRESS)
+
+    def test_inline_post_requires_csrf_token(self):
+        client = self.client_class(enforce_csrf_checks=True)
+        client.force_login(self.user)
+        self.assertEqual(self.post_inline('task-complete', client).status_code, 403)
+        self.assertEqual(Task.objects.get(pk=self.task.pk).status, TaskStatus.IN_PROGRESS)
+
+    def test_repeated_conflicts_answer_409_with_the_current_task(self):
+        with mock.patch.object(Task, 'save', side_effect=EditConflict()):
+            response = self.post_inline('task-complete')
+            self.assertEqual(response.status_code, 409)
+            self.assertTemplateUsed(response, 'tasks/_task_card.html')
+            self.assertContains(response, 'Status: Em andamento', status_code=409)
+
+            response = self.client.post(reverse('task-complete', args=[self.task.pk]))
+            self.assertEqual(response.status_code, 409)
+            self.assertContains(response, 'Outra pessoa alterou este registro', status_code=409)
+        self.assertEqual(Task.objects.get(pk=self.task.pk).status, TaskStatus.IN_PROGRESS)
@@ -0,0 +1,148 @@
+"""Apontamento de horas: cronômetros, lançamentos manuais e totais diários.
+
+Cada mudança num TimeEntry soma a diferença de segundos na linha de
+DailyRollup de (projeto, usuário, dia) com um upsert
+(`INSERT ... ON CONFLICT DO UPDATE SET seconds = seconds + excluded.seconds`),
+na mesma transação do lançamento. Os relatórios somam só essas linhas.
+
+Quem altera lançamentos deve passar pelas funções deste módulo; se os totais
+se perderem (SQL direto, restauração de backup), o comando
+`rebuild_time_rollups` os recalcula a partir dos lançamentos, um projeto por
+vez em várias threads.
+"""
+from collections import defaultdict
+
+from django.db import connections, transaction
+from django.db.models import Sum
+from django.db.models.functions import TruncMonth, TruncWeek
+from django.utils import timezone
+
+from core.sharding import db_for, read_aliases
+from core.versioning import EditConflict
+from .models import DailyRollup, TimeEntry
+
+PERIODS = {'week': TruncWeek, 'month': TruncMonth}
+
+
+def _apply(deltas, using):
+    """Soma `deltas` {(project_id, user_id, day): segundos} nos totais diários."""
+    deltas = {key: seconds for key, seconds in deltas.items() if seconds}
+    if not deltas:
+        return
+    connection = connections[using]
+    qn = connection.ops.quote_name
+    table = qn(DailyRollup._meta.db_table)
+    values = ', '.join(['(%s, %s, %s, %s)'] * len(deltas))
+    sql = (
+        f'INSERT INTO {table} (project_id, user_id, day, seconds) VALUES {values}'
+        f' ON CONFLICT (project_id, user_id, day) DO UPDATE SET seconds = {table}.seconds + excluded.seconds'
+    )
+    params = []
+    for (project_id, user_id, day), seconds in deltas.items():
+        params += [project_id, user_id, connection.ops.adapt_datefield_value(day), seconds]
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+
+
+def running_timer(user, using=None):
+    return TimeEntry.objects.using(using or db_for(TimeEntry)).filter(user=user, seconds__isnull=True).first()
+
+
+def stop_timer(user, now=None, using=None):
+    """Para o cronômetro do usuário (se houver) e lança o tempo. Retorna o lançamento ou None."""
+    using = using or db_for(TimeEntry)
+    now = now or timezone.now()
+    entry = running_timer(user, using)
+    if entry is None:
+        return None
+    seconds = max(int((now - entry.started_at).total_seconds()), 0)
+    with transaction.atomic(using=using):
+        # condicional: duas paradas simultâneas não lançam o tempo duas vezes
+        if not TimeEntry.objects.using(using).filter(pk=entry.pk, seconds__isnull=True).update(ended_at=now, seconds=seconds):
+            return None
+        _apply({(entry.project_id, entry.user_id, entry.day): seconds}, using)
+    entry.ended_at, entry.seconds = now, seconds
+    return entry
+
+
+def start_timer(task, user, now=None):
+    """Inicia um cronômetro na tarefa, parando antes o que o usuário tiver correndo."""
+    using = db_for(TimeEntry)
+    now = now or timezone.now()
+    with transaction.atomic(using=using):
+        stop_timer(user, now, using)
+        return TimeEntry.objects.using(using).create(
+            task_id=task.pk, project_id=task.project_id, user=user,
+            day=timezone.localdate(now), started_at=now,
+        )
+
+
+def add_entry(task, user, day, seconds, note=''):
+    using = db_for(TimeEntry)
+    with transaction.atomic(using=using):
+        entry = TimeEntry.objects.using(using).create(
+            task_id=task.pk, project_id=task.project_id, user=user, day=day, seconds=seconds, note=note,
+        )
+        _apply({(entry.project_id, entry.user_id, day): seconds}, using)
+    return entry
+
+
+def update_entry(entry, day, seconds, note=''):
+    """Corrige um lançamento encerrado: tira o tempo antigo do dia antigo e soma o novo."""
+    using = db_for(TimeEntry)
+    with transaction.atomic(using=using):
+        # compara com o que foi lido: se outra edição passou antes, os totais seriam corrigidos com o valor errado
+        changed = TimeEntry.objects.using(using).filter(pk=entry.pk, day=entry.day, seconds=entry.seconds).update(
+            day=day, seconds=seconds, note=note,
+        )
+        if not changed:
+            raise EditConflict(entry)
+        deltas = defaultdict(int)
+        deltas[entry.project_id, entry.user_id, entry.day] -= entry.seconds
+        deltas[entry.project_id, entry.user_id, day] += seconds
+        _apply(deltas, using)
+    entry.day, entry.seconds, entry.note = day, seconds, note
+    return entry
+
+
+def delete_entry(entry):
+    using = db_for(TimeEntry)
+    with transaction.atomic(using=using):
+        if TimeEntry.objects.using(using).filter(pk=entry.pk, seconds=entry.seconds)._raw_delete(using) and entry.seconds:
+            _apply({(entry.project_id, entry.user_id, entry.day): -entry.seconds}, using)
+
+
+def hours_report(start, end, period='week', **filters):
+    """Segundos por período e pelos campos de `filters` ausentes, somando os totais diários de todos os shards.
+
+    Ex.: `hours_report(..., user=u)` devolve {(início do período, project_id): segundos};
+    `hours_report(..., project=p)` devolve {(início do período, user_id): segundos}.
+    """
+    group = 'project_id' if 'user' in filters else 'user_id'
+    queryset = (
+        DailyRollup.objects.filter(day__gte=start, day__lte=end, **filters)
+        .annotate(period=PERIODS[period]('day')).values('period', group)
+        .annotate(total=Sum('seconds')).order_by()
+    )
+    totals = defaultdict(int)
+    for alias in read_aliases(DailyRollup):
+        for row in queryset.using(alias):
+            if row['total']:
+                totals[row['period'], row[group]] += row['total']
+    return dict(totals)
+
+
+def rebuild_project(project_id, using):
+    """Recalcula os totais diários de um projeto a partir dos lançamentos encerrados. Retorna o número de linhas."""
+    connection = connections[using]
+    qn = connection.ops.quote_name
+    with transaction.atomic(using=using):
+        DailyRollup.objects.using(using).filter(project_id=project_id)._raw_delete(using)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'INSERT INTO {qn(DailyRollup._meta.db_table)} (project_id, user_id, day, seconds)'
+                f' SELECT project_id, user_id, day, SUM(seconds) FROM {qn(TimeEntry._meta.db_table)}'
+                f' WHERE project_id = %s AND seconds IS NOT NULL GROUP BY project_id, user_id, day',
+                [project_id],
+            )
+            return cursor.rowcount
@@ -1,7 +1,7 @@
 from django.urls import path
 from . import views
 from.models import Task
-from .views import TaskListView, TaskDetailView, TaskCreateView, TaskUpdateView, TaskDeleteView, AssignedTasksByProjectView, TaskCompleteView, TaskReopenView, TaskCancelView   
+from .views import TaskListView, TaskDetailView, TaskCreateView, TaskUpdateView, TaskDeleteView, AssignedTasksByProjectView, TaskCompleteView, TaskReopenView, TaskCancelView, ParticipantAutocompleteView
 
 urlpatterns = [
     path('', TaskListView.as_view(), name='task-list'),
@@ -14,5 +14,26 @@ urlpatterns = [
     path('<int:pk>/delete/', TaskDeleteView.as_view(), name='task-delete'),
     path('project/<int:project_id>/my-tasks/', AssignedTasksByProjectView.as_view(), name='my-tasks'),
     path('project/<int:project_id>/tasks/', views.TaskListViewbyProject.as_view(), name='task-list-by-project'),  
+    path('<int:pk>/activity/', views.TaskActivityView.as_view(), name='task-activity'),
+    path('project/<int:project_id>/activity/', views.ProjectActivityView.as_view(), name='project-activity'),
+    path('inbox/', views.InboxView.as_view(), name='task-inbox'),
+    path('grid/', views.TaskGridView.as_view(), name='task-grid'),
+    path('grid/rows/', views.TaskGridDataView.as_view(), name='task-grid-rows'),
+    path('project/<int:project_id>/board/', views.ProjectBoardView.as_view(), name='project-board'),
+    path('project/<int:project_id>/board/<str:status>/', views.BoardColumnView.as_view(), name='board-column'),
+    path('<int:pk>/dependencies/add/', views.TaskDependencyAddView.as_view(), name='task-dependency-add'),
+    path('<int:pk>/dependencies/<int:depends_on_id>/remove/', views.TaskDependencyRemoveView.as_view(), name='task-dependency-remove'),
+    path('project/<int:project_id>/critical-path/', views.ProjectCriticalPathView.as_view(), name='project-critical-path'),
+    path('<int:pk>/move/', views.TaskMoveView.as_view(), name='task-move'),
+    path('<int:pk>/recurrence/', views.TaskRecurrenceView.as_view(), name='task-recurrence'),
+    path('<int:pk>/occurrences/<str:day>/', views.TaskOccurrenceView.as_view(), name='task-occurrence'),
+    path('project/<int:project_id>/recurring/', views.ProjectRecurrenceView.as_view(), name='project-recurrence'),
+    path('<int:pk>/timer/', views.TaskTimerView.as_view(), name='task-timer'),
+    path('<int:pk>/time/add/', views.TaskTimeEntryAddView.as_view(), name='time-entry-add'),
+    path('<int:pk>/time/<int:entry_id>/', views.TimeEntryUpdateView.as_view(), name='time-entry-update'),
+    path('time/', views.TimeReportView.as_view(), name='time-report'),
+    path('changes/', views.ChangeFeedView.as_view(), name='task-changes'),
+    path('project/<int:project_id>/time/', views.ProjectTimeReportView.as_view(), name='project-time-report'),
+    path('project/<int:project_id>/participants/', ParticipantAutocompleteView.as_view(), name='participant-autocomplete'),
 
 ]
\ No newline at end of file
@@ -1,26 +1,81 @@
-from django.views.generic import ListView, DetailView, CreateView, UpdateView, DeleteView
-from django.urls import reverse_lazy
-from .models import Task
-from .forms import TaskForm
+from django.views.generic import ListView, DetailView, CreateView, UpdateView, DeleteView, TemplateView
+from django.urls import reverse, reverse_lazy
+from .models import Task, ArchivedTask, TaskActivity, InboxItem, RecurrenceRule, TimeEntry
+from .forms import TaskForm, RecurrenceRuleForm, TimeEntryForm
+from .archive import restore_task
+from .facets import TaskFacets
+from . import activity, board, changes, graph, grid, recurrence, timetracking
+from core.choices import NotificationKind, TaskEvent, TaskStatus, OPEN_TASK_STATUSES
+from core.sharding import fan_out, sharded_list
+from core.versioning import MAX_ATTEMPTS, EditConflict, VersionedUpdateMixin
+from notifications.services import notify
+from users.models import User
 from projects.models import Project
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.db import models
-from django.core.exceptions import PermissionDenied
+from django.db.models import prefetch_related_objects
+from django.core.exceptions import PermissionDenied, ValidationError
+from django.contrib import messages
 from django.shortcuts import get_object_or_404, redirect
 from django.views import View
+from django.http import JsonResponse, Http404
+from django.utils.cache import patch_cache_control
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+from datetime import timedelta
+
+
+
+def check_project_access(user, project):
+    if user != project.owner and not project.has_participant(user):
+        raise PermissionDenied("Você não tem permissão para acessar este projeto.")
+
 
+def notify_assignee(task, form, actor):
+    """Avisa o novo responsável quando o formulário muda `assigned_to` (menos quando é o próprio autor)."""
+    if 'assigned_to' in form.changed_data and task.assigned_to_id and task.assigned_to_id != actor.pk:
+        notify(
+            [task.assigned_to_id], NotificationKind.TASK_ASSIGNED,
+            f'{actor.name} atribuiu a você a tarefa "{task.name}" ({task.project.name})',
+            reverse('task-detail', args=[task.pk]),
+        )
 
 
 class TaskAccessMixin(LoginRequiredMixin):
     def dispatch(self, request, *args, **kwargs):
         task = self.get_object()
         user = request.user
-        if user != task.owner and user!= task.assigned_to and user != task.project.owner:
+        # compara ids: carregar dono e responsável só para comparar custava uma consulta cada
+        if user.pk not in (task.owner_id, task.assigned_to_id) and user.pk != task.project.owner_id:
             raise PermissionDenied("Você não tem permissão para acessar esta tarefa.")
+        self.checked_object = task
         return super().dispatch(request, *args, **kwargs)
 
 
-class TaskListView(LoginRequiredMixin, ListView):
+class IncludeArchivedMixin:
+    """Por padrão as listas só consultam tasks_task; com ?archived=1 incluem também o arquivo."""
+    archived_limit = 100
+
+    def include_archived(self):
+        return self.request.GET.get('archived') == '1'
+
+    def get_archived_tasks(self, **filters):
+        if not self.include_archived():
+            return None
+        return fan_out(
+            ArchivedTask.objects.filter(**filters).select_related('project').prefetch_related('owner').order_by('-archived_at'),
+            key=lambda task: task.archived_at, reverse=True, limit=self.archived_limit,
+        )
+
+
+class TaskFacetMixin:
+    """Filtro facetado por etiqueta, status e prioridade (ver tasks/facets.py)."""
+
+    def get_facet_context(self, queryset, project=None):
+        return TaskFacets(queryset, self.request.GET, project=project).get_context()
+
+
+class TaskListView(LoginRequiredMixin, IncludeArchivedMixin, TaskFacetMixin, ListView):
     
     model = Task
     template_name = 'tasks/task_list.html'
@@ -29,6 +84,13 @@ class TaskListView(LoginRequiredMixin, ListView):
     def get_queryset(self):
         return Task.objects.filter(assigned_to=self.request.user)
 
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context.update(self.get_facet_context(self.get_queryset()))
+        context['include_archived'] = self.include_archived()
+        context['archived_tasks'] = self.get_archived_tasks(assigned_to=self.request.user)
+        return context
+
 from django.views import View
 from django.views.generic.detail import SingleObjectMixin
 from django.shortcuts import render, redirect
@@ -51,22 +113,71 @@ class TaskStatusUpdateView(TaskAccessMixin, LoginRequiredMixin, SingleObjectMixi
             return redirect(self.success_url)
         return render(request, self.template_name, {'object': self.object})
 
+    def is_partial(self):
+        """POST do botão da lista feito por fetch: a resposta é só o cartão da tarefa."""
+        return self.request.headers.get('X-Requested-With') == 'XMLHttpRequest'
+
     def post(self, request, *args, **kwargs):
-        self.object = self.get_object()
-        if self.object.status != self.target_status:
+        # grava só a coluna status, com checagem de versão; se outra escrita passar na frente, relê e tenta de novo.
+        # a primeira tentativa usa a tarefa que o TaskAccessMixin acabou de ler
+        for attempt in range(MAX_ATTEMPTS):
+            self.object = self.checked_object if attempt == 0 and isinstance(self.checked_object, Task) else self.get_object()
+            if self.object.status == self.target_status:
+                break
+            old_status = self.object.status
             self.object.status = self.target_status
-            self.object.save()
+            try:
+                self.object.save(update_fields=['status'])
+            except EditConflict:
+                if attempt == MAX_ATTEMPTS - 1:
+                    return self.conflict_response()
+                continue
+            activity.record(self.object, TaskEvent.STATUS_CHANGED, request.user, {'status': (old_status, self.target_status)})
+            break
+        if self.is_partial():
+            prefetch_related_objects([self.object], 'labels', 'owner')
+            return render(request, 'tasks/_task_card.html', {'task': self.object})
         return redirect(self.success_url)
 
+    def conflict_response(self):
+        """409 quando outras escritas passam na frente em todas as tentativas, com o status atual da tarefa."""
+        self.object = self.get_object()
+        if self.is_partial():
+            prefetch_related_objects([self.object], 'labels', 'owner')
+            return render(self.request, 'tasks/_task_card.html', {'task': self.object}, status=409)
+        conflict = [{
+            'label': Task._meta.get_field('status').verbose_name,
+            'mine': TaskStatus(self.target_status).label,
+            'current': self.object.get_status_display(),
+        }]
+        return render(self.request, self.template_name, {'object': self.object, 'conflict': conflict}, status=409)
+
 
 
-class TaskListViewbyProject(DetailView):
+class InboxView(LoginRequiredMixin, ListView):
+    """Meu trabalho: tarefas em aberto atribuídas ao usuário, por prazo e prioridade (ver tasks/inbox.py)."""
+    model = InboxItem
+    template_name = 'tasks/inbox.html'
+    context_object_name = 'items'
+    paginate_by = 50
+
+    def get_queryset(self):
+        return sharded_list(
+            InboxItem.objects.filter(user=self.request.user).order_by('due', 'priority_order', 'task_id'),
+            key=lambda item: (item.due, item.priority_order, item.task_id),
+        )
+
+
+class TaskListViewbyProject(IncludeArchivedMixin, TaskFacetMixin, DetailView):
     model = Project
     context_object_name = 'project'
+    pk_url_kwarg = 'project_id'
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context['tasks'] = Task.objects.filter(project=self.object)  # todas as tarefas do projeto
+        context.update(self.get_facet_context(Task.objects.filter(project=self.object), project=self.object))
+        context['include_archived'] = self.include_archived()
+        context['archived_tasks'] = self.get_archived_tasks(project=self.object)
         return context
 
 class AssignedTasksByProjectView(LoginRequiredMixin, ListView):
@@ -80,10 +191,59 @@ class AssignedTasksByProjectView(LoginRequiredMixin, ListView):
 
         return Task.objects.filter(project_id=project_id, assigned_to=user)
 
+class ParticipantAutocompleteView(LoginRequiredMixin, View):
+    """Busca por prefixo (nome ou e-mail) nos participantes de um projeto, em JSON."""
+    limit = 10
+    cache_seconds = 60
+
+    def get(self, request, project_id):
+        project = get_object_or_404(Project, pk=project_id)
+        check_project_access(request.user, project)
+
+        users = project.participant_users()
+        term = request.GET.get('q', '').strip()
+        if term:
+            # istartswith usa os índices NOCASE de users_user (LIKE 'termo%')
+            users = users.filter(models.Q(name__istartswith=term) | models.Q(email__istartswith=term))
+        results = list(users.order_by('name').values('id', 'name', 'email')[:self.limit])
+
+        response = JsonResponse({'results': results})
+        patch_cache_control(response, private=True, max_age=self.cache_seconds)
+        return response
+
 class TaskDetailView(TaskAccessMixin, DetailView):
     model = Task
     template_name = 'tasks/task_detail.html'
     context_object_name = 'task'
+    # próximas ocorrências mostradas nas tarefas recorrentes
+    upcoming_days = 92
+    upcoming_limit = 8
+    time_entries_limit = 10
+
+    def get_object(self, queryset=None):
+        try:
+            return super().get_object(queryset)
+        except Http404:
+            # tarefas arquivadas continuam acessíveis (somente leitura) pela mesma URL
+            return get_object_or_404(ArchivedTask, pk=self.kwargs['pk'])
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        if isinstance(self.object, Task):
+            context['dependencies'] = Task.objects.filter(dependents__task=self.object).order_by('end_date', 'id')
+            context['dependents'] = Task.objects.filter(dependencies__depends_on=self.object).order_by('start_date', 'id')
+            context['open_blockers'] = graph.blockers(self.object).filter(status__in=OPEN_TASK_STATUSES).count()
+            entries = TimeEntry.objects.filter(task_id=self.object.pk)
+            context['time_entries'] = entries.select_related('user').order_by('-id')[:self.time_entries_limit]
+            context['time_total'] = (entries.aggregate(total=models.Sum('seconds'))['total'] or 0) / 3600
+            context['running_timer'] = timetracking.running_timer(self.request.user)
+            context['time_form'] = TimeEntryForm()
+            rule = RecurrenceRule.objects.filter(template=self.object).first()
+            if rule is not None:
+                today = timezone.localdate()
+                context['recurrence_rule'] = rule
+                context['next_occurrences'] = recurrence.agenda([rule], today, today + timedelta(days=self.upcoming_days))[:self.upcoming_limit]
+        return context
 class TaskCreateView(LoginRequiredMixin, CreateView):
     model = Task
     form_class = TaskForm
@@ -103,7 +263,10 @@ class TaskCreateView(LoginRequiredMixin, CreateView):
             project = Project.objects.get(pk=project_id)
             form.instance.project = project
             form.instance.owner = self.request.user  # <-- Aqui está certo!
-        return super().form_valid(form)
+        response = super().form_valid(form)
+        activity.record(self.object, TaskEvent.CREATED, self.request.user)
+        notify_assignee(self.object, form, self.request.user)
+        return response
     success_url = reverse_lazy('project-list')
 
 class TaskCompleteView(TaskStatusUpdateView):
@@ -117,13 +280,24 @@ class TaskReopenView(TaskStatusUpdateView):
     target_status = 'in_progress'
     skip_if_status_is = 'in_progress'
 
+    def get_object(self, queryset=None):
+        try:
+            return super().get_object(queryset)
+        except Http404:
+            return get_object_or_404(ArchivedTask, pk=self.kwargs['pk'])
+
+    def post(self, request, *args, **kwargs):
+        if isinstance(self.checked_object, ArchivedTask):
+            restore_task(self.kwargs['pk'])  # volta para a tabela quente antes de reabrir
+        return super().post(request, *args, **kwargs)
+
 
 class TaskCancelView(TaskStatusUpdateView):
     template_name = 'tasks/task_confirm_cancel.html'
     target_status = 'canceled'
     skip_if_status_is = 'canceled'
 
-class TaskUpdateView(TaskAccessMixin, UpdateView):
+class TaskUpdateView(TaskAccessMixin, VersionedUpdateMixin, UpdateView):
     model = Task
     form_class = TaskForm
     template_name = 'tasks/task_form.html'
@@ -132,8 +306,439 @@ class TaskUpdateView(TaskAccessMixin, UpdateView):
             kwargs = super().get_form_kwargs()
             kwargs['project'] = self.object.project  # passa o projeto da tarefa para o form
             return kwargs
+
+    def form_valid(self, form):
+        response = super().form_valid(form)
+        activity.record_form_changes(self.object, form, self.request.user)
+        notify_assignee(self.object, form, self.request.user)
+        return response
+
 class TaskDeleteView(TaskAccessMixin, DeleteView):
     model = Task
     template_name = 'tasks/task_confirm_delete.html'
     success_url = reverse_lazy('task-list')
 
+    def form_valid(self, form):
+        activity.record(self.object, TaskEvent.DELETED, self.request.user, {'name': (self.object.name, None)})
+        return super().form_valid(form)
+
+
+class ActivityTimelineMixin:
+    """Paginação por keyset (?before=<id>) sobre TaskActivity, do mais recente para o mais antigo."""
+    template_name = 'tasks/activity_list.html'
+    page_size = 50
+
+    def get_activities(self, **filters):
+        queryset = TaskActivity.objects.filter(**filters)
+        before = self.request.GET.get('before')
+        if before and before.isdigit():
+            queryset = queryset.filter(id__lt=int(before))
+        page = list(queryset.prefetch_related('actor').order_by('-id')[:self.page_size + 1])
+        has_more = len(page) > self.page_size
+        page = page[:self.page_size]
+        return {
+            'activities': page,
+            'next_before': page[-1].pk if has_more else None,
+        }
+
+
+class TaskActivityView(TaskAccessMixin, ActivityTimelineMixin, DetailView):
+    model = Task
+    context_object_name = 'task'
+
+    def get_object(self, queryset=None):
+        try:
+            return super().get_object(queryset)
+        except Http404:
+            return get_object_or_404(ArchivedTask, pk=self.kwargs['pk'])
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context.update(self.get_activities(task_id=self.object.pk))
+        context['title'] = f'Histórico da tarefa "{self.object.name}"'
+        return context
+
+
+class ProjectActivityView(LoginRequiredMixin, ActivityTimelineMixin, DetailView):
+    model = Project
+    context_object_name = 'project'
+    pk_url_kwarg = 'project_id'
+
+    def get_object(self, queryset=None):
+        project = super().get_object(queryset)
+        check_project_access(self.request.user, project)
+        return project
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context.update(self.get_activities(project_id=self.object.pk))
+        context['title'] = f'Histórico do projeto "{self.object.name}"'
+        return context
+
+
+
+
+class ProjectBoardView(LoginRequiredMixin, DetailView):
+    """Quadro Kanban: cada coluna vem com a primeira página e carrega o resto por JSON."""
+    model = Project
+    template_name = 'tasks/task_board.html'
+    context_object_name = 'project'
+    pk_url_kwarg = 'project_id'
+
+    def get_object(self, queryset=None):
+        project = super().get_object(queryset)
+        check_project_access(self.request.user, project)
+        return project
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['columns'] = board.board_columns(self.object.pk)
+        return context
+
+
+class BoardColumnView(LoginRequiredMixin, View):
+    """Próxima página de uma coluna do quadro (?cursor=<rank>:<id>)."""
+
+    def get(self, request, project_id, status):
+        project = get_object_or_404(Project, pk=project_id)
+        check_project_access(request.user, project)
+        if status not in TaskStatus.values:
+            raise Http404
+        tasks, cursor = board.column_page(project.pk, status, request.GET.get('cursor'))
+        return JsonResponse({'results': [board.serialize_card(task) for task in tasks], 'next': cursor})
+
+
+class TaskMoveView(TaskAccessMixin, SingleObjectMixin, View):
+    """Move um cartão do quadro: POST status=<status>&before=<id do cartão de cima, vazio = topo>."""
+    model = Task
+
+    def post(self, request, *args, **kwargs):
+        task = self.get_object()
+        status = request.POST.get('status') or task.status
+        if status not in TaskStatus.values:
+            return JsonResponse({'error': 'Status inválido.'}, status=400)
+        before = request.POST.get('before', '')
+        old_status = task.status
+        try:
+            board.move_task(task, status, int(before) if before.isdigit() else None)
+        except Task.DoesNotExist as exc:
+            return JsonResponse({'error': str(exc)}, status=400)
+        if status != old_status:
+            activity.record(task, TaskEvent.STATUS_CHANGED, request.user, {'status': (old_status, status)})
+        return JsonResponse({'id': task.pk, 'status': task.status, 'rank': task.rank})
+
+
+
+class TaskGridView(LoginRequiredMixin, TemplateView):
+    """Planilha com as tarefas de todos os projetos do usuário (AG Grid)."""
+    template_name = 'tasks/task_grid.html'
+
+
+class TaskGridDataView(LoginRequiredMixin, View):
+    """Blocos de linhas para o grid: recebe a requisição do row model em JSON (ver tasks/grid.py)."""
+
+    def post(self, request):
+        try:
+            rows = grid.get_rows(request.user, grid.parse_request(request.body))
+        except grid.GridRequestError as exc:
+            return JsonResponse({'error': str(exc)}, status=400)
+        return JsonResponse(rows)
+
+
+
+class TaskDependencyAddView(TaskAccessMixin, SingleObjectMixin, View):
+    """POST depends_on=<id>: a tarefa passa a depender de outra do mesmo projeto."""
+    model = Task
+
+    def post(self, request, *args, **kwargs):
+        task = self.get_object()
+        value = request.POST.get('depends_on', '').strip().lstrip('#')
+        depends_on = Task.objects.filter(pk=value).first() if value.isdigit() else None
+        if depends_on is None:
+            messages.error(request, 'Tarefa não encontrada.')
+        else:
+            try:
+                graph.add_dependency(task, depends_on)
+            except ValidationError as exc:
+                messages.error(request, exc.messages[0])
+        return redirect('task-detail', pk=task.pk)
+
+
+class TaskDependencyRemoveView(TaskAccessMixin, SingleObjectMixin, View):
+    model = Task
+
+    def post(self, request, *args, **kwargs):
+        task = self.get_object()
+        task.dependencies.filter(depends_on_id=kwargs['depends_on_id']).delete()
+        return redirect('task-detail', pk=task.pk)
+
+
+class ProjectCriticalPathView(LoginRequiredMixin, DetailView):
+    """Cadeia de dependências que determina a data de fim do projeto (ver tasks/graph.py)."""
+    model = Project
+    template_name = 'tasks/critical_path.html'
+    context_object_name = 'project'
+    pk_url_kwarg = 'project_id'
+
+    def get_object(self, queryset=None):
+        project = super().get_object(queryset)
+        check_project_access(self.request.user, project)
+        return project
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['path'] = graph.critical_path(self.object.pk)
+        return context
+
+
+class TaskRecurrenceView(TaskAccessMixin, SingleObjectMixin, View):
+    """Cria, altera ou remove (POST stop=1) a repetição de uma tarefa, que passa a ser a modelo."""
+    model = Task
+    template_name = 'tasks/task_recurrence.html'
+
+    def get_form(self, data=None):
+        task = self.object
+        rule = RecurrenceRule.objects.filter(template=task).first()
+        if rule is None and task.recurrence_id:
+            return None  # ocorrência de outra série
+        return RecurrenceRuleForm(data, instance=rule or RecurrenceRule(template=task, starts_on=task.start_date))
+
+    def render_form(self, form):
+        if form is None:
+            messages.error(self.request, 'Esta tarefa é uma ocorrência de outra tarefa recorrente; altere a repetição na tarefa modelo.')
+            return redirect('task-detail', pk=self.object.pk)
+        return render(self.request, self.template_name, {'task': self.object, 'form': form})
+
+    def get(self, request, *args, **kwargs):
+        self.object = self.get_object()
+        return self.render_form(self.get_form())
+
+    def post(self, request, *args, **kwargs):
+        self.object = self.get_object()
+        form = self.get_form(request.POST)
+        if form is None or not (request.POST.get('stop') or form.is_valid()):
+            return self.render_form(form)
+        if not request.POST.get('stop'):
+            recurrence.save_rule(form.save(commit=False))
+        elif form.instance.pk:
+            # as ocorrências já criadas ficam, só deixam de pertencer à série
+            form.instance.delete()
+        return redirect('task-detail', pk=self.object.pk)
+
+
+class TaskOccurrenceView(TaskAccessMixin, SingleObjectMixin, View):
+    """POST: abre a ocorrência <data> da tarefa recorrente <pk>, criando a tarefa se ela ainda não existir."""
+    model = Task
+
+    def post(self, request, *args, **kwargs):
+        rule = get_object_or_404(RecurrenceRule.objects.select_related('template'), template=self.get_object())
+        try:
+            day = parse_date(kwargs['day'])
+        except ValueError:
+            day = None
+        if day is None:
+            raise Http404
+        try:
+            task = recurrence.materialize_occurrence(rule, day)
+        except ValueError as exc:
+            messages.error(request, str(exc))
+            return redirect('task-detail', pk=rule.template_id)
+        return redirect('task-detail', pk=task.pk)
+
+
+class ProjectRecurrenceView(LoginRequiredMixin, DetailView):
+    """Agenda das tarefas recorrentes do projeto numa janela de datas (?start=AAAA-MM-DD&days=N).
+
+    As ocorrências ainda não materializadas são calculadas na hora e abertas
+    com TaskOccurrenceView.
+    """
+    model = Project
+    template_name = 'tasks/recurrence_agenda.html'
+    context_object_name = 'project'
+    pk_url_kwarg = 'project_id'
+    default_days = 14
+    max_days = 92
+
+    def get_object(self, queryset=None):
+        project = super().get_object(queryset)
+        check_project_access(self.request.user, project)
+        return project
+
+    def get_window(self):
+        try:
+            start = parse_date(self.request.GET.get('start', '')) or timezone.localdate()
+        except ValueError:
+            start = timezone.localdate()
+        days = self.request.GET.get('days', '')
+        days = min(max(int(days), 1), self.max_days) if days.isdigit() else self.default_days
+        return start, days
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        start, days = self.get_window()
+        end = start + timedelta(days=days - 1)
+        rules = RecurrenceRule.objects.filter(template__project=self.object).select_related('template')
+        context.update({
+            'occurrences': recurrence.agenda(rules, start, end),
+            'start': start,
+            'end': end,
+            'days': days,
+            'previous_start': start - timedelta(days=days),
+            'next_start': end + timedelta(days=1),
+        })
+        return context
+
+
+class TaskTimerView(TaskAccessMixin, SingleObjectMixin, View):
+    """POST action=start|stop: cronômetro do usuário nesta tarefa (iniciar para o que estiver correndo)."""
+    model = Task
+
+    def post(self, request, *args, **kwargs):
+        task = self.get_object()
+        if request.POST.get('action') == 'stop':
+            timetracking.stop_timer(request.user)
+        else:
+            timetracking.start_timer(task, request.user)
+        return redirect('task-detail', pk=task.pk)
+
+
+class TaskTimeEntryAddView(TaskAccessMixin, SingleObjectMixin, View):
+    """POST do formulário de lançamento manual do detalhe da tarefa."""
+    model = Task
+
+    def post(self, request, *args, **kwargs):
+        task = self.get_object()
+        form = TimeEntryForm(request.POST)
+        if form.is_valid():
+            timetracking.add_entry(task, request.user, form.cleaned_data['day'], form.seconds, form.cleaned_data['note'])
+        else:
+            for errors in form.errors.values():
+                messages.error(request, errors[0])
+        return redirect('task-detail', pk=task.pk)
+
+
+class TimeEntryUpdateView(TaskAccessMixin, SingleObjectMixin, View):
+    """Corrige (ou, com delete=1, exclui) um lançamento encerrado do próprio usuário."""
+    model = Task
+    template_name = 'tasks/time_entry_form.html'
+
+    def get_entry(self):
+        return get_object_or_404(
+            TimeEntry, pk=self.kwargs['entry_id'], task_id=self.object.pk, user=self.request.user, seconds__isnull=False,
+        )
+
+    def get(self, request, *args, **kwargs):
+        self.object = self.get_object()
+        entry = self.get_entry()
+        return render(request, self.template_name, {'task': self.object, 'entry': entry, 'form': TimeEntryForm(entry=entry)})
+
+    def post(self, request, *args, **kwargs):
+        self.object = self.get_object()
+        entry = self.get_entry()
+        if request.POST.get('delete'):
+            timetracking.delete_entry(entry)
+            return redirect('task-detail', pk=self.object.pk)
+        form = TimeEntryForm(request.POST, entry=entry)
+        if not form.is_valid():
+            return render(request, self.template_name, {'task': self.object, 'entry': entry, 'form': form})
+        try:
+            timetracking.update_entry(entry, form.cleaned_data['day'], form.seconds, form.cleaned_data['note'])
+        except EditConflict:
+            messages.error(request, 'O lançamento foi alterado em outra janela; confira os valores atuais.')
+            return redirect('time-entry-update', pk=self.object.pk, entry_id=entry.pk)
+        return redirect('task-detail', pk=self.object.pk)
+
+
+class HoursReportMixin:
+    """Tabela de horas dos últimos períodos (?period=week|month), lida só dos totais diários."""
+    template_name = 'tasks/hours_report.html'
+    periods = {'week': 8, 'month': 6}
+    # model das linhas (Project agrupa as horas do usuário, User as do projeto), rotuladas pelo `name`
+    row_model = None
+
+    def get_period(self):
+        period = self.request.GET.get('period')
+        return period if period in self.periods else 'week'
+
+    def period_starts(self, period):
+        """Inícios dos últimos períodos, do mais antigo ao atual, e o último dia do atual."""
+        today = timezone.localdate()
+        count = self.periods[period]
+        if period == 'week':
+            current = today - timedelta(days=today.weekday())
+            return [current - timedelta(weeks=n) for n in reversed(range(count))], current + timedelta(days=6)
+        starts = [today.replace(day=1)]
+        while len(starts) < count:
+            starts.insert(0, (starts[0] - timedelta(days=1)).replace(day=1))
+        return starts, (starts[-1] + timedelta(days=32)).replace(day=1) - timedelta(days=1)
+
+    def get_row_labels(self, keys):
+        queryset = self.row_model.objects.filter(pk__in=keys).order_by('pk').values_list('pk', 'name')
+        return dict(fan_out(queryset, key=lambda row: row[0]))
+
+    def build_report(self, **filters):
+        period = self.get_period()
+        starts, end = self.period_starts(period)
+        totals = timetracking.hours_report(starts[0], end, period, **filters)
+        labels = self.get_row_labels({key for _, key in totals})
+        rows = []
+        for key in sorted(labels, key=lambda key: str(labels[key]).lower()):
+            hours = [totals.get((start, key), 0) / 3600 for start in starts]
+            rows.append({'label': labels[key], 'hours': hours, 'total': sum(hours)})
+        return {
+            'period': period,
+            'period_starts': starts,
+            'rows': rows,
+            'column_totals': [sum(row['hours'][index] for row in rows) for index in range(len(starts))],
+            'grand_total': sum(row['total'] for row in rows),
+        }
+
+
+class TimeReportView(LoginRequiredMixin, HoursReportMixin, TemplateView):
+    """Horas do usuário por projeto, somando todos os shards."""
+    row_model = Project
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context.update(self.build_report(user=self.request.user))
+        context['title'] = 'Minhas horas'
+        context['row_header'] = 'Projeto'
+        return context
+
+
+class ProjectTimeReportView(LoginRequiredMixin, HoursReportMixin, DetailView):
+    """Horas do projeto por participante."""
+    model = Project
+    context_object_name = 'project'
+    pk_url_kwarg = 'project_id'
+    row_model = User
+
+    def get_object(self, queryset=None):
+        project = super().get_object(queryset)
+        check_project_access(self.request.user, project)
+        return project
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context.update(self.build_report(project=self.object))
+        context['title'] = f'Horas: {self.object.name}'
+        context['row_header'] = 'Participante'
+        return context
+
+
+class ChangeFeedView(LoginRequiredMixin, View):
+    """Alterações de tarefas e projetos visíveis ao usuário depois de ?cursor= (ver tasks/changes.py).
+
+    ?limit= até 1000 por lote; ?project= restringe a um projeto (sincronização
+    inicial de um projeto novo para o usuário, a partir do cursor vazio).
+    """
+    max_limit = 1000
+
+    def get(self, request):
+        try:
+            limit = min(max(int(request.GET.get('limit', changes.FEED_PAGE_SIZE)), 1), self.max_limit)
+            project_id = int(request.GET['project']) if request.GET.get('project') else None
+            entries, cursor, more = changes.feed(request.user, request.GET.get('cursor'), limit, project_id)
+        except ValueError as exc:
+            return JsonResponse({'error': str(exc)}, status=400)
+        return JsonResponse({'changes': entries, 'cursor': cursor, 'more': more}, json_dumps_params={'separators': (',', ':')})
@@ -1,13 +1,19 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
 from django.utils.translation import gettext_lazy as _
+from core.paginator import EstimatedCountPaginator
 from .models import User
 
 @admin.register(User)
 class UserAdmin(BaseUserAdmin):
     ordering = ['id']
     list_display = ['email', 'name', 'is_staff']
-    search_fields = ['email', 'name']
+    list_filter = ['is_staff', 'is_superuser', 'is_active']
+    # busca por prefixo: usa os índices NOCASE de email e name em vez de varrer a tabela
+    search_fields = ['^email', '^name']
+    list_per_page = 50
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
 
     fieldsets = (
         (None, {'fields': ('email', 'password')}),
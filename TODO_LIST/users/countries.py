@@ -0,0 +1,93 @@
+"""Lista de países do cadastro, traduzida, ordenada e renderizada uma vez por idioma.
+
+Iterar `django_countries.countries` traduz e ordena ~250 nomes a cada vez, e o
+<select> padrão renderiza cada <option> por template. Aqui a lista de
+escolhas e o HTML das opções ficam num dicionário do processo e no cache
+compartilhado (para os outros processos não refazerem o trabalho), com uma
+chave por idioma. Só a opção selecionada é marcada na hora de renderizar.
+
+As duas cópias valem por COUNTRY_CHOICES_CACHE_TTL segundos. `clear_country_cache`
+apaga o cache compartilhado e a cópia do processo que a chama; os outros
+processos só largam a deles quando ela expira. Ao mudar as settings
+COUNTRIES_* (ou atualizar o django-countries), aumente CACHE_VERSION e
+reinicie os processos.
+"""
+import time
+
+from django import forms
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models.fields import BLANK_CHOICE_DASH
+from django.forms.utils import flatatt
+from django.utils.html import escape, format_html, format_html_join
+from django.utils.safestring import mark_safe
+from django.utils.translation import get_language
+from django_countries import countries
+
+CACHE_VERSION = 1
+
+# cópia do processo: (tipo, idioma) -> (expira em, escolhas ou HTML), pelo relógio monotônico
+_local = {}
+
+
+def _ttl():
+    return getattr(settings, 'COUNTRY_CHOICES_CACHE_TTL', 24 * 3600)
+
+
+def _cached(kind, build):
+    language = get_language() or settings.LANGUAGE_CODE
+    now = time.monotonic()
+    expires, value = _local.get((kind, language), (now, None))
+    if expires > now:
+        return value
+    key = f'users:countries:{kind}:{language}:{CACHE_VERSION}'
+    ttl = _ttl()
+    value = cache.get(key)
+    if value is None:
+        value = build()
+        cache.set(key, value, ttl)
+    # TTL None: vale enquanto o processo viver, como no cache compartilhado
+    _local[kind, language] = (float('inf') if ttl is None else now + ttl, value)
+    return value
+
+
+def country_choices():
+    """Tupla (código, nome) no idioma ativo, na ordem alfabética desse idioma."""
+    return _cached('choices', lambda: tuple((code, str(name)) for code, name in countries))
+
+
+def country_options_html():
+    """As <option> de todos os países no idioma ativo, sem nenhuma selecionada."""
+    return _cached('options', lambda: str(format_html_join('', '<option value="{}">{}</option>', country_choices())))
+
+
+def clear_country_cache():
+    _local.clear()
+    cache.delete_many([
+        f'users:countries:{kind}:{language}:{CACHE_VERSION}'
+        for kind in ('choices', 'options') for language, _ in settings.LANGUAGES
+    ])
+
+
+class CountrySelect(forms.Select):
+    """Select de países que reaproveita o HTML das opções do idioma atual.
+
+    Com `searchable=True` o select ganha `data-searchable` e o script de
+    users/user_form.html põe um campo que filtra as opções no navegador.
+    """
+
+    def __init__(self, attrs=None, searchable=False):
+        super().__init__(attrs)
+        if searchable:
+            self.attrs['data-searchable'] = ''
+
+    def render(self, name, value, attrs=None, renderer=None):
+        value = next(iter(self.format_value(value)), '')
+        options = country_options_html()
+        if value:
+            option = f'<option value="{escape(value)}">'
+            options = options.replace(option, f'{option[:-1]} selected>', 1)
+        blank_label = BLANK_CHOICE_DASH[0][1]
+        blank = format_html('<option value=""{}>{}</option>', '' if value else mark_safe(' selected'), blank_label)
+        attrs = self.build_attrs(self.attrs, {**(attrs or {}), 'name': name})
+        return mark_safe(f'<select{flatatt(attrs)}>{blank}{options}</select>')
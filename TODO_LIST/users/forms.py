@@ -1,5 +1,6 @@
 from django import forms
 from django.contrib.auth.forms import UserCreationForm, UserChangeForm
+from .countries import CountrySelect, country_choices
 from .models import User
 
 class CustomUserCreationForm(UserCreationForm):
@@ -7,9 +8,15 @@ class CustomUserCreationForm(UserCreationForm):
         model = User
         fields = ('name', 'email','cpf', 'date_of_birth', 'country', 'gender')
         widgets = {
-            'date_of_birth': forms.DateInput(attrs={'type': 'date'})
+            'date_of_birth': forms.DateInput(attrs={'type': 'date'}),
+            'country': CountrySelect(searchable=True),
         }
 
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # a validação percorre as escolhas: usa a lista já traduzida e ordenada (users/countries.py)
+        self.fields['country'].choices = [('', '---------'), *country_choices()]
+
 class CustomUserChangeForm(UserChangeForm):
     class Meta:
         model = User
@@ -0,0 +1,20 @@
+from django.db import models
+from jobs.registry import job
+from core.deletion import fast_delete
+from projects.shards import delete_user_rows
+from tasks.models import Task
+from .models import User
+
+
+@job('users.delete_user')
+def delete_user_job(job, user_id):
+    total = Task.objects.filter(
+        models.Q(owner_id=user_id) | models.Q(assigned_to_id=user_id) | models.Q(project__owner_id=user_id)
+    ).count() + 1
+
+    def progress(label, deleted):
+        job.set_progress(min(99, deleted * 100 // total), f'{deleted} registro(s) apagados')
+
+    delete_user_rows(user_id, progress=progress)
+    count, per_model = fast_delete(User.objects.filter(pk=user_id), progress=progress)
+    return {'deleted': count, 'per_model': per_model}
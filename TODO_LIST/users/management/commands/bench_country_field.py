@@ -0,0 +1,49 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.utils import translation
+
+from users.countries import clear_country_cache
+from users.forms import CustomUserCreationForm
+from users.models import User
+
+
+class Command(BaseCommand):
+    help = (
+        'Benchmark: tempo de renderização do formulário de cadastro com o select de países '
+        'padrão do django-countries e com o select em cache (users/countries.py).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--renders', type=int, default=200)
+        parser.add_argument('--language', default='pt-br')
+
+    def render(self, form_factory, renders):
+        timings = []
+        for _ in range(renders):
+            started = time.perf_counter()
+            html = form_factory().as_div()
+            timings.append((time.perf_counter() - started) * 1000)
+        timings.sort()
+        return timings[len(timings) // 2], timings[0], len(html)
+
+    def default_form(self):
+        form = CustomUserCreationForm()
+        # o campo como o model o gera: escolhas preguiçosas e o select padrão
+        form.fields['country'] = User._meta.get_field('country').formfield()
+        return form
+
+    def handle(self, *args, **options):
+        renders = options['renders']
+        with translation.override(options['language']):
+            clear_country_cache()
+            started = time.perf_counter()
+            CustomUserCreationForm().as_div()
+            cold = (time.perf_counter() - started) * 1000
+
+            for label, factory in (('select padrão', self.default_form), ('select em cache', CustomUserCreationForm)):
+                median, best, size = self.render(factory, renders)
+                self.stdout.write(self.style.SUCCESS(
+                    f'{label}: mediana {median:.2f}ms, melhor {best:.2f}ms por formulário ({size} bytes)'
+                ))
+            self.stdout.write(f'primeira renderização com o cache vazio: {cold:.2f}ms')
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.5 on 2026-10-19 12:40
+
+import django.db.models.functions.comparison
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('users', '0014_user_date_of_birth'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(django.db.models.functions.comparison.Collate('email', 'NOCASE'), name='users_user_email_nocase_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(django.db.models.functions.comparison.Collate('name', 'NOCASE'), name='users_user_name_nocase_idx'),
+        ),
+    ]
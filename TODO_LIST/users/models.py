@@ -1,5 +1,6 @@
 from django.contrib.auth.models import AbstractUser
 from django.db import models
+from django.db.models.functions import Collate
 from .managers import CustomUserManager
 from django_countries.fields import CountryField
 from .choices import Gender
@@ -20,6 +21,14 @@ class User(AbstractUser):
     USERNAME_FIELD = 'email'     # Login pelo email
     REQUIRED_FIELDS = ['name']   # Campos obrigatórios para criação do superuser
     objects = CustomUserManager() 
+
+    class Meta(AbstractUser.Meta):
+        indexes = [
+            # índices NOCASE para a busca por prefixo (istartswith vira LIKE 'x%' no SQLite)
+            models.Index(Collate('email', 'NOCASE'), name='users_user_email_nocase_idx'),
+            models.Index(Collate('name', 'NOCASE'), name='users_user_name_nocase_idx'),
+        ]
+
     def __str__(self):
         return self.email
     
\ No newline at end of file
@@ -1,3 +1,131 @@
-from django.test import TestCase
+import csv
+import io
+import os
+import tempfile
+from unittest import mock
 
-# Create your tests here.
+from django.core.exceptions import ValidationError
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.utils import translation
+
+from . import countries
+from .countries import CountrySelect, clear_country_cache, country_choices
+from .forms import CustomUserCreationForm
+from .models import User
+from .validators import normalize_cpf, validate_cpf
+
+# CPFs com dígitos verificadores válidos
+CPF_A, CPF_B, CPF_C = '52998224725', '11144477735', '39053344705'
+
+
+class CpfValidatorTests(SimpleTestCase):
+    def test_normalize_strips_punctuation(self):
+        self.assertEqual(normalize_cpf('529.982.247-25'), CPF_A)
+        self.assertEqual(normalize_cpf(None), '')
+
+    def test_valid_cpf(self):
+        validate_cpf(CPF_A)
+        validate_cpf(CPF_B)
+
+    def test_invalid_cpfs(self):
+        for value in ('', '5299822472', '11111111111', '52998224724'):
+            with self.subTest(value=value), self.assertRaises(ValidationError):
+                validate_cpf(value)
+
+
+class ImportUsersTests(TestCase):
+    def run_import(self, rows, *args):
+        with tempfile.NamedTemporaryFile('w', suffix='.csv', newline='', encoding='utf-8', delete=False) as handle:
+            writer = csv.DictWriter(handle, fieldnames=['name', 'email', 'cpf', 'password'])
+            writer.writeheader()
+            writer.writerows(rows)
+        self.addCleanup(os.unlink, handle.name)
+        out, err = io.StringIO(), io.StringIO()
+        call_command('import_users', handle.name, '--workers', '1', *args, stdout=out, stderr=err)
+        return out.getvalue(), err.getvalue()
+
+    def test_creates_users_with_hashed_passwords(self):
+        out, err = self.run_import([
+            {'name': 'Ana', 'email': 'ana@example.com', 'cpf': '529.982.247-25', 'password': 'senha-123'},
+            {'name': 'Bia', 'email': 'bia@example.com', 'cpf': CPF_B, 'password': ''},
+        ])
+        self.assertIn('2 usuário(s) criados, 0 erro(s)', out)
+        ana, bia = User.objects.order_by('name')
+        self.assertEqual(ana.cpf, CPF_A)
+        self.assertTrue(ana.check_password('senha-123'))
+        self.assertFalse(bia.has_usable_password())
+
+    def test_rejects_invalid_and_repeated_rows(self):
+        out, err = self.run_import([
+            {'name': 'Ana', 'email': 'ana@example.com', 'cpf': CPF_A},
+            {'name': 'Ana 2', 'email': 'ANA@example.com', 'cpf': CPF_B},
+            {'name': 'Bia', 'email': 'bia@example.com', 'cpf': CPF_A},
+            {'name': 'Cris', 'email': 'cris@example.com', 'cpf': '12345678900'},
+        ])
+        self.assertIn('1 usuário(s) criados, 3 erro(s)', out)
+        self.assertIn('linha 3: e-mail repetido no arquivo', err)
+        self.assertIn('linha 4: CPF repetido no arquivo', err)
+        self.assertIn('linha 5: CPF com dígitos verificadores inválidos', err)
+
+    def test_existing_email_is_matched_case_insensitively(self):
+        User.objects.create_user('Ana@Example.com', 'Ana', 'senha-123', cpf=CPF_A)
+        out, err = self.run_import([
+            {'name': 'Ana', 'email': 'ana@example.com', 'cpf': CPF_B},
+            {'name': 'Cris', 'email': 'cris@example.com', 'cpf': CPF_C},
+        ])
+        self.assertIn('1 usuário(s) criados', out)
+        self.assertIn('linha 2: e-mail já cadastrado: ana@example.com', err)
+        self.assertFalse(User.objects.filter(cpf=CPF_B).exists())
+
+    def test_dry_run_writes_nothing(self):
+        out, err = self.run_import([{'name': 'Ana', 'email': 'ana@example.com', 'cpf': CPF_A}], '--dry-run')
+        self.assertIn('1 usuário(s) validados', out)
+        self.assertFalse(User.objects.exists())
+
+
+class CountryChoicesTests(TestCase):
+    def setUp(self):
+        clear_country_cache()
+        self.addCleanup(clear_country_cache)
+
+    def test_choices_are_translated_and_sorted_per_language(self):
+        with translation.override('pt-br'):
+            choices = dict(country_choices())
+            self.assertEqual(choices['DE'], 'Alemanha')
+            names = [name for _, name in country_choices()]
+        with translation.override('en'):
+            self.assertEqual(dict(country_choices())['DE'], 'Germany')
+        self.assertEqual(names[0], 'Afeganistão')
+
+    def test_lists_are_built_once_and_shared_through_the_cache(self):
+        with translation.override('pt-br'):
+            built = country_choices()
+            countries._local.clear()  # outro processo: só o cache compartilhado
+            with mock.patch.object(countries, 'countries', []):
+                self.assertEqual(country_choices(), built)
+
+    @override_settings(COUNTRY_CHOICES_CACHE_TTL=60)
+    def test_process_copy_expires_with_the_ttl(self):
+        with translation.override('pt-br'), mock.patch.object(countries.time, 'monotonic', return_value=1000) as monotonic:
+            built = country_choices()
+            self.assertEqual(countries._local['choices', 'pt-br'][0], 1060)
+            clear_country_cache()
+            countries._local['choices', 'pt-br'] = (1060, (('XX', 'Velha'),))  # cópia de outro processo, de antes da limpeza
+            self.assertEqual(country_choices(), (('XX', 'Velha'),))
+            monotonic.return_value = 1061
+            self.assertEqual(country_choices(), built)
+
+    def test_select_marks_only_the_selected_country(self):
+        html = CountrySelect(searchable=True).render('country', 'BR')
+        self.assertEqual(html.count(' selected'), 1)
+        self.assertIn('<option value="BR" selected>', html)
+        self.assertIn('data-searchable', html)
+        self.assertIn('<option value="" selected>', CountrySelect().render('country', None))
+
+    def test_creation_form_validates_country(self):
+        data = {'name': 'Ana', 'email': 'ana@example.com', 'cpf': CPF_A, 'password1': 'S3nha-longa!', 'password2': 'S3nha-longa!'}
+        form = CustomUserCreationForm({**data, 'country': 'XX'})
+        self.assertIn('country', form.errors)
+        form = CustomUserCreationForm({**data, 'country': 'PT'})
+        self.assertNotIn('country', form.errors)
@@ -0,0 +1,28 @@
+import re
+
+from django.core.exceptions import ValidationError
+
+_NON_DIGITS = re.compile(r'\D')
+
+
+def normalize_cpf(value):
+    """Remove pontuação: '123.456.789-09' -> '12345678909'."""
+    return _NON_DIGITS.sub('', value or '')
+
+
+def _check_digit(digits):
+    total = sum(int(digit) * weight for digit, weight in zip(digits, range(len(digits) + 1, 1, -1)))
+    remainder = total * 10 % 11
+    return 0 if remainder == 10 else remainder
+
+
+def validate_cpf(value):
+    """Valida formato e dígitos verificadores de um CPF já normalizado (11 dígitos)."""
+    if not re.fullmatch(r'\d{11}', value or ''):
+        raise ValidationError('O CPF deve ter 11 dígitos.', code='invalid_cpf')
+    if value == value[0] * 11:
+        raise ValidationError('CPF inválido.', code='invalid_cpf')
+    first = _check_digit(value[:9])
+    second = _check_digit(value[:9] + str(first))
+    if value[9:] != f'{first}{second}':
+        raise ValidationError('CPF com dígitos verificadores inválidos.', code='invalid_cpf')
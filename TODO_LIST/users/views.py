@@ -2,7 +2,13 @@ from django.urls import reverse_lazy
 from django.views.generic import ListView, DetailView, CreateView, UpdateView, DeleteView
 from .models import User
 from .forms import CustomUserCreationForm, CustomUserChangeForm
-from django.shortcuts import get_object_or_404
+from django.shortcuts import get_object_or_404, redirect
+from django.conf import settings
+from django.db import models
+from core.deletion import fast_delete
+from projects.shards import delete_user_rows
+from jobs.registry import enqueue
+from tasks.models import Task
 from django.urls import reverse_lazy
 from django.contrib.auth.views import PasswordChangeView
 from django.contrib.auth.mixins import UserPassesTestMixin, LoginRequiredMixin
@@ -38,6 +44,23 @@ class UserDeleteView(DeleteView):
     template_name = 'users/user_confirm_delete.html'
     success_url = reverse_lazy('user-list')
 
+    def form_valid(self, form):
+        user = self.object
+        task_count = Task.objects.filter(
+            models.Q(owner=user) | models.Q(assigned_to=user) | models.Q(project__owner=user)
+        ).count()
+        if task_count > settings.FAST_DELETE_BACKGROUND_THRESHOLD:
+            # o job não pode pertencer ao usuário que está sendo apagado (seria apagado junto)
+            requester = self.request.user
+            owner = requester if requester.is_authenticated and requester.pk != user.pk else None
+            job = enqueue('users.delete_user', owner=owner, user_id=user.pk)
+            if owner:
+                return redirect('job-detail', pk=job.pk)
+            return redirect(self.get_success_url())
+        delete_user_rows(user.pk)
+        fast_delete(User.objects.filter(pk=user.pk))
+        return redirect(self.get_success_url())
+
 class UserProfileView(LoginRequiredMixin, TemplateView):
     template_name = 'users/user_profile.html'
 